@@ -0,0 +1,194 @@
+"""
+Align English and Urdu transcripts into a parallel corpus of sentence pairs.
+
+    python align_transcripts.py [--dir transcripts] [--out parallel_corpus.jsonl]
+                                [--tolerance 0.5] [--min-confidence 0.3] [--workers N]
+
+Reads every drama's .tstore (or its _English_T / _Urdu_T files when it has no store) and
+writes one JSON object per pair: drama, episode, start, end, english, urdu, confidence.
+Episodes are aligned in parallel on a process pool.
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import time
+from dataclasses import dataclass, asdict
+
+import numpy as np
+
+from transcript_store import TranscriptStore, STORE_SUFFIX, TEXT_TRACK, store_path, parse_timestamped
+
+ALIGN_TOLERANCE = 0.5        # Seconds two start times may differ and still be the same line
+MIN_CONFIDENCE = 0.3         # Pairs below this are left out of the corpus
+
+
+@dataclass
+class AlignedPair:
+    drama: str
+    episode: int
+    start: float
+    end: float
+    english: str
+    urdu: str
+    confidence: float
+
+
+def align_segments(en_starts, en_texts, ur_starts, ur_texts, en_durations=None, tolerance=ALIGN_TOLERANCE):
+    """
+    Align two transcripts of the same video by start time. Every English segment is matched
+    to the nearest Urdu start (one English anchor per Urdu segment, within tolerance); lines
+    without a partner are merged into the preceding pair, which is how the translated track
+    usually differs, and lines before the first match go into the first pair. Returns
+    (start, end, english, urdu, confidence) tuples in time order. Confidence combines start-time agreement, how typical the pair's length ratio is for the
+    episode, and how many lines had to be merged into it.
+    """
+    en = np.asarray(en_starts, dtype=np.float64)
+    ur = np.asarray(ur_starts, dtype=np.float64)
+    if not len(en) or not len(ur):
+        return []
+
+    # Nearest Urdu start for each English start: the insertion point or the one before it
+    right = np.searchsorted(ur, en)
+    left = np.clip(right - 1, 0, len(ur) - 1)
+    right = np.clip(right, 0, len(ur) - 1)
+    nearest = np.where(np.abs(ur[left] - en) <= np.abs(ur[right] - en), left, right)
+    delta = np.abs(ur[nearest] - en)
+
+    # Keep only the closest English start per Urdu segment, then only those within tolerance
+    order = np.lexsort((delta, nearest))
+    closest = np.ones(len(order), dtype=bool)
+    closest[1:] = nearest[order][1:] != nearest[order][:-1]
+    anchor_mask = np.zeros(len(en), dtype=bool)
+    anchor_mask[order[closest]] = True
+    anchors = np.flatnonzero(anchor_mask & (delta <= tolerance))
+    if not len(anchors):
+        return []
+
+    # A pair runs from its anchor up to the next anchor on each side; the first pair also
+    # takes whatever comes before the first anchor
+    en_firsts = anchors.copy()
+    ur_firsts = nearest[anchors]
+    en_firsts[0] = ur_firsts[0] = 0
+    en_counts = np.diff(np.append(en_firsts, len(en)))
+    ur_counts = np.diff(np.append(ur_firsts, len(ur)))
+    en_chars = np.add.reduceat(np.fromiter(map(len, en_texts), dtype=np.int64, count=len(en)), en_firsts)
+    ur_chars = np.add.reduceat(np.fromiter(map(len, ur_texts), dtype=np.int64, count=len(ur)), ur_firsts)
+
+    log_ratio = np.log((ur_chars + 1) / (en_chars + 1))
+    length_score = np.exp(-np.abs(log_ratio - np.median(log_ratio)))
+    time_score = 1.0 - 0.5 * delta[anchors] / tolerance if tolerance else np.ones(len(anchors))
+    merge_score = 1.0 / (1.0 + 0.5 * (en_counts + ur_counts - 2))
+    confidence = np.round(time_score * length_score * merge_score, 3)
+
+    last_end = en[-1] + (float(en_durations[-1]) if en_durations is not None and len(en_durations) else 0.0)
+    ends = np.append(en[en_firsts[1:]], last_end)
+    return [
+        (float(en[a]), float(end),
+         " ".join(t.strip() for t in en_texts[a:a + n_en]),
+         " ".join(t.strip() for t in ur_texts[u:u + n_ur]),
+         float(c))
+        for a, u, n_en, n_ur, end, c in zip(en_firsts, ur_firsts, en_counts, ur_counts, ends, confidence)
+    ]
+
+
+def _read_text_track(path):
+    with open(path, encoding="utf-8") as f:
+        segments = parse_timestamped(f.read())
+    return ([s["start"] for s in segments], [s["text"] for s in segments], [s["duration"] for s in segments])
+
+
+def _read_store_track(track):
+    return (np.array(track.starts(), dtype=np.float64), [track.text(i) for i in range(len(track))],
+            [track[-1].duration] if len(track) else [])
+
+
+def align_episode(task, tolerance=ALIGN_TOLERANCE):
+    """AlignedPairs for one (drama, episode, source) task from find_episodes"""
+    drama, episode, source = task
+    if isinstance(source, str):
+        with TranscriptStore(source) as store:
+            en_starts, en_texts, en_durations = _read_store_track(store.track(episode, "en"))
+            ur_starts, ur_texts, _ = _read_store_track(store.track(episode, "ur"))
+            pairs = align_segments(en_starts, en_texts, ur_starts, ur_texts, en_durations, tolerance)
+    else:
+        en_starts, en_texts, en_durations = _read_text_track(source[0])
+        ur_starts, ur_texts, _ = _read_text_track(source[1])
+        pairs = align_segments(en_starts, en_texts, ur_starts, ur_texts, en_durations, tolerance)
+    return [AlignedPair(drama, episode, *pair) for pair in pairs]
+
+
+def find_episodes(directory):
+    """
+    (drama, episode, source) for every episode with both languages: source is a store
+    path, or an (English _T, Urdu _T) path pair for dramas without a store
+    """
+    filenames = sorted(os.listdir(directory))
+    tasks = []
+    stored = {name[:-len(STORE_SUFFIX)] for name in filenames if name.endswith(STORE_SUFFIX)}
+    for drama in sorted(stored):
+        path = store_path(directory, drama)
+        with TranscriptStore(path) as store:
+            tracks = set(store.tracks())
+        tasks += [(drama, episode, path) for episode, lang in sorted(tracks)
+                  if lang == "en" and (episode, "ur") in tracks]
+    text_tracks = {}
+    for filename in filenames:
+        match = TEXT_TRACK.match(filename)
+        if match and match.group(1) not in stored:
+            key = (match.group(1), int(match.group(2)))
+            text_tracks.setdefault(key, {})[match.group(3)] = os.path.join(directory, filename)
+    tasks += [(drama, episode, (paths["English"], paths["Urdu"]))
+              for (drama, episode), paths in sorted(text_tracks.items()) if len(paths) == 2]
+    return tasks
+
+
+def _align_task(args):
+    task, tolerance = args
+    return align_episode(task, tolerance)
+
+
+def align_corpus(directory, output_path, tolerance=ALIGN_TOLERANCE, min_confidence=MIN_CONFIDENCE, workers=None):
+    """Align every episode in directory on a process pool and write the pairs as JSON lines"""
+    tasks = find_episodes(directory)
+    workers = workers or os.cpu_count() or 1
+    written = dropped = 0
+    with open(output_path, "w", encoding="utf-8") as out:
+        if workers > 1 and len(tasks) > 1:
+            with multiprocessing.Pool(min(workers, len(tasks))) as pool:
+                results = pool.imap(_align_task, [(task, tolerance) for task in tasks], chunksize=4)
+                written, dropped = _write_pairs(results, out, min_confidence)
+        else:
+            written, dropped = _write_pairs((align_episode(task, tolerance) for task in tasks), out, min_confidence)
+    return len(tasks), written, dropped
+
+
+def _write_pairs(results, out, min_confidence):
+    written = dropped = 0
+    for pairs in results:
+        for pair in pairs:
+            if pair.confidence < min_confidence:
+                dropped += 1
+                continue
+            out.write(json.dumps(asdict(pair), ensure_ascii=False) + "\n")
+            written += 1
+    return written, dropped
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--dir", default="transcripts")
+    arg_parser.add_argument("--out", default="parallel_corpus.jsonl")
+    arg_parser.add_argument("--tolerance", type=float, default=ALIGN_TOLERANCE)
+    arg_parser.add_argument("--min-confidence", type=float, default=MIN_CONFIDENCE)
+    arg_parser.add_argument("--workers", type=int, default=None, help="processes (default: all cores)")
+    args = arg_parser.parse_args()
+
+    started = time.perf_counter()
+    episodes, written, dropped = align_corpus(args.dir, args.out, args.tolerance, args.min_confidence, args.workers)
+    print(f"✓ Aligned {episodes} episodes into {written} pairs ({dropped} below confidence "
+          f"{args.min_confidence}) in {time.perf_counter() - started:.2f}s -> {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Aligner check on both transcript sources (no network needed).
+
+    python bench_align_transcripts.py [--dir transcripts] [--drama Daraar] [--workers N]
+
+Copies a drama's _English_T / _Urdu_T files into a scratch directory and aligns them as
+text files, then builds the drama's .tstore there and aligns again from the store (the
+path process_dramas leaves behind). Reports both timings and checks the pairs match.
+"""
+import argparse
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from align_transcripts import align_corpus
+from transcript_store import import_text_files, update_store, store_path
+
+
+def run(label, directory, workers):
+    output = os.path.join(directory, f"{label}.jsonl")
+    started = time.perf_counter()
+    episodes, written, dropped = align_corpus(directory, output, workers=workers)
+    print(f"  {label:<6} {episodes} episodes, {written} pairs ({dropped} dropped) "
+          f"in {time.perf_counter() - started:.2f}s")
+    with open(output, encoding="utf-8") as f:
+        return f.read()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--dir", default="transcripts")
+    arg_parser.add_argument("--drama", default="Daraar")
+    arg_parser.add_argument("--workers", type=int, default=None)
+    args = arg_parser.parse_args()
+
+    pattern = re.compile(rf"^{re.escape(args.drama)}_Ep_\d+_(English|Urdu)_T\.txt$")
+    workdir = tempfile.mkdtemp(prefix="bench_align_")
+    try:
+        for filename in os.listdir(args.dir):
+            if pattern.match(filename):
+                shutil.copy(os.path.join(args.dir, filename), workdir)
+        from_text = run("text", workdir, args.workers)
+
+        update_store(store_path(workdir, args.drama), import_text_files(workdir, args.drama))
+        from_store = run("store", workdir, args.workers)
+
+        if not from_text:
+            print(f"✗ No {args.drama} transcripts aligned from {args.dir}")
+        elif from_text == from_store:
+            print("✓ Store-backed pairs match the text-file ones")
+        else:
+            print("✗ Store-backed pairs differ from the text-file ones")
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,194 @@
+"""
+End-to-end pipeline benchmark against local YouTube and S3 stand-ins (no network needed).
+
+    python bench_pipeline.py [--dramas 2] [--episodes 10] [--size-mb 20] [--variant v1|v2]
+                             [--workers 4] [--stream] [--phase all|transcripts|downloads]
+                             [--coordinate]
+
+Runs transcript_fetcher.process_dramas and VideoDownloader.process_all_dramas in a scratch
+directory and reports episodes/s, MB/s and peak RSS per phase.
+"""
+import argparse
+import json
+import os
+import resource
+import shutil
+import sys
+import tempfile
+import time
+
+from local_standins import StandinCatalog, start_background, write_fake_ytdlp
+
+REPO_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_BUCKET = "bench-videos"
+BENCH_COORD_BUCKET = "bench-coord"
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process and of its largest child, in MB (Linux reports KB)"""
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    return own, children
+
+
+def fetch_stats(base_url):
+    import http_client
+    return http_client.get(f"{base_url}/_stats").json()
+
+
+def prepare_environment(workdir, base_url, coordinate=False):
+    """Point every module at the stand-ins; must run before the pipeline modules are imported"""
+    cookie_path = os.path.join(workdir, "cookies.txt")
+    with open(cookie_path, "w", encoding="utf-8") as f:
+        f.write("# Netscape HTTP Cookie File\n# Stand-in cookie jar for the offline benchmark.\n\n")
+    lib_dir = os.path.join(workdir, "lib")
+    write_fake_ytdlp(lib_dir, base_url)
+
+    os.environ.update({
+        "YOUTUBE_BASE_URL": base_url,
+        "YOUTUBE_COOKIES_PATH": cookie_path,
+        "S3_ENDPOINT_URL1": base_url,
+        "S3_BUCKET1": BENCH_BUCKET,
+        # Empty unless asked for, so a .env file cannot enable coordination
+        "S3_COORD_BUCKET1": BENCH_COORD_BUCKET if coordinate else "",
+        "AWS_ACCESS_KEY_ID1": "standin",
+        "AWS_SECRET_ACCESS_KEY1": "standin",
+        "AWS_REGION1": "us-east-1",
+        "EPISODE_LEDGER_PATH": os.path.join(workdir, "episode_ledger.sqlite3"),
+        "VIDEO_CACHE_PATH": os.path.join(workdir, "video_info.sqlite3"),
+        "TRANSCRIPT_CACHE_PATH": os.path.join(workdir, "transcripts.sqlite3"),
+        "TRANSCRIPT_INDEX_PATH": os.path.join(workdir, "transcript_index.sqlite3"),
+        "STRATEGY_SCOREBOARD_PATH": os.path.join(workdir, "strategy_scoreboard.sqlite3"),
+        "PROXY_URLS": "direct",           # Never route stand-in traffic through the real proxies
+    })
+    sys.path[:0] = [lib_dir, REPO_DIR]      # The stand-in yt_dlp shadows the real one
+    os.chdir(workdir)
+
+
+def configure_dramas(catalog, base_url):
+    """Replace the dramas config in place; v1/v2 hold a reference to the same dict"""
+    import transcript_fetcher
+    transcript_fetcher.dramas.clear()
+    for d in range(catalog.dramas):
+        transcript_fetcher.dramas[catalog.drama_name(d)] = {
+            "link": f"{base_url}/playlist?list={catalog.playlist_id(d)}",
+            "episodes": transcript_fetcher.generate_episode_data(catalog.episodes, catalog.episodes)
+        }
+
+
+def use_standin_transcripts(base_url):
+    """
+    youtube_transcript_api always talks to youtube.com over TLS, so the transcript
+    download itself is swapped for the stand-in's timedtext endpoint.
+    """
+    import http_client
+    import transcript_fetcher
+
+    def get_transcripts(video_id):
+        en = http_client.get(f"{base_url}/api/timedtext?v={video_id}&lang=en").json()
+        ur = http_client.get(f"{base_url}/api/timedtext?v={video_id}&lang=ur").json()
+        return en or None, ur or None
+
+    transcript_fetcher.get_transcripts = get_transcripts
+
+
+def run_phase(name, func, episodes, base_url):
+    before = fetch_stats(base_url)
+    started = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - started
+    after = fetch_stats(base_url)
+    moved = (after.get("media_bytes_sent", 0) - before.get("media_bytes_sent", 0)) / (1024 * 1024)
+    uploaded = (after.get("s3_bytes_received", 0) - before.get("s3_bytes_received", 0)) / (1024 * 1024)
+    own_rss, child_rss = peak_rss_mb()
+    return {
+        "phase": name,
+        "episodes": episodes,
+        "seconds": round(elapsed, 3),
+        "episodes_per_s": round(episodes / elapsed, 3) if elapsed else None,
+        "downloaded_mb": round(moved, 1),
+        "uploaded_mb": round(uploaded, 1),
+        "mb_per_s": round(max(moved, uploaded) / elapsed, 2) if elapsed else None,
+        "peak_rss_mb": round(own_rss, 1),
+        "peak_child_rss_mb": round(child_rss, 1),
+    }
+
+
+def stage_summary():
+    import metrics
+    rows = []
+    for histogram in metrics.registry.snapshot()["histograms"]:
+        if histogram["name"] != "stage_seconds" or not histogram["count"]:
+            continue
+        labels = dict(histogram["labels"])
+        stage = labels.pop("stage")
+        detail = ",".join(f"{k}={v}" for k, v in sorted(labels.items()))
+        rows.append((stage, detail, histogram["count"], histogram["sum"] / histogram["count"]))
+    return rows
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--dramas", type=int, default=2)
+    arg_parser.add_argument("--episodes", type=int, default=10, help="episodes per drama")
+    arg_parser.add_argument("--size-mb", type=float, default=20, help="media size per episode")
+    arg_parser.add_argument("--variant", choices=["v1", "v2"], default="v1")
+    arg_parser.add_argument("--workers", type=int, default=None, help="override MAX_THREADS")
+    arg_parser.add_argument("--stream", action="store_true", help="set STREAM_TO_S3")
+    arg_parser.add_argument("--phase", choices=["all", "transcripts", "downloads"], default="all")
+    arg_parser.add_argument("--coordinate", action="store_true", help="claim episodes through S3 leases")
+    arg_parser.add_argument("--json", help="also write the results to this file")
+    arg_parser.add_argument("--keep", action="store_true", help="keep the scratch directory")
+    args = arg_parser.parse_args()
+    json_path = os.path.abspath(args.json) if args.json else None
+
+    catalog = StandinCatalog(args.dramas, args.episodes, int(args.size_mb * 1024 * 1024))
+    server_process, base_url = start_background(catalog)
+    workdir = tempfile.mkdtemp(prefix="bench_pipeline_")
+    prepare_environment(workdir, base_url, args.coordinate)
+    total_episodes = args.dramas * args.episodes
+    results = []
+
+    try:
+        configure_dramas(catalog, base_url)
+        if args.phase in ("all", "transcripts"):
+            import transcript_fetcher
+            use_standin_transcripts(base_url)
+            results.append(run_phase("transcripts", transcript_fetcher.process_dramas, total_episodes, base_url))
+            # Rebuilding every transcript store from the transcript cache alone
+            results.append(run_phase("rebuild", transcript_fetcher.rebuild_stores_from_cache, total_episodes, base_url))
+
+        if args.phase in ("all", "downloads"):
+            pipeline = __import__(args.variant)
+            if args.workers:
+                pipeline.MAX_THREADS = args.workers
+            pipeline.STREAM_TO_S3 = args.stream
+            downloader = pipeline.VideoDownloader()
+            results.append(run_phase("downloads", downloader.process_all_dramas, total_episodes, base_url))
+    finally:
+        server_process.terminate()
+        os.chdir(REPO_DIR)
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    print("\n" + "=" * 60)
+    print(f"PIPELINE BENCHMARK: {args.dramas} dramas x {args.episodes} episodes x {args.size_mb:g} MB "
+          f"({args.variant}, {'stream' if args.stream else 'file'} mode)")
+    for result in results:
+        print(f"  {result['phase']:<12} {result['seconds']:>8.2f}s  {result['episodes_per_s']:>7.2f} episodes/s  "
+              f"{result['mb_per_s']:>8.2f} MB/s  peak RSS {result['peak_rss_mb']:.0f} MB "
+              f"(largest child {result['peak_child_rss_mb']:.0f} MB)")
+    print("  Per-stage latency:")
+    for stage, detail, count, mean in stage_summary():
+        print(f"    {stage:<20} {detail:<36} {count:>6}x  mean {mean * 1000:>9.1f} ms")
+    print("=" * 60)
+    if args.keep:
+        print(f"Scratch directory kept at {workdir}")
+
+    if json_path:
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump({"args": vars(args), "results": results, "stages": stage_summary()}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Proxy pool check against local stand-in proxies (no network needed).
+
+    python bench_proxy_pool.py [--requests 300] [--workers 8]
+
+Starts a fast, a slow and a failing forwarding proxy in front of the YouTube stand-in and
+sends the same requests through plain round-robin and through ProxyPool. Reports requests/s,
+failures and each proxy's share, then revives the failing proxy and checks it is readmitted.
+Finally checks that a lease only blames its proxy for connection-level errors.
+"""
+import argparse
+import concurrent.futures
+import itertools
+import threading
+import time
+
+import requests
+
+import http_client
+import proxy_pool
+from local_standins import StandinCatalog, start_background, make_proxy
+from proxy_pool import ProxyPool
+
+
+def start_proxy(delay=0.0, fail=False):
+    server = make_proxy(delay=delay, fail=fail)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def run(label, count, workers, url, pick, report):
+    """Send count GETs through the proxies pick() returns; report(proxy, ok, seconds) after each"""
+    session = http_client.get_session()
+    failures = 0
+    lock = threading.Lock()
+
+    def one(_):
+        nonlocal failures
+        proxy = pick()
+        started = time.perf_counter()
+        try:
+            ok = session.get(url, proxies=ProxyPool.as_requests(proxy), timeout=10).status_code == 200
+        except Exception:
+            ok = False
+        report(proxy, ok, time.perf_counter() - started)
+        if not ok:
+            with lock:
+                failures += 1
+
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        list(executor.map(one, range(count)))
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<12} {count / elapsed:>8.1f} req/s  {failures:>4} failed")
+    return failures
+
+
+def check_lease_attribution():
+    """(requests, failures) a lease records for: success, an HTTP error, a bad page, a proxy error"""
+    pool = ProxyPool(["http://127.0.0.1:9"])
+    outcomes = []
+    for error in (None, requests.exceptions.HTTPError("404"), RuntimeError("no video URL"),
+                  requests.exceptions.ProxyError("refused")):
+        try:
+            with pool.lease():
+                if error:
+                    raise error
+        except Exception:
+            pass
+        outcomes.append(pool.summary()[0][4:])
+    return outcomes == [(1, 0), (1, 0), (1, 0), (2, 1)]
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--requests", type=int, default=300)
+    arg_parser.add_argument("--workers", type=int, default=8)
+    args = arg_parser.parse_args()
+
+    catalog = StandinCatalog(1, 1, 1024 * 1024)
+    server_process, base_url = start_background(catalog)
+    fast, fast_url = start_proxy(delay=0.005)
+    slow, slow_url = start_proxy(delay=0.15)
+    dead, dead_url = start_proxy(fail=True)
+    names = {fast_url: "fast", slow_url: "slow", dead_url: "failing"}
+    proxies = [fast_url, slow_url, dead_url]
+    url = f"{base_url}/watch?v={catalog.video_id(0, 1)}"
+    http_client.configure(pool_size=args.workers * 2)
+
+    try:
+        print(f"{args.requests} requests, {args.workers} workers")
+        rotation = itertools.cycle(proxies)
+        rotation_lock = threading.Lock()
+
+        def next_proxy():
+            with rotation_lock:
+                return next(rotation)
+
+        run("round-robin", args.requests, args.workers, url, next_proxy, lambda *outcome: None)
+
+        proxy_pool.READMIT_AFTER = 0
+        pool = ProxyPool(proxies, health_url=f"{base_url}/generate_204")
+        pool.probe_all()
+        before = {proxy: server.requests for proxy, server in zip(proxies, (fast, slow, dead))}
+        failures = run("proxy pool", args.requests, args.workers, url, pool.choose, pool.report)
+        hits = {proxy: server.requests - before[proxy] for proxy, server in zip(proxies, (fast, slow, dead))}
+        for proxy in proxies:
+            print(f"    {names[proxy]:<8} {hits[proxy] / sum(hits.values()):>6.1%} of proxied requests")
+
+        ejected = [proxy for proxy, healthy, *_ in pool.summary() if not healthy]
+        dead.fail = False
+        pool.probe_all()
+        readmitted = all(healthy for _, healthy, *_ in pool.summary())
+    finally:
+        for server in (fast, slow, dead):
+            server.shutdown()
+        server_process.terminate()
+
+    print(f"  failing proxy ejected: {'✓' if ejected == [dead_url] else '✗'}  "
+          f"readmitted after recovery: {'✓' if readmitted else '✗'}  "
+          f"failures through the pool: {failures} (ejects after {proxy_pool.EJECT_AFTER_FAILURES}, "
+          f"plus requests already in flight)")
+    print(f"  lease blames its proxy only for connection errors: {'✓' if check_lease_attribution() else '✗'}")
+
+
+if __name__ == "__main__":
+    main()
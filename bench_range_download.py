@@ -0,0 +1,91 @@
+"""
+Check resumable and range-segmented downloads against the local media stand-in and time them.
+
+    python bench_range_download.py [--size-mb 200] [--segments 4] [--drop-after-mb 16]
+
+Every download is verified byte for byte; the flaky server cuts each response after
+--drop-after-mb, so only resuming downloads can finish there.
+"""
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+
+import http_client
+from local_standins import StandinCatalog, start_background, expected_media_digest
+from range_download import download_url
+
+VIDEO_ID = "bench000001"
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def legacy_download(url, output_path):
+    """What download_video used to do: one GET, 8 KB chunks, no resume"""
+    response = http_client.get(url, stream=True)
+    with open(output_path, "wb") as f:
+        for chunk in response.iter_content(chunk_size=8192):
+            f.write(chunk)
+
+
+def run_case(name, func, output_path, expected, size_mb):
+    if os.path.exists(output_path):
+        os.remove(output_path)
+    start = time.perf_counter()
+    try:
+        func(output_path)
+        error = None
+    except Exception as e:
+        error = str(e)
+    elapsed = time.perf_counter() - start
+    ok = error is None and os.path.exists(output_path) and file_digest(output_path) == expected
+    status = "✓" if ok else f"✗ {error or 'content mismatch'}"
+    print(f"  {name:<34} {elapsed:>7.2f}s  {size_mb / elapsed:>8.1f} MB/s  {status}")
+    return ok
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--size-mb", type=float, default=200)
+    arg_parser.add_argument("--segments", type=int, default=4)
+    arg_parser.add_argument("--drop-after-mb", type=float, default=16)
+    args = arg_parser.parse_args()
+
+    size = int(args.size_mb * 1024 * 1024)
+    expected = expected_media_digest(size)
+    steady, steady_url = start_background(StandinCatalog(1, 1, size))
+    flaky, flaky_url = start_background(StandinCatalog(1, 1, size, int(args.drop_after_mb * 1024 * 1024)))
+    output_path = os.path.join(tempfile.mkdtemp(prefix="bench_range_"), "episode.mp4")
+    media = f"/media/{VIDEO_ID}"
+
+    print(f"Downloading {args.size_mb:g} MB (flaky server drops every {args.drop_after_mb:g} MB)")
+    results = [
+        run_case("legacy 8 KB single GET", lambda path: legacy_download(steady_url + media, path),
+                 output_path, expected, args.size_mb),
+        run_case("download_url, 1 segment", lambda path: download_url(steady_url + media, path, segments=1),
+                 output_path, expected, args.size_mb),
+        run_case(f"download_url, {args.segments} segments",
+                 lambda path: download_url(steady_url + media, path, segments=args.segments),
+                 output_path, expected, args.size_mb),
+        run_case("flaky: download_url, 1 segment", lambda path: download_url(flaky_url + media, path, segments=1),
+                 output_path, expected, args.size_mb),
+        run_case(f"flaky: download_url, {args.segments} segments",
+                 lambda path: download_url(flaky_url + media, path, segments=args.segments),
+                 output_path, expected, args.size_mb),
+    ]
+    steady.terminate()
+    flaky.terminate()
+    os.remove(output_path) if os.path.exists(output_path) else None
+    sys.exit(0 if all(results) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Check the title parser against the fixture corpus and measure its throughput.
+
+    python bench_title_parser.py [--titles 100000]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+from transcript_fetcher import dramas
+from title_parser import get_parser
+
+FIXTURE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "episode_titles.json")
+
+
+def load_fixtures(path=FIXTURE_PATH):
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def parser_for(fixture):
+    drama = fixture.get("drama")
+    return get_parser(dramas[drama].get("title_rules") if drama else None)
+
+
+def check_accuracy(fixtures):
+    failures = 0
+    for fixture in fixtures:
+        got = parser_for(fixture).parse(fixture["title"], fixture["max_episode"])
+        if got != fixture["episode"]:
+            failures += 1
+            print(f"✗ expected {fixture['episode']}, got {got}: {fixture['title']}")
+    print(f"Accuracy: {len(fixtures) - failures}/{len(fixtures)} fixture titles")
+    return failures
+
+
+def bench(fixtures, total_titles):
+    # Distinct titles so the batch de-duplication does not flatter the numbers
+    titles = []
+    while len(titles) < total_titles:
+        for fixture in fixtures:
+            titles.append((f"{fixture['title']} #{len(titles)}", fixture["max_episode"]))
+    titles = titles[:total_titles]
+    parser = get_parser()
+
+    start = time.perf_counter()
+    for title, max_episode in titles:
+        parser.parse(title, max_episode)
+    single = time.perf_counter() - start
+
+    start = time.perf_counter()
+    parser.parse_many([title for title, _ in titles], 40)
+    batch = time.perf_counter() - start
+
+    print(f"parse():      {total_titles} titles in {single:.3f}s ({total_titles / single:,.0f} titles/s)")
+    print(f"parse_many(): {total_titles} titles in {batch:.3f}s ({total_titles / batch:,.0f} titles/s)")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__)
+    arg_parser.add_argument("--titles", type=int, default=100000, help="number of titles to parse")
+    args = arg_parser.parse_args()
+
+    fixtures = load_fixtures()
+    failures = check_accuracy(fixtures)
+    bench(fixtures, args.titles)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""
+Translation engine check with the local fake provider (no network needed).
+
+    python bench_translation.py [--dir transcripts] [--drama Daraar] [--latency 0.05]
+                                [--workers 8] [--rate 50]
+
+Translates every episode's _English_T file of a drama to Urdu: one chunk at a time as
+before, on the worker pool with a token-bucket limit, and on the pool with a translation
+memory (from empty, then again). Reports wall time and provider calls, and checks every
+output matches the serial one. Also checks that a provider merging the lines of a reply
+never reorders the sentences of a chunk.
+"""
+import argparse
+import os
+import re
+import shutil
+import tempfile
+import time
+
+from translate_transcripts import translate_files
+from translation_engine import TranslationEngine, FakeProvider
+from translation_memory import TranslationMemory
+
+
+def run(label, jobs, engine, one_file_at_a_time=False):
+    started = time.perf_counter()
+    if one_file_at_a_time:                       # As main() used to
+        for job in jobs:
+            translate_files([job], engine=engine)
+    else:
+        translate_files(jobs, engine=engine)
+    elapsed = time.perf_counter() - started
+    calls = engine.provider.calls
+    engine.close()
+    print(f"\n  {label:<8} {elapsed:>7.2f}s  {calls} provider calls  {calls / elapsed:>6.1f} req/s")
+    return elapsed
+
+
+def read(workdir, label, path):
+    """An output with the fake provider's language tags dropped, which it adds per sentence or per chunk"""
+    with open(os.path.join(workdir, label, os.path.basename(path)), encoding="utf-8") as f:
+        return " ".join(f.read().replace("<ur>", " ").split())
+
+
+def check_merged_replies(workdir):
+    """Chunks whose known sentences leave one gap or several, translated by a line-merging provider"""
+    memory = TranslationMemory(os.path.join(workdir, "merged.sqlite3"))
+    memory.put("Hello.", "<ur> Hello.", "en", "ur")
+    engine = TranslationEngine(FakeProvider(merge_lines=True), workers=1, memory=memory)
+    ok = True
+    for text in ("Hello. Bye now. Go away.", "Bye now. Hello. Go away.", "Go away. Go away. Hello."):
+        translated = engine.translate(text, "en", "ur")
+        in_order = " ".join(translated.replace("<ur>", " ").split()) == text
+        stored = memory.get(text, "en", "ur") == translated
+        ok = ok and in_order and stored
+        if not (in_order and stored):
+            print(f"✗ merged reply for {text!r}: {translated!r}")
+    engine.close()
+    memory.close()
+    print("✓ merged provider replies keep sentence order" if ok else "✗ merged provider replies reorder sentences")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--dir", default="transcripts")
+    arg_parser.add_argument("--drama", default="Daraar")
+    arg_parser.add_argument("--latency", type=float, default=0.05, help="seconds per fake provider call")
+    arg_parser.add_argument("--workers", type=int, default=8)
+    arg_parser.add_argument("--rate", type=float, default=50.0, help="requests/s allowed by the token bucket")
+    args = arg_parser.parse_args()
+
+    pattern = re.compile(rf"^{re.escape(args.drama)}_Ep_(\d+)_English_T\.txt$")
+    inputs = sorted(os.path.join(args.dir, f) for f in os.listdir(args.dir) if pattern.match(f))
+    if not inputs:
+        raise SystemExit(f"No {args.drama} _English_T files in {args.dir}")
+    workdir = tempfile.mkdtemp(prefix="bench_translation_")
+    try:
+        outputs = {}
+        for label, workers, rate in (("serial", 1, None), ("pool", args.workers, args.rate)):
+            os.makedirs(os.path.join(workdir, label))
+            jobs = [(path, os.path.join(workdir, label, os.path.basename(path)), "ur") for path in inputs]
+            engine = TranslationEngine(FakeProvider(latency=args.latency, max_length=440),
+                                       workers=workers, rate=rate, burst=workers, memory=False)
+            outputs[label] = run(label, jobs, engine, one_file_at_a_time=workers == 1)
+
+        # The same pool with a translation memory: first run from empty, then a rerun
+        memory = TranslationMemory(os.path.join(workdir, "memory.sqlite3"))
+        for label in ("cold", "warm"):
+            os.makedirs(os.path.join(workdir, label))
+            jobs = [(path, os.path.join(workdir, label, os.path.basename(path)), "ur") for path in inputs]
+            engine = TranslationEngine(FakeProvider(latency=args.latency, max_length=440),
+                                       workers=args.workers, rate=args.rate, burst=args.workers, memory=memory)
+            outputs[label] = run(f"memory {label}", jobs, engine)
+        print(f"  {len(memory)} translations remembered")
+        memory.close()
+
+        print(f"\n{len(inputs)} episodes: serial {outputs['serial']:.2f}s, pool {outputs['pool']:.2f}s "
+              f"({outputs['serial'] / outputs['pool']:.1f}x, limited to {args.rate:g} req/s)")
+        print(f"   with translation memory: cold {outputs['cold']:.2f}s, warm {outputs['warm']:.2f}s")
+        for label in ("pool", "cold", "warm"):
+            mismatched = [os.path.basename(path) for path in inputs if read(workdir, "serial", path)
+                          != read(workdir, label, path)]
+            print(f"✗ {label} differs: " + ", ".join(mismatched) if mismatched
+                  else f"✓ {label} outputs match the serial ones")
+        check_merged_replies(workdir)
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Lease coordination check against the local S3 stand-in (no network needed).
+
+    python bench_work_coordinator.py [--instances 2] [--episodes 50] [--lease-seconds 0.5]
+
+Two or more S3LeaseCoordinators share one coordination bucket: each checks claim, renew
+and release hand-offs, an expired lease being taken over, and every instance racing to
+claim the same episodes, which exactly one of them must win per episode.
+"""
+import argparse
+import concurrent.futures
+import contextlib
+import io
+import time
+
+import boto3
+from botocore.config import Config
+
+from local_standins import StandinCatalog, start_background
+from work_coordinator import S3LeaseCoordinator, LeaseLost
+
+BENCH_COORD_BUCKET = "bench-coord"
+
+
+def make_client(base_url):
+    return boto3.client(
+        "s3", endpoint_url=base_url, aws_access_key_id="standin", aws_secret_access_key="standin",
+        region_name="us-east-1", config=Config(s3={"addressing_style": "path"}, retries={"max_attempts": 1})
+    )
+
+
+def check(label, ok):
+    print(f"{'✓' if ok else '✗'} {label}")
+    return ok
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--instances", type=int, default=2)
+    arg_parser.add_argument("--episodes", type=int, default=50, help="episodes every instance races for")
+    arg_parser.add_argument("--lease-seconds", type=float, default=0.5, help="lease length for the expiry check")
+    args = arg_parser.parse_args()
+
+    server_process, base_url = start_background(StandinCatalog(dramas=0))
+    try:
+        coordinators = [S3LeaseCoordinator(make_client(base_url), BENCH_COORD_BUCKET, f"bench-{i}",
+                                           lease_seconds=args.lease_seconds)
+                        for i in range(max(2, args.instances))]
+        a, b = coordinators[:2]
+        results = []
+
+        # Claim, renew and release hand-offs between two instances
+        results.append(check("first claim wins", a.try_claim("Handoff", 1)))
+        results.append(check("second instance is refused a live lease", not b.try_claim("Handoff", 1)))
+        a.renew("Handoff", 1)
+        results.append(check("holder renews its lease", "leases/Handoff/ep1.json" in a._held))
+        a.release("Handoff", 1)
+        results.append(check("a released lease can be claimed", b.try_claim("Handoff", 1)))
+        b.release("Handoff", 1, completed=True)
+        results.append(check("a completed episode is never claimed again",
+                             not a.try_claim("Handoff", 1) and not b.try_claim("Handoff", 1)))
+
+        # A lease left to expire is taken over, and the old holder finds out on its next renewal
+        a.try_claim("Expiry", 1)
+        time.sleep(args.lease_seconds * 1.5)
+        results.append(check("an expired lease is taken over", b.try_claim("Expiry", 1)))
+        try:
+            a.renew("Expiry", 1)
+            lost = False
+        except LeaseLost:
+            lost = True
+        results.append(check("the old holder loses it on renewal", lost))
+        a.release("Expiry", 1)              # No longer held: must leave the new owner's lease alone
+        results.append(check("the old holder cannot release the new owner's lease",
+                             not a.try_claim("Expiry", 1)))
+        b.release("Expiry", 1)
+
+        # Every instance races for the same episodes
+        started = time.perf_counter()
+        with concurrent.futures.ThreadPoolExecutor(len(coordinators) * 4) as pool, \
+                contextlib.redirect_stdout(io.StringIO()):        # One "leased by" line per lost race
+            claims = list(pool.map(lambda job: (job[1], job[0].try_claim("Race", job[1])),
+                                   [(c, n) for n in range(1, args.episodes + 1) for c in coordinators]))
+        elapsed = time.perf_counter() - started
+        winners = {}
+        for episode, won in claims:
+            winners[episode] = winners.get(episode, 0) + won
+        results.append(check(f"{len(coordinators)} instances racing for {args.episodes} episodes: "
+                             f"exactly one winner each ({len(claims) / elapsed:.0f} claims/s)",
+                             all(count == 1 for count in winners.values())))
+
+        print(f"\n{'✓ All lease checks passed' if all(results) else '✗ Some lease checks failed'}")
+    finally:
+        server_process.terminate()
+
+
+if __name__ == "__main__":
+    main()
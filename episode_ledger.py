@@ -0,0 +1,83 @@
+import os
+import sqlite3
+import threading
+import time
+
+LEDGER_PATH = os.environ.get("EPISODE_LEDGER_PATH", "episode_ledger.sqlite3")  # Survives restarts
+
+# Stages an episode passes through, in order
+STAGE_RESOLVED = "resolved"
+STAGE_DOWNLOADED = "downloaded"
+STAGE_UPLOADED = "uploaded"
+STAGE_TRANSCRIPTS_UPLOADED = "transcripts_uploaded"
+STAGES = (STAGE_RESOLVED, STAGE_DOWNLOADED, STAGE_UPLOADED, STAGE_TRANSCRIPTS_UPLOADED)
+
+
+class EpisodeLedger:
+    """
+    Durable record of which (drama, episode, video id) has reached which stage.
+    Backed by SQLite in WAL mode so a crash loses at most the stage being written,
+    and safe to share between worker threads.
+    """
+
+    def __init__(self, path=LEDGER_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS episode_stages (
+                drama TEXT NOT NULL,
+                episode INTEGER NOT NULL,
+                video_id TEXT NOT NULL,
+                stage TEXT NOT NULL,
+                detail TEXT,
+                updated_at REAL NOT NULL,
+                PRIMARY KEY (drama, episode, video_id, stage)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_episode_stages_video ON episode_stages (drama, video_id)"
+        )
+
+    def record(self, drama, episode, video_id, stage, detail=None):
+        """Mark a stage as done for one video of an episode"""
+        if stage not in STAGES:
+            raise ValueError(f"Unknown ledger stage: {stage}")
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO episode_stages VALUES (?, ?, ?, ?, ?, ?)",
+                (drama, episode, video_id, stage, detail, time.time())
+            )
+
+    def lookup_episode(self, drama, video_id):
+        """Episode number a video was resolved to on an earlier run, or None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT episode FROM episode_stages WHERE drama = ? AND video_id = ? AND stage = ? LIMIT 1",
+                (drama, video_id, STAGE_RESOLVED)
+            ).fetchone()
+        return row[0] if row else None
+
+    def stages(self, drama, episode):
+        """Set of stages any video of this episode has completed"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT stage FROM episode_stages WHERE drama = ? AND episode = ?",
+                (drama, episode)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def completed_episodes(self, drama):
+        """Episode numbers of a drama that have finished every stage"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT DISTINCT episode FROM episode_stages WHERE drama = ? AND stage = ?",
+                (drama, STAGE_TRANSCRIPTS_UPLOADED)
+            ).fetchall()
+        return {row[0] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
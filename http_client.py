@@ -0,0 +1,99 @@
+import os
+import random
+import threading
+from http.cookiejar import MozillaCookieJar, LoadError
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+DEFAULT_POOL_SIZE = 8            # Keep-alive connections kept per host; size it to the worker count
+DEFAULT_TIMEOUT = (10, 60)       # (connect, read) seconds
+COOKIE_PATH = os.environ.get("YOUTUBE_COOKIES_PATH", "/home/ec2-user/youtube_cookies.txt")
+
+USER_AGENTS = [
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Safari/605.1.15',
+    'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36',
+    'Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0'
+]
+
+BASE_HEADERS = {
+    'Accept-Language': 'en-US,en;q=0.9',
+    'Referer': 'https://www.youtube.com/',
+}
+
+_session = None
+_pool_size = DEFAULT_POOL_SIZE
+_cookie_path = COOKIE_PATH
+_lock = threading.Lock()
+
+
+def configure(pool_size=None, cookie_path=None):
+    """
+    Set the connection pool size and cookie file for the shared session.
+    Rebuilds the session if it already exists, so call it once at startup.
+    """
+    global _session, _pool_size, _cookie_path
+    with _lock:
+        if pool_size is not None:
+            _pool_size = pool_size
+        if cookie_path is not None:
+            _cookie_path = cookie_path
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def _build_session():
+    session = requests.Session()
+    retry = Retry(
+        total=2,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset(['GET', 'HEAD'])
+    )
+    adapter = HTTPAdapter(pool_connections=8, pool_maxsize=_pool_size, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update(BASE_HEADERS)
+
+    # Cookies are parsed once per process instead of once per download attempt
+    if _cookie_path and os.path.exists(_cookie_path):
+        cookies = MozillaCookieJar()
+        try:
+            cookies.load(_cookie_path, ignore_discard=True)
+            session.cookies.update(cookies)
+            print(f"✓ Loaded {len(cookies)} cookies from {_cookie_path}")
+        except (LoadError, OSError) as e:
+            print(f"⚠ Could not load cookies from {_cookie_path}: {str(e)}")
+    return session
+
+
+def get_session():
+    """The process-wide keep-alive session shared by every thread"""
+    global _session
+    with _lock:
+        if _session is None:
+            _session = _build_session()
+        return _session
+
+
+def random_user_agent():
+    return random.choice(USER_AGENTS)
+
+
+def request_headers(extra=None):
+    """Per-request headers with a rotated User-Agent; never mutates shared state"""
+    headers = dict(BASE_HEADERS)
+    if extra:
+        headers.update(extra)
+    headers['User-Agent'] = random_user_agent()
+    return headers
+
+
+def get(url, headers=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """GET through the shared pool with rotated headers"""
+    return get_session().get(url, headers=request_headers(headers), timeout=timeout, **kwargs)
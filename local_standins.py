@@ -0,0 +1,555 @@
+"""
+Local stand-ins for YouTube and S3 so the pipeline can run (and be benchmarked) offline.
+
+One HTTP server plays both parts:
+  /playlist?list=ID           yt-dlp flat-playlist JSON for a fake drama
+  /watch?v=ID                 watch page with title, duration and caption tracks
+  /oembed?url=...             oEmbed title lookup
+  /media/ID                   the episode's media bytes; honours Range, optionally drops connections
+  /api/timedtext?v=ID&lang=L  transcript segments as JSON
+  /generate_204               empty 204, the proxy pool's health-check target
+  /_stats                     counters for the benchmark
+  /<bucket>/<key>             path-style S3: PUT object (If-Match / If-None-Match), multipart
+                              upload, HEAD, and GET of small objects such as work leases
+
+    python local_standins.py --dramas 2 --episodes 10 --size-mb 20 --port 8765
+"""
+import argparse
+import hashlib
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, unquote
+
+MEDIA_BLOCK_SIZE = 1024 * 1024
+WATCH_PAGE_PADDING = 512 * 1024      # Real watch pages are ~1-2 MB; the probe should stop well before the end
+EPISODE_DURATION = 20 * 60
+SEGMENTS_PER_TRANSCRIPT = 300
+# Seeded, so a client can rebuild the exact bytes of any media file and check a download
+MEDIA_BLOCK = random.Random(0).randbytes(MEDIA_BLOCK_SIZE)
+SMALL_OBJECT_BYTES = 64 * 1024       # Objects up to this size keep their bytes, so they can be read back
+
+
+class StandinCatalog:
+    """The fake dramas: names, playlist ids, video ids and episode titles"""
+
+    def __init__(self, dramas=2, episodes=10, size_bytes=20 * 1024 * 1024, drop_after_bytes=0):
+        self.dramas = dramas
+        self.episodes = episodes
+        self.size_bytes = size_bytes
+        self.drop_after_bytes = drop_after_bytes     # Cut every media response after this many bytes (0: never)
+
+    def drama_name(self, d):
+        return f"Bench Drama {d}"
+
+    def playlist_id(self, d):
+        return f"BENCH{d:04d}"
+
+    def video_id(self, d, n):
+        return f"bench{d:02d}{n:04d}"     # 11 characters, like a real id
+
+    def title(self, d, n):
+        return f"{self.drama_name(d)} Episode {n} [Eng Sub]"
+
+    def lookup(self, video_id):
+        """(drama index, episode number) of a video id, or None"""
+        match = re.fullmatch(r"bench(\d{2})(\d{4})", video_id or "")
+        if not match:
+            return None
+        d, n = int(match.group(1)), int(match.group(2))
+        if d < self.dramas and 1 <= n <= self.episodes:
+            return d, n
+        return None
+
+    def playlist(self, list_id):
+        for d in range(self.dramas):
+            if self.playlist_id(d) == list_id:
+                return {
+                    "id": list_id,
+                    "title": self.drama_name(d),
+                    "entries": [
+                        {"id": self.video_id(d, n), "title": self.title(d, n), "duration": EPISODE_DURATION}
+                        for n in range(1, self.episodes + 1)
+                    ]
+                }
+        return None
+
+    def watch_page(self, d, n):
+        title = self.title(d, n)
+        player_response = (
+            f'var ytInitialPlayerResponse = {{"videoDetails":{{"videoId":"{self.video_id(d, n)}",'
+            f'"title":"{title}","lengthSeconds":"{EPISODE_DURATION}"}},'
+            f'"streamingData":{{"formats":[{{"approxDurationMs":"{EPISODE_DURATION * 1000}"}}]}},'
+            f'"captions":{{"playerCaptionsTracklistRenderer":{{"captionTracks":['
+            f'{{"vssId":".en","languageCode":"en"}},{{"vssId":"a.ur","languageCode":"ur"}}'
+            f'],"audioTracks":[]}}}}}};'
+        )
+        return (
+            f'<html><head><title>{title} - YouTube</title>'
+            f'<meta name="title" content="{title}"></head><body>'
+            f'<script>{player_response}</script>'
+            f'<script>var ytInitialData = {{}};</script>'
+            f'{"<!-- padding -->" * (WATCH_PAGE_PADDING // 16)}</body></html>'
+        )
+
+    def transcript(self, d, n, lang):
+        word = "lafz" if lang == "ur" else "word"
+        return [
+            {"text": f"{self.drama_name(d)} ep {n} line {i} {word}", "start": i * 4.0, "duration": 4.0}
+            for i in range(SEGMENTS_PER_TRANSCRIPT)
+        ]
+
+
+class StandinStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    def add(self, key, value=1):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + value
+
+    def to_dict(self):
+        with self._lock:
+            return dict(self.counts)
+
+
+class StandinHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"     # Keep-alive, like the real endpoints
+    catalog = None
+    stats = None
+    objects = None                    # "bucket/key" -> size; the bytes themselves are dropped
+    small_objects = None              # "bucket/key" -> (bytes, ETag) for objects up to SMALL_OBJECT_BYTES
+    uploads = None                    # upload id -> {part number: size}
+    store_lock = threading.Lock()
+    media_block = MEDIA_BLOCK
+
+    def log_message(self, format, *args):
+        pass
+
+    # -- helpers --------------------------------------------------------------
+
+    def _send(self, status, body=b"", content_type="application/octet-stream", headers=None):
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _read_chunked(self, digest):
+        """Decode HTTP or aws-chunked framing: hex size[;ext]\\r\\n data \\r\\n ... 0\\r\\n trailers \\r\\n"""
+        size = 0
+        while True:
+            line = self.rfile.readline().strip()
+            length = int(line.split(b";")[0], 16)
+            if length == 0:
+                while self.rfile.readline().strip():
+                    pass
+                return size
+            remaining = length
+            while remaining:
+                data = self.rfile.read(min(remaining, MEDIA_BLOCK_SIZE))
+                digest.update(data)
+                remaining -= len(data)
+            size += length
+            self.rfile.readline()
+
+    def _read_body(self):
+        """
+        Consume the request body, keeping it only if it is a small plain one.
+        Returns (size, md5 hex, bytes or None).
+        """
+        digest = hashlib.md5()
+        if "chunked" in self.headers.get("Transfer-Encoding", "") or \
+                "aws-chunked" in self.headers.get("Content-Encoding", ""):
+            return self._read_chunked(digest), digest.hexdigest(), None
+        remaining = int(self.headers.get("Content-Length", 0))
+        size = remaining
+        kept = [] if size <= SMALL_OBJECT_BYTES else None
+        while remaining:
+            data = self.rfile.read(min(remaining, MEDIA_BLOCK_SIZE))
+            if not data:
+                break
+            digest.update(data)
+            if kept is not None:
+                kept.append(data)
+            remaining -= len(data)
+        return size, digest.hexdigest(), b"".join(kept) if kept is not None else None
+
+    def _precondition_failed(self, name):
+        """S3's conditional-write check: If-None-Match: * needs no object, If-Match its ETag. Hold store_lock."""
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match == "*" and name in self.objects:
+            return True
+        if_match = self.headers.get("If-Match")
+        if if_match is not None:
+            current = self.small_objects.get(name)
+            return current is None or current[1].strip('"') != if_match.strip('"')
+        return False
+
+    # -- routes ---------------------------------------------------------------
+
+    def do_GET(self):
+        parsed = urlparse(self.path)
+        query = parse_qs(parsed.query)
+        self.stats.add(f"GET {parsed.path.split('/')[1] or '/'}")
+
+        if parsed.path == "/playlist":
+            playlist = self.catalog.playlist(query.get("list", [""])[0])
+            if playlist is None:
+                return self._send(404, "unknown playlist", "text/plain")
+            return self._send(200, json.dumps(playlist), "application/json")
+
+        if parsed.path == "/watch":
+            found = self.catalog.lookup(query.get("v", [""])[0])
+            if found is None:
+                return self._send(404, "unknown video", "text/plain")
+            return self._send(200, self.catalog.watch_page(*found), "text/html; charset=utf-8")
+
+        if parsed.path == "/oembed":
+            video_url = query.get("url", [""])[0]
+            found = self.catalog.lookup(parse_qs(urlparse(video_url).query).get("v", [""])[0])
+            if found is None:
+                return self._send(404, "Not Found", "text/plain")
+            return self._send(200, json.dumps({"title": self.catalog.title(*found)}), "application/json")
+
+        if parsed.path.startswith("/media/"):
+            return self._send_media(parsed.path[len("/media/"):])
+
+        if parsed.path == "/api/timedtext":
+            found = self.catalog.lookup(query.get("v", [""])[0])
+            if found is None:
+                return self._send(404, "[]", "application/json")
+            lang = query.get("lang", ["en"])[0]
+            return self._send(200, json.dumps(self.catalog.transcript(*found, lang)), "application/json")
+
+        if parsed.path == "/generate_204":
+            return self._send(204)
+
+        if parsed.path.count("/") > 1 and not parsed.path.startswith(("/media/", "/api/")):
+            return self._send_object()
+
+        if parsed.path == "/_stats":
+            with self.store_lock:
+                stored = {"objects": len(self.objects), "stored_bytes": sum(self.objects.values())}
+            return self._send(200, json.dumps(dict(self.stats.to_dict(), **stored)), "application/json")
+
+        return self._send(404, "not found", "text/plain")
+
+    def _send_media(self, video_id):
+        if self.catalog.lookup(video_id) is None:
+            return self._send(404, "unknown video", "text/plain")
+        size = self.catalog.size_bytes
+        start, end = 0, size - 1
+        match = re.fullmatch(r"bytes=(\d+)-(\d*)", self.headers.get("Range", ""))
+        if match:
+            start = int(match.group(1))
+            end = min(int(match.group(2)), size - 1) if match.group(2) else size - 1
+            if start >= size:
+                return self._send(416, headers={"Content-Range": f"bytes */{size}"})
+            self.send_response(206)
+            self.send_header("Content-Range", f"bytes {start}-{end}/{size}")
+        else:
+            self.send_response(200)
+        self.send_header("Content-Type", "video/mp4")
+        self.send_header("Accept-Ranges", "bytes")
+        self.send_header("Content-Length", str(end - start + 1))
+        self.end_headers()
+
+        # Media bytes are a function of their offset, so ranges and resumes line up
+        offset, sent = start, 0
+        limit = self.catalog.drop_after_bytes
+        while offset <= end:
+            block_offset = offset % MEDIA_BLOCK_SIZE
+            block = self.media_block[block_offset:block_offset + min(end - offset + 1, MEDIA_BLOCK_SIZE - block_offset)]
+            if limit and sent + len(block) > limit:
+                self.wfile.write(block[:limit - sent])
+                sent = limit
+                self.close_connection = True
+                self.stats.add("media_drops")
+                break
+            self.wfile.write(block)
+            offset += len(block)
+            sent += len(block)
+        self.stats.add("media_bytes_sent", sent)
+
+    def _send_object(self):
+        bucket, key, _ = self._bucket_key()
+        with self.store_lock:
+            stored = self.small_objects.get(f"{bucket}/{key}")
+        if stored is None:
+            return self._send(404, "<Error><Code>NoSuchKey</Code></Error>", "application/xml")
+        self.stats.add("s3_gets")
+        return self._send(200, stored[0], headers={"ETag": stored[1]})
+
+    def _bucket_key(self):
+        parsed = urlparse(self.path)
+        parts = unquote(parsed.path).lstrip("/").split("/", 1)
+        return parts[0], (parts[1] if len(parts) > 1 else ""), parse_qs(parsed.query, keep_blank_values=True)
+
+    def do_HEAD(self):
+        bucket, key, _ = self._bucket_key()
+        if not key:
+            return self._send(200)
+        with self.store_lock:
+            size = self.objects.get(f"{bucket}/{key}")
+        if size is None:
+            return self._send(404)
+        self.send_response(200)
+        self.send_header("Content-Length", str(size))
+        self.end_headers()
+
+    def do_PUT(self):
+        bucket, key, query = self._bucket_key()
+        size, md5, body = self._read_body()
+        self.stats.add("s3_bytes_received", size)
+        if "uploadId" in query:
+            upload_id = query["uploadId"][0]
+            with self.store_lock:
+                parts = self.uploads.get(upload_id)
+                if parts is None:
+                    return self._send(404, "<Error><Code>NoSuchUpload</Code></Error>", "application/xml")
+                parts[int(query["partNumber"][0])] = size
+            self.stats.add("s3_parts")
+        else:
+            name = f"{bucket}/{key}"
+            with self.store_lock:
+                if self._precondition_failed(name):
+                    self.stats.add("s3_precondition_failed")
+                    return self._send(412, "<Error><Code>PreconditionFailed</Code></Error>", "application/xml")
+                self.objects[name] = size
+                if body is not None:
+                    self.small_objects[name] = (body, f'"{md5}"')
+                else:
+                    self.small_objects.pop(name, None)
+            self.stats.add("s3_puts")
+        self._send(200, headers={"ETag": f'"{md5}"'})
+
+    def do_POST(self):
+        bucket, key, query = self._bucket_key()
+        self._read_body()
+        if "uploads" in query:
+            upload_id = uuid.uuid4().hex
+            with self.store_lock:
+                self.uploads[upload_id] = {}
+            return self._send(200, (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<InitiateMultipartUploadResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                f'<Bucket>{bucket}</Bucket><Key>{key}</Key><UploadId>{upload_id}</UploadId>'
+                '</InitiateMultipartUploadResult>'
+            ), "application/xml")
+        if "uploadId" in query:
+            with self.store_lock:
+                parts = self.uploads.pop(query["uploadId"][0], None)
+                if parts is None:
+                    return self._send(404, "<Error><Code>NoSuchUpload</Code></Error>", "application/xml")
+                self.objects[f"{bucket}/{key}"] = sum(parts.values())
+                self.small_objects.pop(f"{bucket}/{key}", None)
+            self.stats.add("s3_multipart_completed")
+            return self._send(200, (
+                '<?xml version="1.0" encoding="UTF-8"?>'
+                '<CompleteMultipartUploadResult xmlns="http://s3.amazonaws.com/doc/2006-03-01/">'
+                f'<Bucket>{bucket}</Bucket><Key>{key}</Key><ETag>"{uuid.uuid4().hex}-{len(parts)}"</ETag>'
+                '</CompleteMultipartUploadResult>'
+            ), "application/xml")
+        return self._send(400, "<Error><Code>InvalidRequest</Code></Error>", "application/xml")
+
+    def do_DELETE(self):
+        _, _, query = self._bucket_key()
+        if "uploadId" in query:
+            with self.store_lock:
+                self.uploads.pop(query["uploadId"][0], None)
+            self.stats.add("s3_multipart_aborted")
+        self._send(204)
+
+
+class StandinProxyHandler(BaseHTTPRequestHandler):
+    """
+    Forwarding HTTP proxy for plain-http targets (no CONNECT). server.delay adds latency
+    to every request and server.fail answers 502 instead, so proxy pools can be exercised.
+    """
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests += 1
+        time.sleep(self.server.delay)
+        if self.server.fail:
+            self.send_response(502)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        target = urlparse(self.path)
+        upstream = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+        try:
+            headers = {name: value for name, value in self.headers.items()
+                       if name.lower() not in ("proxy-connection", "connection")}
+            upstream.request("GET", target.path + (f"?{target.query}" if target.query else ""), headers=headers)
+            response = upstream.getresponse()
+            self.send_response(response.status)
+            for name, value in response.getheaders():
+                if name.lower() not in ("connection", "transfer-encoding", "keep-alive"):
+                    self.send_header(name, value)
+            self.end_headers()
+            while True:
+                block = response.read(MEDIA_BLOCK_SIZE)
+                if not block:
+                    break
+                self.wfile.write(block)
+        finally:
+            upstream.close()
+
+
+def make_proxy(host="127.0.0.1", port=0, delay=0.0, fail=False):
+    """Stand-in forwarding proxy; flip server.delay and server.fail while it runs"""
+    server = ThreadingHTTPServer((host, port), StandinProxyHandler)
+    server.daemon_threads = True
+    server.delay = delay
+    server.fail = fail
+    server.requests = 0
+    return server
+
+
+def expected_media_digest(size_bytes):
+    """sha256 of the media bytes the stand-in serves for a file of size_bytes"""
+    digest = hashlib.sha256()
+    remaining = size_bytes
+    while remaining:
+        block = MEDIA_BLOCK[:min(remaining, MEDIA_BLOCK_SIZE)]
+        digest.update(block)
+        remaining -= len(block)
+    return digest.hexdigest()
+
+
+def make_server(catalog, host="127.0.0.1", port=0):
+    handler = type("BoundStandinHandler", (StandinHandler,), {
+        "catalog": catalog, "stats": StandinStats(), "objects": {}, "small_objects": {}, "uploads": {}
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def _serve(catalog, host, port, conn):
+    server = make_server(catalog, host, port)
+    conn.send(server.server_port)
+    server.serve_forever()
+
+
+def start_background(catalog, host="127.0.0.1", port=0):
+    """
+    Run the stand-ins in a child process, so their memory and CPU are not counted
+    against the pipeline being measured. Returns (process, base URL).
+    """
+    parent_conn, child_conn = multiprocessing.Pipe()
+    process = multiprocessing.Process(target=_serve, args=(catalog, host, port, child_conn), daemon=True)
+    process.start()
+    port = parent_conn.recv()
+    return process, f"http://{host}:{port}"
+
+
+FAKE_YTDLP = r'''"""yt_dlp stand-in: the slice of the YoutubeDL API ytdlp_engine uses, served from {base_url}"""
+import json
+import urllib.request
+from urllib.parse import urlparse, parse_qs
+
+from . import utils, version
+
+
+class YoutubeDL:
+    def __init__(self, params=None):
+        self.params = dict(params or {})
+        outtmpl = self.params.get("outtmpl") or "%(id)s.%(ext)s"
+        self.params["outtmpl"] = outtmpl if isinstance(outtmpl, dict) else {"default": outtmpl}
+
+    def _hook(self, **status):
+        for hook in self.params.get("progress_hooks") or []:
+            hook(status)
+
+    def extract_info(self, url, download=True, process=True):
+        if "/playlist" in url:
+            try:
+                with urllib.request.urlopen(url) as response:
+                    return json.loads(response.read().decode("utf-8"))
+            except Exception as e:
+                raise utils.DownloadError("ERROR: %s" % e)
+        video_id = parse_qs(urlparse(url).query).get("v", [url.rsplit("/", 1)[-1]])[0]
+        media_url = "{base_url}/media/" + video_id
+        info = {"id": video_id, "title": video_id, "ext": "mp4", "format_id": "18", "protocol": "http",
+                "url": media_url, "http_headers": dict(self.params.get("http_headers") or {}),
+                "subtitles": {"en": [{"ext": "vtt"}]}, "automatic_captions": {}}
+        if not download:
+            return info
+        path = self.params["outtmpl"]["default"].replace("%%", "%")
+        done = 0
+        try:
+            with urllib.request.urlopen(media_url) as response, open(path, "wb") as f:
+                total = int(response.headers.get("Content-Length") or 0) or None
+                while True:
+                    block = response.read(1024 * 1024)
+                    if not block:
+                        break
+                    f.write(block)
+                    done += len(block)
+                    self._hook(status="downloading", downloaded_bytes=done, total_bytes=total)
+        except Exception as e:
+            self._hook(status="error", downloaded_bytes=done)
+            raise utils.DownloadError("ERROR: %s" % e)
+        self._hook(status="finished", downloaded_bytes=done, total_bytes=done, filename=path)
+        info["requested_downloads"] = [dict(info, filepath=path)]
+        return info
+'''
+
+FAKE_YTDLP_UTILS = "class DownloadError(Exception):\n    pass\n"
+FAKE_YTDLP_VERSION = "__version__ = 'standin'\n"
+
+
+def write_fake_ytdlp(lib_dir, base_url):
+    """
+    Write a `yt_dlp` package into lib_dir that serves everything from the stand-ins.
+    Put lib_dir first on sys.path before ytdlp_engine is imported.
+    """
+    package_dir = os.path.join(lib_dir, "yt_dlp")
+    os.makedirs(package_dir, exist_ok=True)
+    for name, source in (("__init__.py", FAKE_YTDLP.replace("{base_url}", base_url)),
+                         ("utils.py", FAKE_YTDLP_UTILS), ("version.py", FAKE_YTDLP_VERSION)):
+        with open(os.path.join(package_dir, name), "w", encoding="utf-8") as f:
+            f.write(source)
+    return package_dir
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--dramas", type=int, default=2)
+    arg_parser.add_argument("--episodes", type=int, default=10)
+    arg_parser.add_argument("--size-mb", type=float, default=20)
+    arg_parser.add_argument("--host", default="127.0.0.1")
+    arg_parser.add_argument("--port", type=int, default=8765)
+    arg_parser.add_argument("--drop-after-mb", type=float, default=0, help="cut media responses after this many MB")
+    args = arg_parser.parse_args()
+
+    catalog = StandinCatalog(args.dramas, args.episodes, int(args.size_mb * 1024 * 1024),
+                             int(args.drop_after_mb * 1024 * 1024))
+    server = make_server(catalog, args.host, args.port)
+    print(f"Stand-ins for {args.dramas} dramas x {args.episodes} episodes at http://{args.host}:{server.server_port}")
+    for d in range(args.dramas):
+        print(f"  {catalog.drama_name(d)}: http://{args.host}:{server.server_port}/playlist?list={catalog.playlist_id(d)}")
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,207 @@
+import json
+import os
+import threading
+import time
+import bisect
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import tracing
+
+METRICS_PORT = int(os.environ.get("METRICS_PORT", "0"))                  # 0 disables the HTTP endpoint
+METRICS_SNAPSHOT_PATH = os.environ.get("METRICS_SNAPSHOT_PATH")           # Unset disables snapshots
+METRICS_SNAPSHOT_INTERVAL = int(os.environ.get("METRICS_SNAPSHOT_INTERVAL", "30"))
+
+# Latency buckets in seconds, from cache hits up to multi-minute downloads
+LATENCY_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600, 1800)
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)     # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def to_dict(self):
+        cumulative = 0
+        buckets = {}
+        for bound, count in zip(list(self.buckets) + ["+Inf"], self.counts):
+            cumulative += count
+            buckets[str(bound)] = cumulative
+        return {"count": self.count, "sum": round(self.sum, 6), "buckets": buckets}
+
+
+class MetricsRegistry:
+    """Thread-safe counters and latency histograms keyed by name and labels"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self.started_at = time.time()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted(labels.items()))
+
+    def inc(self, name, value=1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "timestamp": time.time(),
+                "uptime_seconds": round(time.time() - self.started_at, 3),
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self._counters.items())
+                ],
+                "histograms": [
+                    dict({"name": name, "labels": dict(labels)}, **histogram.to_dict())
+                    for (name, labels), histogram in sorted(self._histograms.items())
+                ],
+            }
+
+    def to_prometheus(self):
+        """Prometheus text exposition format"""
+        def fmt(labels, extra=None):
+            items = list(labels) + (extra or [])
+            if not items:
+                return ""
+            return "{" + ",".join(f'{k}="{str(v)}"' for k, v in items) + "}"
+
+        lines = []
+        with self._lock:
+            for (name, labels), value in sorted(self._counters.items()):
+                lines.append(f"{name}{fmt(labels)} {value}")
+            for (name, labels), histogram in sorted(self._histograms.items()):
+                cumulative = 0
+                for bound, count in zip(list(histogram.buckets) + ["+Inf"], histogram.counts):
+                    cumulative += count
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', bound)])} {cumulative}")
+                lines.append(f"{name}_sum{fmt(labels)} {histogram.sum}")
+                lines.append(f"{name}_count{fmt(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def inc(name, value=1, **labels):
+    registry.inc(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    registry.observe(name, value, **labels)
+
+
+class _StageTimer:
+    def __init__(self):
+        self.ok = True
+
+
+@contextmanager
+def timed(stage, **labels):
+    """
+    Time a unit of pipeline work. Records stage_seconds and stage_total{outcome}.
+    The outcome is "error" if the block raises or sets timer.ok = False.
+    """
+    timer = _StageTimer()
+    started = time.perf_counter()
+    try:
+        # Name the span after the strategy too, so the trace summary splits them apart
+        span_name = f"{stage}:{labels['strategy']}" if "strategy" in labels else stage
+        with tracing.span(span_name, category="stage", **labels):
+            yield timer
+    except BaseException:
+        timer.ok = False
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        observe("stage_seconds", elapsed, stage=stage, **labels)
+        inc("stage_total", stage=stage, outcome="ok" if timer.ok else "error", **labels)
+
+
+def add_bytes(direction, count, **labels):
+    """Bytes moved by a stage, e.g. add_bytes("download", n, strategy="yt-dlp")"""
+    if count:
+        inc("bytes_total", count, direction=direction, **labels)
+
+
+def retry(stage, **labels):
+    inc("retries_total", stage=stage, **labels)
+    tracing.instant("retry", stage=stage, **labels)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith("/metrics.json"):
+            body = json.dumps(registry.snapshot(), indent=2).encode("utf-8")
+            content_type = "application/json"
+        elif self.path.startswith("/metrics"):
+            body = registry.to_prometheus().encode("utf-8")
+            content_type = "text/plain; version=0.0.4"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port=METRICS_PORT, host="127.0.0.1"):
+    """Serve /metrics (Prometheus text) and /metrics.json on a daemon thread"""
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    print(f"📊 Metrics at http://{host}:{server.server_port}/metrics")
+    return server
+
+
+def write_snapshot(path=METRICS_SNAPSHOT_PATH):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(registry.snapshot(), f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def start_snapshot_writer(path=METRICS_SNAPSHOT_PATH, interval=METRICS_SNAPSHOT_INTERVAL):
+    """Rewrite a JSON snapshot of every metric at path every interval seconds"""
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                write_snapshot(path)
+            except Exception as e:
+                print(f"⚠ Metrics snapshot failed: {str(e)}")
+
+    threading.Thread(target=loop, name="metrics-snapshot", daemon=True).start()
+    print(f"📊 Metrics snapshot every {interval}s to {path}")
+
+
+def start_from_env():
+    """Start whichever exporters METRICS_PORT / METRICS_SNAPSHOT_PATH ask for"""
+    if METRICS_PORT:
+        start_http_server(METRICS_PORT)
+    if METRICS_SNAPSHOT_PATH:
+        start_snapshot_writer(METRICS_SNAPSHOT_PATH)
@@ -0,0 +1,171 @@
+import contextlib
+import os
+import random
+import threading
+import time
+
+import requests
+
+import http_client
+import metrics
+
+DIRECT = "direct"                      # Pool entry meaning "no proxy"
+PROXY_HEALTH_URL = os.environ.get("PROXY_HEALTH_URL", "https://www.youtube.com/generate_204")
+PROXY_HEALTH_INTERVAL = 60             # Seconds between background probes of every proxy
+PROXY_HEALTH_TIMEOUT = 5
+EJECT_AFTER_FAILURES = 3               # Consecutive failures that take a proxy out of rotation
+READMIT_AFTER = 120                    # Seconds an ejected proxy waits before a passing probe readmits it
+LATENCY_ALPHA = 0.3                    # Weight of the newest sample in the latency and success averages
+# Errors that say the proxy itself failed; anything else (HTTP errors, bad pages, disk) is the attempt's own
+PROXY_ERRORS = (requests.exceptions.ProxyError, requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+
+
+class ProxyStats:
+    def __init__(self, proxy):
+        self.proxy = proxy
+        self.latency = 1.0             # Seconds; moving average of successful requests and probes
+        self.success_rate = 1.0
+        self.consecutive_failures = 0
+        self.ejected_at = None
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def healthy(self):
+        return self.ejected_at is None
+
+    def weight(self):
+        # Fast, reliable proxies get most of the traffic; slow ones still see some
+        return self.success_rate ** 2 / (self.latency + 0.05)
+
+
+class ProxyPool:
+    """
+    Thread-safe proxy rotation weighted by observed latency and success. Proxies that fail
+    EJECT_AFTER_FAILURES times in a row are ejected; the background health probe readmits
+    them once they answer again. The direct connection is never ejected.
+    """
+
+    def __init__(self, proxies, health_url=PROXY_HEALTH_URL, interval=PROXY_HEALTH_INTERVAL):
+        self.health_url = health_url
+        self.interval = interval
+        self._stats = {proxy: ProxyStats(proxy) for proxy in proxies}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def proxies(self):
+        return list(self._stats)
+
+    @staticmethod
+    def as_requests(proxy):
+        """requests-style proxies dict for a pool entry (None for a direct connection)"""
+        return None if proxy in (None, DIRECT) else {'http': proxy, 'https': proxy}
+
+    def choose(self):
+        """Pick a proxy for one attempt, weighted towards fast, healthy ones"""
+        with self._lock:
+            healthy = [stats for stats in self._stats.values() if stats.healthy]
+            if not healthy:
+                # Everything is ejected: use whichever failed least recently rather than nothing
+                return min(self._stats.values(), key=lambda stats: stats.ejected_at).proxy
+            return random.choices(healthy, weights=[stats.weight() for stats in healthy])[0].proxy
+
+    def report(self, proxy, success, seconds=None):
+        """Record the outcome of a request made through proxy"""
+        with self._lock:
+            stats = self._stats.get(proxy)
+            if stats is None:
+                return
+            stats.requests += 1
+            stats.success_rate = (1 - LATENCY_ALPHA) * stats.success_rate + LATENCY_ALPHA * (1.0 if success else 0.0)
+            if success:
+                stats.consecutive_failures = 0
+                if seconds is not None:
+                    stats.latency = (1 - LATENCY_ALPHA) * stats.latency + LATENCY_ALPHA * seconds
+                return
+            stats.failures += 1
+            stats.consecutive_failures += 1
+            if stats.healthy and proxy != DIRECT and stats.consecutive_failures >= EJECT_AFTER_FAILURES:
+                stats.ejected_at = time.time()
+                print(f"⚠ Proxy {proxy} ejected after {stats.consecutive_failures} failures in a row")
+                metrics.inc("proxy_ejections_total", proxy=proxy)
+
+    @contextlib.contextmanager
+    def lease(self):
+        """
+        Choose a proxy for one attempt and yield its requests proxies dict. One of
+        PROXY_ERRORS escaping the block counts as a failure of that proxy, any other
+        exception leaves its record alone, and leaving normally counts as a success.
+        Latency comes from the health probes, since download time mostly measures size.
+        """
+        proxy = self.choose()
+        try:
+            yield self.as_requests(proxy)
+        except PROXY_ERRORS:
+            self.report(proxy, False)
+            raise
+        self.report(proxy, True)
+
+    def _readmit(self, proxy, seconds):
+        with self._lock:
+            stats = self._stats[proxy]
+            if stats.healthy or time.time() - stats.ejected_at < READMIT_AFTER:
+                return
+            stats.ejected_at = None
+            stats.consecutive_failures = 0
+            stats.success_rate = 0.5          # On probation until it proves itself again
+            stats.latency = seconds
+        print(f"✓ Proxy {proxy} readmitted ({seconds * 1000:.0f} ms probe)")
+        metrics.inc("proxy_readmissions_total", proxy=proxy)
+
+    def probe(self, proxy):
+        """One health check through proxy; feeds the same statistics as real traffic"""
+        started = time.time()
+        try:
+            response = http_client.get_session().get(
+                self.health_url, proxies=self.as_requests(proxy), timeout=PROXY_HEALTH_TIMEOUT
+            )
+            ok = response.status_code < 500
+        except Exception:
+            ok = False
+        elapsed = time.time() - started
+        with self._lock:
+            ejected = not self._stats[proxy].healthy
+        if ok and ejected:
+            self._readmit(proxy, elapsed)
+        elif not ejected:
+            self.report(proxy, ok, elapsed)
+        return ok
+
+    def probe_all(self):
+        for proxy in list(self._stats):
+            self.probe(proxy)
+
+    def start_health_checks(self):
+        """Probe every proxy now and then every interval seconds on a daemon thread"""
+        if self._thread is not None:
+            return
+
+        def loop():
+            while not self._stop.is_set():
+                self.probe_all()
+                self._stop.wait(self.interval)
+
+        self._thread = threading.Thread(target=loop, name="proxy-health", daemon=True)
+        self._thread.start()
+
+    def stop_health_checks(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=PROXY_HEALTH_TIMEOUT + 1)
+            self._thread = None
+
+    def summary(self):
+        """(proxy, healthy, latency, success rate, requests, failures) rows"""
+        with self._lock:
+            return [
+                (stats.proxy, stats.healthy, stats.latency, stats.success_rate, stats.requests, stats.failures)
+                for stats in self._stats.values()
+            ]
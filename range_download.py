@@ -0,0 +1,124 @@
+import os
+import concurrent.futures
+
+import http_client
+import metrics
+
+RANGE_CHUNK_SIZE = 1024 * 1024             # Read and write size; 8 KB chunks cost a syscall per packet
+RANGE_SEGMENTS = int(os.environ.get("RANGE_SEGMENTS", "4"))   # Parallel range requests per media URL
+MIN_SEGMENT_SIZE = 8 * 1024 * 1024          # Below this splitting costs more round trips than it saves
+RANGE_RETRIES = 5                           # Reconnects in a row without progress before giving up
+
+
+class RangeDownloadError(Exception):
+    pass
+
+
+def _probe_length(session, url, headers, proxies, timeout):
+    """(content length or None, whether the server honours byte ranges)"""
+    try:
+        response = session.get(url, headers=dict(headers, Range="bytes=0-0"), proxies=proxies,
+                               timeout=timeout, stream=True)
+        response.close()
+    except Exception:
+        return None, False
+    if response.status_code == 206:
+        content_range = response.headers.get("Content-Range", "")       # bytes 0-0/12345
+        total = content_range.rsplit("/", 1)[-1]
+        return (int(total) if total.isdigit() else None), True
+    if response.status_code == 200 and response.headers.get("Content-Length", "").isdigit():
+        return int(response.headers["Content-Length"]), False
+    return None, False
+
+
+class _Segment:
+    def __init__(self, start, end):
+        self.start = start
+        self.end = end                              # Inclusive; None means "until EOF"
+        self.next = start
+
+    @property
+    def done(self):
+        return self.end is not None and self.next > self.end
+
+
+def _fetch_segment(session, url, headers, proxies, timeout, fd, segment):
+    """
+    Fill one segment with pwrite, reconnecting from the last written byte after a drop.
+    Only attempts that write nothing count against RANGE_RETRIES.
+    """
+    failures = 0
+    while not segment.done:
+        range_header = f"bytes={segment.next}-" + ("" if segment.end is None else str(segment.end))
+        started_at = segment.next
+        try:
+            with session.get(url, headers=dict(headers, Range=range_header), proxies=proxies,
+                             timeout=timeout, stream=True) as response:
+                if response.status_code == 416 and segment.end is None:
+                    return                                   # Nothing left past segment.next
+                if response.status_code == 200 and (segment.start or segment.next > segment.start):
+                    if segment.start:
+                        raise RangeDownloadError("server ignored the Range header")
+                    segment.next = started_at = 0            # Whole body again; overwrite from the top
+                response.raise_for_status()
+                for chunk in response.iter_content(chunk_size=RANGE_CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    os.pwrite(fd, chunk, segment.next)
+                    segment.next += len(chunk)
+            if segment.end is None:
+                return                                       # Unknown length: a clean EOF is the end
+            if segment.done:
+                return
+            error = "connection closed early"
+        except RangeDownloadError:
+            raise
+        except Exception as e:
+            error = str(e)
+        failures = 0 if segment.next > started_at else failures + 1
+        if failures >= RANGE_RETRIES:
+            raise RangeDownloadError(f"segment {segment.start}-{segment.end} stalled at byte {segment.next}: {error}")
+        metrics.retry("range_download")
+        print(f"  ↻ Range {range_header} dropped at byte {segment.next}: {error}")
+
+
+def download_url(url, output_path, session=None, headers=None, proxies=None, segments=RANGE_SEGMENTS,
+                 timeout=http_client.DEFAULT_TIMEOUT):
+    """
+    Download url to output_path with 1 MB buffers. A dropped connection resumes with a Range
+    request from the last byte written. Known-length media on a range-capable server is
+    split into parallel segments written in place.
+    Returns the number of bytes in the finished file.
+    """
+    session = session or http_client.get_session()
+    headers = dict(headers or {})
+    length, ranges = _probe_length(session, url, headers, proxies, timeout)
+
+    count = segments if ranges and length else 1
+    count = max(1, min(count, (length or 0) // MIN_SEGMENT_SIZE))
+    if length and count > 1:
+        step = length // count
+        parts = [_Segment(i * step, (i + 1) * step - 1 if i < count - 1 else length - 1) for i in range(count)]
+    else:
+        parts = [_Segment(0, length - 1 if length else None)]
+    with open(output_path, "wb") as f:
+        if length and ranges:
+            f.truncate(length)                               # Segments are written in place
+
+    fd = os.open(output_path, os.O_RDWR)
+    try:
+        if len(parts) == 1:
+            _fetch_segment(session, url, headers, proxies, timeout, fd, parts[0])
+        else:
+            print(f"  ⇉ {len(parts)} parallel range segments for {length / (1024 * 1024):.1f} MB")
+            with concurrent.futures.ThreadPoolExecutor(max_workers=len(parts), thread_name_prefix="range") as executor:
+                for future in [executor.submit(_fetch_segment, session, url, headers, proxies, timeout,
+                                               fd, part) for part in parts]:
+                    future.result()
+    finally:
+        os.close(fd)
+
+    size = os.path.getsize(output_path)
+    if length and size != length:
+        raise RangeDownloadError(f"expected {length} bytes, got {size}")
+    return size
@@ -0,0 +1,153 @@
+import threading
+import concurrent.futures
+
+# S3 rejects multipart parts smaller than 5 MB (except the last one)
+MIN_PART_SIZE = 5 * 1024 * 1024
+DEFAULT_PART_SIZE = 16 * 1024 * 1024
+DEFAULT_UPLOAD_THREADS = 4
+READ_CHUNK_SIZE = 1024 * 1024
+
+
+class S3MultipartWriter:
+    """
+    File-like sink that uploads written bytes to S3 as a multipart upload.
+    Parts are uploaded on background threads while the caller keeps writing, so a
+    download piped into this writer overlaps with the upload and never touches disk.
+    At most max_workers + 1 parts are held in memory at any time.
+    """
+
+    def __init__(self, s3_client, bucket, key, part_size=DEFAULT_PART_SIZE,
+                 max_workers=DEFAULT_UPLOAD_THREADS, extra_args=None):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.key = key
+        self.part_size = max(part_size, MIN_PART_SIZE)
+        self.extra_args = extra_args or {}
+        self.bytes_written = 0
+        self.closed = False
+
+        self._buffer = bytearray()
+        self._upload_id = None
+        self._parts = {}
+        self._futures = []
+        self._next_part_number = 1
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="s3-part"
+        )
+        # Bounds buffered parts so a fast download cannot outrun the upload by gigabytes
+        self._slots = threading.BoundedSemaphore(max_workers + 1)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        if self.closed:
+            raise ValueError("write to closed S3MultipartWriter")
+        self._buffer.extend(data)
+        self.bytes_written += len(data)
+        while len(self._buffer) >= self.part_size:
+            part = bytes(self._buffer[:self.part_size])
+            del self._buffer[:self.part_size]
+            self._submit_part(part)
+        return len(data)
+
+    def _submit_part(self, body):
+        if self._upload_id is None:
+            response = self.s3_client.create_multipart_upload(
+                Bucket=self.bucket, Key=self.key, **self.extra_args
+            )
+            self._upload_id = response['UploadId']
+        self._raise_failed_parts()
+        part_number = self._next_part_number
+        self._next_part_number += 1
+        self._slots.acquire()
+        self._futures.append(self._executor.submit(self._upload_part, part_number, body))
+
+    def _upload_part(self, part_number, body):
+        try:
+            response = self.s3_client.upload_part(
+                Bucket=self.bucket,
+                Key=self.key,
+                UploadId=self._upload_id,
+                PartNumber=part_number,
+                Body=body
+            )
+            self._parts[part_number] = response['ETag']
+        finally:
+            self._slots.release()
+
+    def _raise_failed_parts(self):
+        for future in self._futures:
+            if future.done() and future.exception():
+                raise future.exception()
+
+    def close(self):
+        """Flush the remaining bytes and complete the upload"""
+        if self.closed:
+            return
+        try:
+            if self._upload_id is None:
+                # Everything fit in one part: a single PUT is cheaper than a multipart upload
+                self.s3_client.put_object(
+                    Bucket=self.bucket, Key=self.key, Body=bytes(self._buffer), **self.extra_args
+                )
+            else:
+                if self._buffer:
+                    self._submit_part(bytes(self._buffer))
+                for future in self._futures:
+                    future.result()
+                self.s3_client.complete_multipart_upload(
+                    Bucket=self.bucket,
+                    Key=self.key,
+                    UploadId=self._upload_id,
+                    MultipartUpload={'Parts': [
+                        {'PartNumber': number, 'ETag': self._parts[number]}
+                        for number in sorted(self._parts)
+                    ]}
+                )
+            self._buffer = bytearray()
+            self.closed = True
+        except Exception:
+            self.abort()
+            raise
+        finally:
+            self._executor.shutdown(wait=True)
+
+    def abort(self):
+        """Drop buffered data and cancel the multipart upload so S3 does not keep orphan parts"""
+        if self.closed:
+            return
+        self.closed = True
+        self._buffer = bytearray()
+        for future in self._futures:
+            future.cancel()
+        self._executor.shutdown(wait=True)
+        if self._upload_id is not None:
+            try:
+                self.s3_client.abort_multipart_upload(
+                    Bucket=self.bucket, Key=self.key, UploadId=self._upload_id
+                )
+            except Exception as e:
+                print(f"⚠ Failed to abort multipart upload for {self.key}: {str(e)}")
+
+
+def stream_response(response, writer, chunk_size=READ_CHUNK_SIZE):
+    """Copy a streaming requests response into writer and return the number of bytes copied"""
+    response.raise_for_status()
+    copied = 0
+    for chunk in response.iter_content(chunk_size=chunk_size):
+        if chunk:
+            writer.write(chunk)
+            copied += len(chunk)
+    return copied
+
@@ -0,0 +1,144 @@
+import os
+import sqlite3
+import threading
+import time
+
+SCOREBOARD_PATH = os.environ.get("STRATEGY_SCOREBOARD_PATH", os.path.join(".cache", "strategy_scoreboard.sqlite3"))
+SCORE_ALPHA = 0.2                  # Weight of the newest outcome in the moving success rate and latency
+COOLDOWN_FAILURES = 3              # Consecutive failures (any video) that put a strategy on cooldown...
+COOLDOWN_SECONDS = 15 * 60         # ...for this long, after which it gets one probe attempt
+VIDEO_FAILURE_LIMIT = 2            # Failures of one strategy on one video before it is skipped for that video
+VIDEO_FAILURE_WINDOW = 12 * 3600   # How long per-video failures are remembered
+
+
+class StrategyScoreboard:
+    """
+    Persistent success rate and latency per download strategy, plus recent failures per
+    (video, strategy). Used to try the strategy most likely to work first, skip strategies
+    that are currently failing everywhere, and give up early on videos every strategy has
+    recently failed. Safe to share between threads.
+    """
+
+    def __init__(self, path=SCOREBOARD_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS strategy_stats (
+                strategy TEXT PRIMARY KEY,
+                attempts INTEGER NOT NULL,
+                successes INTEGER NOT NULL,
+                success_rate REAL NOT NULL,
+                latency REAL NOT NULL,
+                consecutive_failures INTEGER NOT NULL,
+                last_failure_at REAL
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS video_failures (
+                video_id TEXT NOT NULL,
+                strategy TEXT NOT NULL,
+                failures INTEGER NOT NULL,
+                last_failure_at REAL NOT NULL,
+                PRIMARY KEY (video_id, strategy)
+            )
+        """)
+
+    def record(self, strategy, video_id, success, seconds):
+        """Fold one attempt's outcome into the strategy's score and the video's failure history"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT attempts, successes, success_rate, latency, consecutive_failures, last_failure_at "
+                "FROM strategy_stats WHERE strategy = ?",
+                (strategy,)
+            ).fetchone()
+            if row is None:
+                attempts, successes, rate, latency, streak, last_failure = 0, 0, 1.0, seconds, 0, None
+            else:
+                attempts, successes, rate, latency, streak, last_failure = row
+            rate = (1 - SCORE_ALPHA) * rate + SCORE_ALPHA * (1.0 if success else 0.0)
+            latency = (1 - SCORE_ALPHA) * latency + SCORE_ALPHA * seconds
+            if success:
+                successes += 1
+                streak = 0
+            else:
+                streak += 1
+                last_failure = now
+            self._conn.execute(
+                "INSERT OR REPLACE INTO strategy_stats VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (strategy, attempts + 1, successes, rate, latency, streak, last_failure)
+            )
+
+            if success:
+                self._conn.execute("DELETE FROM video_failures WHERE video_id = ?", (video_id,))
+            else:
+                self._conn.execute(
+                    "INSERT INTO video_failures VALUES (?, ?, 1, ?) "
+                    "ON CONFLICT (video_id, strategy) DO UPDATE SET "
+                    "failures = CASE WHEN last_failure_at < ? THEN 1 ELSE failures + 1 END, "
+                    "last_failure_at = excluded.last_failure_at",
+                    (video_id, strategy, now, now - VIDEO_FAILURE_WINDOW)
+                )
+
+    def order(self, strategies, video_id):
+        """
+        Reorder strategies, a list of tuples whose first item is the strategy name.
+        Strategies that recently failed this video are dropped, and so are strategies on
+        cooldown (unless nothing else is left). An empty list means every strategy has
+        recently failed this video.
+        """
+        now = time.time()
+        with self._lock:
+            stats = {
+                row[0]: row[1:] for row in self._conn.execute(
+                    "SELECT strategy, success_rate, latency, consecutive_failures, last_failure_at "
+                    "FROM strategy_stats"
+                )
+            }
+            failed_here = {
+                row[0] for row in self._conn.execute(
+                    "SELECT strategy FROM video_failures "
+                    "WHERE video_id = ? AND failures >= ? AND last_failure_at >= ?",
+                    (video_id, VIDEO_FAILURE_LIMIT, now - VIDEO_FAILURE_WINDOW)
+                )
+            }
+
+        candidates = [strategy for strategy in strategies if strategy[0] not in failed_here]
+        if not candidates:
+            return []
+
+        def cooling(name):
+            rate, latency, streak, last_failure = stats.get(name, (1.0, 0.0, 0, None))
+            return streak >= COOLDOWN_FAILURES and last_failure and now - last_failure < COOLDOWN_SECONDS
+
+        ready = [strategy for strategy in candidates if not cooling(strategy[0])]
+        if not ready:
+            # Everything is cooling down: probe the one that failed longest ago
+            ready = [min(candidates, key=lambda strategy: stats[strategy[0]][3])]
+
+        def rank(strategy):
+            if strategy[0] not in stats:
+                # Untried: after every tried strategy, in configured order. It still runs
+                # whenever the tried ones all fail, and ranks on its own record from then on.
+                return 1, 0.0, 0.0
+            rate, latency = stats[strategy[0]][:2]
+            # Coarse rate buckets, so latency only decides between strategies that work about equally well
+            return 0, -round(rate, 1), latency
+
+        return sorted(ready, key=rank)
+
+    def summary(self):
+        """(strategy, attempts, successes, success rate, latency, consecutive failures) rows"""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT strategy, attempts, successes, success_rate, latency, consecutive_failures "
+                "FROM strategy_stats ORDER BY success_rate DESC"
+            ).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,108 @@
+import os
+import re
+
+DEBUG = os.environ.get("TITLE_PARSER_DEBUG") == "1"   # Print the per-title trace
+
+# Common EC2 title artifacts
+_TRAILING_K = re.compile(r'\s*[kK]\b')
+_NON_WORD = re.compile(r'\W+')
+
+
+class TitleRule:
+    """One way of reading an episode number out of a cleaned title"""
+
+    def __init__(self, name, pattern, handler=None, from_end=False):
+        self.name = name
+        self.regex = re.compile(pattern, re.IGNORECASE) if isinstance(pattern, str) else pattern
+        if handler is not None:
+            self.handler = handler
+        elif from_end:
+            # "2nd last" style: count back from max_episode
+            self.handler = lambda m, max_episode: max_episode - (int(m.group(1)) - 1)
+        else:
+            self.handler = lambda m, max_episode: int(m.group(1))
+
+    @classmethod
+    def from_config(cls, spec):
+        """Build a rule from a dramas-config entry: {"name": ..., "pattern": ..., "from_end": bool}"""
+        return cls(spec.get("name", spec["pattern"]), spec["pattern"], from_end=spec.get("from_end", False))
+
+
+DEFAULT_RULES = [
+    TitleRule("ordinal_last", r'(\d+)(?:st|nd|rd|th)\s+last', from_end=True),
+    TitleRule("simple_last", r'\blast\s+episode', handler=lambda m, max_episode: max_episode),
+    TitleRule("standard_ep", r'episode\s+(\d+)'),
+    TitleRule("compact_ep", r'\bep?(\d+)\b'),
+    TitleRule("number_prefix", r'\b(\d+)\s+-\s+'),
+]
+
+
+class TitleParser:
+    """
+    Episode-number extraction with rules compiled once. Drama-specific rules are tried
+    before the defaults. Silent unless debug is on.
+    """
+
+    def __init__(self, extra_rules=None, debug=None):
+        self.rules = list(extra_rules or []) + DEFAULT_RULES
+        self.debug = DEBUG if debug is None else debug
+
+    def _log(self, message):
+        if self.debug:
+            print(message)
+
+    def parse(self, title, max_episode=None):
+        """Episode number for one title, or None"""
+        self._log(f"\n🔢 Extracting from: '{title}'")
+        clean_title = _NON_WORD.sub(' ', _TRAILING_K.sub('', title)).strip()
+        self._log(f"  🧹 Cleaned Title: '{clean_title}'")
+
+        # Check for numeric titles first
+        if clean_title.isdigit():
+            num = int(clean_title)
+            self._log(f"  🔍 Numeric Title: {num}")
+            if max_episode and num <= max_episode:
+                return num
+            self._log(f"  ❌ Exceeds max episode {max_episode}")
+            return None
+
+        for rule in self.rules:
+            match = rule.regex.search(clean_title)
+            if match:
+                try:
+                    num = rule.handler(match, max_episode)
+                    self._log(f"  ✅ Matched {rule.name}: {num}")
+                    if max_episode and num > max_episode:
+                        self._log(f"  ❌ Exceeds max episode {max_episode}")
+                        continue
+                    return num
+                except Exception as e:
+                    self._log(f"  🚨 Error in {rule.name} handler: {str(e)}")
+
+        self._log("  ❌ No valid patterns matched")
+        return None
+
+    def parse_many(self, titles, max_episode=None):
+        """Episode numbers for many titles; repeated titles are parsed once"""
+        seen = {}
+        results = []
+        for title in titles:
+            if title not in seen:
+                seen[title] = self.parse(title, max_episode)
+            results.append(seen[title])
+        return results
+
+
+_default_parser = TitleParser()
+_drama_parsers = {}
+
+
+def get_parser(title_rules=None):
+    """Parser for a drama's title_rules config (None for the defaults), built once and reused"""
+    if not title_rules:
+        return _default_parser
+    key = tuple((spec["pattern"], spec.get("from_end", False)) for spec in title_rules)
+    parser = _drama_parsers.get(key)
+    if parser is None:
+        parser = _drama_parsers[key] = TitleParser([TitleRule.from_config(spec) for spec in title_rules])
+    return parser
@@ -0,0 +1,128 @@
+import json
+import os
+import threading
+import time
+import functools
+from contextlib import contextmanager
+
+TRACE_PATH = os.environ.get("TRACE_PATH", "trace.json")   # Open in ui.perfetto.dev or chrome://tracing
+
+ENABLED = False
+_events = []
+_named_threads = set()
+_lock = threading.Lock()
+_started = time.perf_counter()
+_pid = os.getpid()
+
+
+def enable():
+    """Start recording spans; until this is called every span is a no-op"""
+    global ENABLED, _started
+    with _lock:
+        _events.clear()
+        _named_threads.clear()
+        _started = time.perf_counter()
+        ENABLED = True
+
+
+def _now_us():
+    return (time.perf_counter() - _started) * 1e6
+
+
+def _record(event):
+    tid = threading.get_native_id()
+    event["pid"] = _pid
+    event["tid"] = tid
+    with _lock:
+        if tid not in _named_threads:
+            _named_threads.add(tid)
+            _events.append({
+                "name": "thread_name", "ph": "M", "pid": _pid, "tid": tid,
+                "args": {"name": threading.current_thread().name}
+            })
+        _events.append(event)
+
+
+@contextmanager
+def span(name, category="pipeline", **args):
+    """Record the enclosed block as one complete ("X") event on the current thread"""
+    if not ENABLED:
+        yield
+        return
+    start = _now_us()
+    try:
+        yield
+    except BaseException as e:
+        args["error"] = type(e).__name__
+        raise
+    finally:
+        _record({
+            "name": name, "cat": category, "ph": "X",
+            "ts": round(start, 1), "dur": round(_now_us() - start, 1),
+            "args": {k: str(v) for k, v in args.items()}
+        })
+
+
+def traced(name=None, category="pipeline"):
+    """Decorator form of span; the call's leading arguments are attached to the event"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            shown = [a for a in args if isinstance(a, (str, int, float))][:3]
+            with span(span_name, category, call=", ".join(str(a)[:80] for a in shown)):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def instant(name, category="pipeline", **args):
+    """Mark a point in time, e.g. a retry"""
+    if ENABLED:
+        _record({
+            "name": name, "cat": category, "ph": "i", "s": "t",
+            "ts": round(_now_us(), 1), "args": {k: str(v) for k, v in args.items()}
+        })
+
+
+def sleep(seconds, reason="sleep"):
+    """time.sleep that shows up in the trace, so fixed delays can be told apart from real I/O"""
+    with span(reason, category="sleep", seconds=round(seconds, 3)):
+        time.sleep(seconds)
+
+
+def write(path=TRACE_PATH):
+    """Write the recorded events as Chrome trace / Perfetto JSON"""
+    with _lock:
+        events = list(_events)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    print(f"📈 Wrote {len(events)} trace events to {path}")
+
+
+def summarize():
+    """Print wall time per span name and category, and how much of it was sleeping"""
+    with _lock:
+        events = [e for e in _events if e["ph"] == "X"]
+    if not events:
+        return
+    wall = max(e["ts"] + e["dur"] for e in events) - min(e["ts"] for e in events)
+    totals = {}
+    for event in events:
+        key = (event["cat"], event["name"])
+        count, duration = totals.get(key, (0, 0.0))
+        totals[key] = (count + 1, duration + event["dur"])
+
+    print("\n" + "=" * 50)
+    print(f"TRACE SUMMARY (wall time {wall / 1e6:.1f}s)")
+    for (category, name), (count, duration) in sorted(totals.items(), key=lambda item: -item[1][1]):
+        print(f"  {category:>8} {name:<28} {count:>6}x {duration / 1e6:>9.1f}s")
+    sleep_total = sum(duration for (category, _), (_, duration) in totals.items() if category == "sleep")
+    episode_total = totals.get(("pipeline", "episode"), (0, 0.0))[1]
+    print(f"  Time in fixed sleeps: {sleep_total / 1e6:.1f}s across all threads")
+    if episode_total and wall:
+        print(f"  Episode overlap: {episode_total / wall:.2f} episodes in flight on average")
+    print("=" * 50)
@@ -0,0 +1,89 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+
+TRANSCRIPT_CACHE_PATH = os.environ.get("TRANSCRIPT_CACHE_PATH", os.path.join(".cache", "transcripts.sqlite3"))
+TRANSCRIPT_MISSING_TTL = 24 * 3600   # "No transcript in this language" is re-checked after a day
+
+
+class TranscriptCache:
+    """
+    Persistent raw transcript segments per (video id, language), plus which drama episode
+    each video was saved as. Fetched transcripts never expire; a missing language is
+    remembered for missing_ttl seconds. Safe to share between threads.
+    """
+
+    def __init__(self, path=TRANSCRIPT_CACHE_PATH, missing_ttl=TRANSCRIPT_MISSING_TTL):
+        self.path = path
+        self.missing_ttl = missing_ttl
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS transcripts (
+                video_id TEXT NOT NULL,
+                lang TEXT NOT NULL,
+                segments TEXT,
+                fetched_at REAL NOT NULL,
+                PRIMARY KEY (video_id, lang)
+            )
+        """)
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS transcript_episodes (
+                drama TEXT NOT NULL,
+                episode INTEGER NOT NULL,
+                video_id TEXT NOT NULL,
+                PRIMARY KEY (drama, episode)
+            )
+        """)
+
+    def get(self, video_id, lang):
+        """
+        (True, segments) for a cached transcript, (True, None) for a language recently found
+        missing, or (False, None) when the network has to be asked
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT segments, fetched_at FROM transcripts WHERE video_id = ? AND lang = ?",
+                (video_id, lang)
+            ).fetchone()
+        if row is None:
+            return False, None
+        if row[0] is None:
+            return time.time() - row[1] <= self.missing_ttl, None
+        return True, json.loads(row[0])
+
+    def put(self, video_id, lang, segments):
+        """Store raw segments ([{'text', 'start', 'duration'}, ...]), or None for a missing language"""
+        payload = None if segments is None else json.dumps(segments, ensure_ascii=False)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcripts VALUES (?, ?, ?, ?)",
+                (video_id, lang, payload, time.time())
+            )
+
+    def record_episode(self, drama, episode, video_id):
+        """Remember that video_id was saved as this drama episode, for offline re-exports"""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO transcript_episodes VALUES (?, ?, ?)",
+                (drama, episode, video_id)
+            )
+
+    def episodes(self, drama=None):
+        """(drama, episode, video id) rows, optionally for one drama"""
+        query = "SELECT drama, episode, video_id FROM transcript_episodes"
+        params = ()
+        if drama is not None:
+            query += " WHERE drama = ?"
+            params = (drama,)
+        with self._lock:
+            return self._conn.execute(query + " ORDER BY drama, episode", params).fetchall()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,17 +1,39 @@
 import os
 import re
-import requests
+import argparse
+import codecs
+import http_client
+import metrics
+import tracing
 import json
 import html
-from time import sleep
+import time
+import asyncio
+import concurrent.futures
+import threading
+from dataclasses import dataclass, field
+from urllib.parse import urlparse
 from pytube import Playlist, YouTube
 from youtube_transcript_api import YouTubeTranscriptApi
 from youtube_transcript_api._errors import TranscriptsDisabled, NoTranscriptFound
+from video_cache import VideoInfoCache, VIDEO_CACHE_PATH
+from transcript_cache import TranscriptCache, TRANSCRIPT_CACHE_PATH
+from transcript_store import TranscriptStore, store_path, update_store, export_episode
+from transcript_index import TranscriptIndex, TRANSCRIPT_INDEX_PATH
+from title_parser import get_parser
+from ytdlp_engine import get_engine
 
 # Define missing constants
 RETRY_ATTEMPTS = 3          # Number of retry attempts for HTTP requests and transcript fetching
 REQUEST_DELAY = 2           # Delay (in seconds) between retry attempts
 MIN_DURATION = 60           # Minimum duration (in seconds) for a video to be processed
+PROBE_CHUNK_SIZE = 32 * 1024   # Watch-page bytes read per step by probe_video
+METADATA_CONCURRENCY = 8       # Videos resolved at once by resolve_playlist
+METADATA_RATE_PER_HOST = 5.0   # Metadata lookups started per second against any one host
+TRANSCRIPT_DIR = "transcripts"   # One <drama>.tstore per drama; text files are exported on demand
+TRANSCRIPT_CONCURRENCY = int(os.environ.get("TRANSCRIPT_CONCURRENCY", "4"))   # Episodes whose transcripts are fetched at once
+# Overridable so the pipeline can run against local stand-ins (see local_standins.py)
+YOUTUBE_BASE_URL = os.environ.get("YOUTUBE_BASE_URL", "https://www.youtube.com").rstrip('/')
 
 def generate_episode_data(total_episodes, max_episodes=None, manual_data=None):
     """
@@ -25,6 +47,8 @@ def generate_episode_data(total_episodes, max_episodes=None, manual_data=None):
         return (manual_data, max_episodes)
     return ([i + 1 for i in range(total_episodes)], max_episodes)
 
+# Each drama may add "title_rules": [{"name": ..., "pattern": r"...(\d+)...", "from_end": False}],
+# tried before the default rules in title_parser.py when its titles follow an unusual convention.
 dramas = {
     "Daraar": {
         "link": "https://www.youtube.com/playlist?list=PLdZNFVCDo_1cOWnp-bw3x8CxOw7bMxRt-",
@@ -76,7 +100,9 @@ dramas = {
     },
     "Jaan Se Pyara Juni": {
         "link": "https://www.youtube.com/watch?v=FQxDh-pKXj0&list=PLbVdwtmx18sv59ZlGX7qmAj65AXF5iRNu",
-        "episodes": generate_episode_data(34, 34)
+        "episodes": generate_episode_data(34, 34),
+        # Titles read "Jaan Se Pyara Juni - Mega Last Ep 34 - Part 02 - ..."
+        "title_rules": [{"name": "spaced_ep", "pattern": r"\bep\s+(\d+)\b"}]
     },
     "Me Kahani Hun": {
         "link": "https://www.youtube.com/watch?v=hLRuSVJ_Ynk&list=PLeb83ChrfOzkFzkenCQthTFLgPB5FsLan&index=12",
@@ -100,10 +126,7 @@ def _get_duration(url):
     """EC2-optimized duration extraction with retry logic"""
     for _ in range(RETRY_ATTEMPTS):
         try:
-            response = requests.get(url, headers={
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-                'Accept-Language': 'en-US,en;q=0.9'
-            }, timeout=10)
+            response = http_client.get(url, timeout=10)
             
             if response.status_code == 200:
                 # Modern duration format
@@ -121,65 +144,141 @@ def _get_duration(url):
                     
         except Exception as e:
             print(f"Duration extraction error: {str(e)}")
-            sleep(REQUEST_DELAY)
+            tracing.sleep(REQUEST_DELAY, "request_delay")
     
     return 0  # Fallback value
 
-def extract_episode_number(title, max_episode=None):
-    """Handle EC2-specific title formats"""
-    print(f"\n🔢 Extracting from: '{title}'")
-    
-    # Clean common EC2 title artifacts
-    clean_title = re.sub(r'\s*[kK]\b', '', title)  # Remove trailing K
-    clean_title = re.sub(r'\W+', ' ', clean_title).strip()
-    print(f"  🧹 Cleaned Title: '{clean_title}'")
-    
-    # Check for numeric titles first
-    if clean_title.isdigit():
-        num = int(clean_title)
-        print(f"  🔍 Numeric Title: {num}")
-        if max_episode and num <= max_episode:
-            return num
-        print(f"  ❌ Exceeds max episode {max_episode}")
-        return None
-
-    # Enhanced pattern matching
-    patterns = [
-        (r'(\d+)(?:st|nd|rd|th)\s+last', "ordinal_last", lambda m: max_episode - (int(m.group(1)) - 1)),
-        (r'\blast\s+episode', "simple_last", lambda _: max_episode),
-        (r'episode\s+(\d+)', "standard_ep", lambda m: int(m.group(1))),
-        (r'\bep?(\d+)\b', "compact_ep", lambda m: int(m.group(1))),
-        (r'\b(\d+)\s+-\s+', "number_prefix", lambda m: int(m.group(1)))
-    ]
+def _title_parser(drama_name=None):
+    """Compiled title parser for a drama, honouring its optional title_rules config"""
+    title_rules = dramas.get(drama_name, {}).get('title_rules') if drama_name else None
+    return get_parser(title_rules)
+
+def extract_episode_number(title, max_episode=None, drama_name=None):
+    """Handle EC2-specific title formats (set TITLE_PARSER_DEBUG=1 for a per-title trace)"""
+    return _title_parser(drama_name).parse(title, max_episode)
+
+def extract_episode_numbers(titles, max_episode=None, drama_name=None):
+    """Batch form of extract_episode_number: one result per title, in order"""
+    return _title_parser(drama_name).parse_many(titles, max_episode)
+
+@dataclass
+class VideoProbe:
+    """What a single partial read of a watch page tells us about a video"""
+    video_id: str
+    title: str = None
+    duration: int = 0
+    caption_languages: list = field(default_factory=list)        # Uploaded caption tracks
+    auto_caption_languages: list = field(default_factory=list)   # Auto-generated (ASR) tracks
+    bytes_read: int = 0
+
+    @property
+    def has_manual_captions(self):
+        return bool(self.caption_languages)
+
+_PROBE_TITLE_PATTERNS = [
+    re.compile(r'<meta name="title" content="([^"]+)"'),
+    re.compile(r'<meta property="og:title" content="([^"]+)"'),
+    re.compile(r'<title>(.*?)</title>'),
+]
+_PROBE_JSON_TITLE = re.compile(r'"videoDetails":\{"videoId":"[\w-]+","title":"((?:[^"\\]|\\.)*)"')
+_PROBE_DURATION_MS = re.compile(r'"approxDurationMs":"(\d+)"')
+_PROBE_LENGTH_SECONDS = re.compile(r'"lengthSeconds":"(\d+)"')
+_PROBE_CAPTION_TRACKS = re.compile(r'"captionTracks":\[')
+_PROBE_CAPTION_TRACKS_END = re.compile(r'\],"(?:audioTracks|translationLanguages|defaultAudioTrackIndex)"')
+_PROBE_VSS_ID = re.compile(r'"vssId":"(a?)\.([\w-]+)"')
+# ytInitialData follows ytInitialPlayerResponse: once it shows up no caption tracks are coming
+_PROBE_PLAYER_RESPONSE_END = re.compile(r'ytInitialData\s*=')
+_PROBE_OVERLAP = 2048       # Re-scan this many chars so matches split across chunks are not missed
+
+def probe_video(url, timeout=15):
+    """
+    Stream a watch page once and stop reading as soon as title, duration and caption
+    tracks are known. Costs one partial page fetch instead of separate oEmbed and
+    full-page requests.
+    """
+    probe = VideoProbe(url_to_id(url))
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    page = ''
+    scan_from = 0
+    captions_at = None
+    captions_done = False
     
-    for pattern, desc, handler in patterns:
-        match = re.search(pattern, clean_title, re.IGNORECASE)
-        if match:
-            try:
-                num = handler(match)
-                print(f"  ✅ Matched {desc}: {num}")
-                if max_episode and num > max_episode:
-                    print(f"  ❌ Exceeds max episode {max_episode}")
-                    continue
-                return num
-            except Exception as e:
-                print(f"  🚨 Error in {desc} handler: {str(e)}")
+    with http_client.get(url, timeout=timeout, stream=True) as response:
+        if response.status_code != 200:
+            print(f"  ❌ Probe Failed ({response.status_code})")
+            return probe
+        
+        for chunk in response.iter_content(chunk_size=PROBE_CHUNK_SIZE):
+            probe.bytes_read += len(chunk)
+            page += decoder.decode(chunk)
+            
+            if probe.title is None:
+                for pattern in _PROBE_TITLE_PATTERNS:
+                    match = pattern.search(page, scan_from)
+                    if match:
+                        probe.title = html.unescape(match.group(1))
+                        break
+                else:
+                    match = _PROBE_JSON_TITLE.search(page, scan_from)
+                    if match:
+                        probe.title = json.loads(f'"{match.group(1)}"')
+            
+            if not probe.duration:
+                match = _PROBE_DURATION_MS.search(page, scan_from)
+                if match:
+                    probe.duration = int(match.group(1)) // 1000
+                else:
+                    match = _PROBE_LENGTH_SECONDS.search(page, scan_from)
+                    if match:
+                        probe.duration = int(match.group(1))
+            
+            if captions_at is None:
+                match = _PROBE_CAPTION_TRACKS.search(page, scan_from)
+                if match:
+                    captions_at = match.end()
+                elif _PROBE_PLAYER_RESPONSE_END.search(page, scan_from):
+                    captions_done = True
+            if captions_at is not None and not captions_done:
+                end = _PROBE_CAPTION_TRACKS_END.search(page, captions_at)
+                if end:
+                    for auto, language in _PROBE_VSS_ID.findall(page[captions_at:end.start()]):
+                        (probe.auto_caption_languages if auto else probe.caption_languages).append(language)
+                    captions_done = True
+            
+            if probe.title and probe.duration and captions_done:
+                break
+            scan_from = max(0, len(page) - _PROBE_OVERLAP)
     
-    print("  ❌ No valid patterns matched")
-    return None
+    return probe
 
-def get_video_info(url):
-    """EC2-optimized title extraction with full debugging"""
+def _clean_title(raw_title):
+    clean_title = re.sub(r'\s*-\s*YouTube\s*$', '', raw_title, flags=re.IGNORECASE)
+    return re.sub(r'\s*\[.*?\]\s*$', '', clean_title)
+
+def _fetch_video_info(url):
+    """EC2-optimized title extraction with full debugging. Returns (duration, raw title, clean title)"""
     print(f"\n🔍 Processing URL: {url}")
     
-    # Try YouTube API first
+    # One streamed read of the watch page usually answers everything
+    probe = None
+    try:
+        probe = probe_video(url)
+        print(f"  📄 Probe read {probe.bytes_read // 1024} KB: title={probe.title!r}, "
+              f"duration={probe.duration}s, captions={probe.caption_languages}")
+        metrics.add_bytes("download", probe.bytes_read, stage="metadata_probe")
+        if probe.title and probe.duration:
+            clean_title = _clean_title(probe.title)
+            print(f"  ✨ Cleaned Title: '{clean_title}'")
+            metrics.inc("metadata_source_total", source="probe")
+            return probe.duration, probe.title, clean_title
+    except Exception as e:
+        print(f"  🚨 Probe Error: {str(e)}")
+    
+    # Fall back to the oEmbed API for the title
     try:
-        api_url = f'https://www.youtube.com/oembed?url={url}&format=json'
+        api_url = f'{YOUTUBE_BASE_URL}/oembed?url={url}&format=json'
         print(f"  📡 API Request: {api_url}")
-        response = requests.get(api_url, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)',
-            'Accept-Language': 'en-US,en;q=0.9'
-        }, timeout=15)
+        response = http_client.get(api_url, timeout=15)
         
         if response.status_code == 200:
             data = response.json()
@@ -187,47 +286,16 @@ def get_video_info(url):
             raw_title = data['title']
             print(f"  🛠️ Raw API Title: '{raw_title}'")
             
-            # Clean title
-            clean_title = re.sub(r'\s*-\s*YouTube\s*$', '', raw_title, flags=re.IGNORECASE)
-            clean_title = re.sub(r'\s*\[.*?\]\s*$', '', clean_title)
+            clean_title = _clean_title(raw_title)
             print(f"  ✨ Cleaned Title: '{clean_title}'")
-            return _get_duration(url), clean_title
+            duration = probe.duration if probe and probe.duration else _get_duration(url)
+            metrics.inc("metadata_source_total", source="oembed")
+            return duration, raw_title, clean_title
             
         print(f"  ❌ API Failed ({response.status_code}): {response.text[:200]}...")
     except Exception as e:
         print(f"  🚨 API Error: {str(e)}")
 
-    # HTML Fallback with detailed logging
-    try:
-        print("  🔄 Falling back to HTML parsing")
-        response = requests.get(url, headers={
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64)',
-            'Accept-Language': 'en-US,en;q=0.9'
-        }, timeout=15)
-        
-        if response.status_code == 200:
-            print(f"  📄 HTML Snippet (title): {response.text[:2000]}...")
-            
-            # Multiple title extraction strategies
-            title_sources = [
-                (r'<meta name="title" content="([^"]+)"', 'meta tag'),
-                (r'"title":"([^"]+)"', 'JSON title'),
-                (r'<title>(.*?)</title>', 'HTML title')
-            ]
-            
-            for pattern, source in title_sources:
-                match = re.search(pattern, response.text)
-                if match:
-                    raw_title = html.unescape(match.group(1))
-                    print(f"  🛠️ Raw {source} Title: '{raw_title}'")
-                    clean_title = re.sub(r'\s*-\s*YouTube\s*$', '', raw_title)
-                    print(f"  ✨ Cleaned {source} Title: '{clean_title}'")
-                    return _get_duration(url), clean_title
-                    
-            print("  ❌ No title found in HTML")
-    except Exception as e:
-        print(f"  🚨 HTML Error: {str(e)}")
-
     # Final Pytube fallback
     try:
         print("  🔄 Falling back to pytube")
@@ -235,15 +303,222 @@ def get_video_info(url):
         print(f"  🛠️ Raw Pytube Title: '{yt.title}'")
         clean_title = re.sub(r'\s*[\(\[]\s*eng\s*sub.*', '', yt.title, flags=re.IGNORECASE)
         print(f"  ✨ Cleaned Pytube Title: '{clean_title}'")
-        return yt.length, clean_title
+        metrics.inc("metadata_source_total", source="pytube")
+        return yt.length, yt.title, clean_title
     except Exception as e:
         print(f"  🚨 Pytube Failed: {str(e)}")
-        return 0, "Unknown Video"
+        metrics.inc("metadata_source_total", source="none")
+        return 0, None, "Unknown Video"
+
+_video_cache = None
+_video_cache_lock = threading.Lock()
+
+def get_video_cache():
+    """Process-wide metadata cache, opened on first use"""
+    global _video_cache
+    with _video_cache_lock:
+        if _video_cache is None:
+            _video_cache = VideoInfoCache(VIDEO_CACHE_PATH)
+        return _video_cache
+
+_transcript_cache = None
+_transcript_cache_lock = threading.Lock()
+
+def get_transcript_cache():
+    """Process-wide raw transcript cache, opened on first use"""
+    global _transcript_cache
+    with _transcript_cache_lock:
+        if _transcript_cache is None:
+            _transcript_cache = TranscriptCache(TRANSCRIPT_CACHE_PATH)
+        return _transcript_cache
+
+_transcript_index = None
+_transcript_index_lock = threading.Lock()
+
+def get_transcript_index():
+    """Process-wide full-text index of the transcript stores, opened on first use"""
+    global _transcript_index
+    with _transcript_index_lock:
+        if _transcript_index is None:
+            _transcript_index = TranscriptIndex(TRANSCRIPT_INDEX_PATH)
+        return _transcript_index
+
+@dataclass
+class VideoInfo:
+    """Resolved metadata for one video"""
+    url: str
+    video_id: str
+    duration: int = 0
+    title: str = None          # Cleaned title, as returned by get_video_info
+    raw_title: str = None
+    cached: bool = False
+
+class HostRateLimiter:
+    """Spaces out lookups per host. Slots are reserved under a thread lock, so one limiter
+    throttles every event loop and worker thread in the process."""
+    
+    def __init__(self, rate_per_second):
+        self.interval = 1.0 / rate_per_second if rate_per_second else 0.0
+        self._next_slot = {}
+        self._lock = threading.Lock()
+    
+    def reserve(self, host):
+        """Claim the next free slot for host and return how long to wait for it"""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        return slot - now
+    
+    async def acquire(self, host):
+        delay = self.reserve(host)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+_host_limiter = HostRateLimiter(METADATA_RATE_PER_HOST)
+
+async def _resolve_video(url, semaphore, executor):
+    video_id = url_to_id(url)
+    cache = get_video_cache()
+    cached = cache.get(video_id)
+    metrics.inc("cache_total", cache="video_info", result="hit" if cached else "miss")
+    if cached:
+        return VideoInfo(url, video_id, cached['duration'], cached['clean_title'], cached['title'], cached=True)
+    
+    async with semaphore:
+        await _host_limiter.acquire(urlparse(url).hostname)
+        loop = asyncio.get_running_loop()
+        # Timed after the rate-limit wait so the histogram shows fetch latency, not queueing
+        with metrics.timed("metadata_fetch") as timer:
+            duration, raw_title, clean_title = await loop.run_in_executor(executor, _fetch_video_info, url)
+            timer.ok = bool(raw_title)
+    # Only cache complete answers; a failed lookup should be retried next run
+    if raw_title and duration:
+        cache.put(video_id, raw_title, clean_title, duration)
+    return VideoInfo(url, video_id, duration, clean_title, raw_title)
+
+async def resolve_playlist_async(urls, concurrency=METADATA_CONCURRENCY):
+    """Resolve metadata for many videos concurrently; results keep the order of urls"""
+    semaphore = asyncio.Semaphore(concurrency)
+    # The HTTP work itself runs on the shared keep-alive session, one pool thread per slot
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="metadata") as executor:
+        return await asyncio.gather(*(_resolve_video(url, semaphore, executor) for url in urls))
+
+def resolve_playlist(urls, concurrency=METADATA_CONCURRENCY):
+    """Blocking entry point: list of VideoInfo for urls, fetched at most `concurrency` at a time"""
+    urls = list(urls)
+    if not urls:
+        return []
+    infos = asyncio.run(resolve_playlist_async(urls, concurrency))
+    fetched = sum(1 for info in infos if not info.cached)
+    if len(urls) > 1:
+        print(f"📡 Resolved {len(urls)} videos ({len(urls) - fetched} cached, {fetched} fetched)")
+    return infos
+
+@tracing.traced("get_video_info")
+def get_video_info(url):
+    """Return (duration, title) for a video, served from the on-disk cache when fresh"""
+    info = resolve_playlist([url], concurrency=1)[0]
+    if info.cached:
+        print(f"  💾 Cached: '{info.title}' ({info.duration}s)")
+    return info.duration, info.title
+
+def resolve_episode_number(url, title, max_episode=None, drama_name=None):
+    """extract_episode_number, remembered per video in the metadata cache"""
+    video_id = url_to_id(url)
+    with metrics.timed("episode_resolution", mode="single") as timer:
+        cache = get_video_cache()
+        cached = cache.get(video_id)
+        if cached and cached['episode'] is not None and cached['max_episode'] == max_episode:
+            return cached['episode']
+        ep_num = extract_episode_number(title, max_episode, drama_name)
+        timer.ok = ep_num is not None
+        if cached and ep_num is not None:
+            cache.set_episode(video_id, ep_num, max_episode)
+        return ep_num
+
+@dataclass
+class PlaylistEntry:
+    """One video of a playlist as listed by yt-dlp's flat-playlist dump"""
+    video_id: str
+    url: str
+    title: str = None
+    duration: int = 0
+    episode: int = None
+
+# Placeholders yt-dlp lists for videos that can no longer be watched
+_UNAVAILABLE_TITLES = {'[Private video]', '[Deleted video]'}
+
+def list_playlist_entries(playlist_url):
+    """Ids, titles and durations of every playlist video from one flat yt-dlp extraction"""
+    try:
+        items = get_engine().playlist(playlist_url)
+    except Exception as e:
+        raise RuntimeError(f"yt-dlp playlist dump failed: {str(e)[-300:]}")
+    
+    entries = []
+    for item in items:
+        if not item.get('id'):
+            continue
+        entries.append(PlaylistEntry(
+            video_id=item['id'],
+            url=f"{YOUTUBE_BASE_URL}/watch?v={item['id']}",
+            title=item.get('title'),
+            duration=int(item.get('duration') or 0)
+        ))
+    return entries
+
+def resolve_playlist_episodes(playlist_url, episodes_list, max_episode, drama_name=None):
+    """
+    Map a whole playlist to episode numbers from one flat-playlist dump and keep only
+    the wanted episodes, before any per-video network work. Titles and durations are
+    written to the metadata cache so later get_video_info calls are free.
+    Returns (wanted entries, entries without a title that still need a per-video lookup).
+    """
+    with metrics.timed("playlist_dump"):
+        entries = list_playlist_entries(playlist_url)
+    cache = get_video_cache()
+    wanted, unresolved, titled = [], [], []
+    
+    for entry in entries:
+        if entry.title in _UNAVAILABLE_TITLES:
+            continue
+        if not entry.title:
+            unresolved.append(entry)
+            continue
+        titled.append(entry)
+    
+    clean_titles = [_clean_title(entry.title) for entry in titled]
+    with metrics.timed("episode_resolution", mode="batch"):
+        episodes = extract_episode_numbers(clean_titles, max_episode, drama_name)
+    for entry, clean_title, episode in zip(titled, clean_titles, episodes):
+        entry.episode = episode
+        if entry.duration and not cache.get(entry.video_id):
+            cache.put(entry.video_id, entry.title, clean_title, entry.duration)
+        if episode is not None:
+            cache.set_episode(entry.video_id, episode, max_episode)
+        if episode in episodes_list:
+            wanted.append(entry)
+    
+    print(f"📋 Playlist dump: {len(entries)} videos → {len(wanted)} wanted episodes, "
+          f"{len(unresolved)} need a per-video lookup")
+    return wanted, unresolved
+
+def _list_transcripts(video_id):
+    # youtube-transcript-api 1.x replaced the static list_transcripts with an instance method
+    if hasattr(YouTubeTranscriptApi, "list_transcripts"):
+        return YouTubeTranscriptApi.list_transcripts(video_id)
+    return YouTubeTranscriptApi().list(video_id)
+
+def _raw_segments(transcript):
+    """Fetched transcript as plain [{'text', 'start', 'duration'}, ...] for caching as JSON"""
+    fetched = transcript.fetch()
+    return fetched.to_raw_data() if hasattr(fetched, "to_raw_data") else list(fetched)
 
 def get_transcripts(video_id):
     """Get transcripts with auto-translate fallback"""
     try:
-        transcripts = YouTubeTranscriptApi.list_transcripts(video_id)
+        transcripts = _list_transcripts(video_id)
     except (TranscriptsDisabled, NoTranscriptFound):
         return None, None
 
@@ -266,10 +541,39 @@ def get_transcripts(video_id):
                 pass
 
     return (
-        en_transcript.fetch() if en_transcript else None,
-        ur_transcript.fetch() if ur_transcript else None
+        _raw_segments(en_transcript) if en_transcript else None,
+        _raw_segments(ur_transcript) if ur_transcript else None
     )
 
+def fetch_transcripts(video_id):
+    """
+    (English, Urdu) segments for a video, from the transcript cache when both languages are
+    known and otherwise from YouTube with retries. Successful lookups are cached, including
+    languages that turned out to be missing. Never raises.
+    """
+    cache = get_transcript_cache()
+    (en_hit, en_transcript), (ur_hit, ur_transcript) = cache.get(video_id, "en"), cache.get(video_id, "ur")
+    if en_hit and ur_hit:
+        metrics.inc("transcript_cache_total", outcome="hit")
+        return en_transcript, ur_transcript
+    metrics.inc("transcript_cache_total", outcome="miss")
+    
+    for attempt in range(RETRY_ATTEMPTS):
+        if attempt:
+            metrics.retry("transcript_fetch")
+        try:
+            with metrics.timed("transcript_fetch") as timer:
+                en_transcript, ur_transcript = get_transcripts(video_id)
+                timer.ok = bool(en_transcript or ur_transcript)
+        except Exception as e:
+            print(f"  {video_id}: attempt {attempt+1} failed: {str(e)}")
+            tracing.sleep(REQUEST_DELAY, "retry_backoff")
+            continue
+        cache.put(video_id, "en", en_transcript)
+        cache.put(video_id, "ur", ur_transcript)
+        return en_transcript, ur_transcript
+    return None, None
+
 def url_to_id(url):
     """Extract video ID from URL"""
     patterns = [
@@ -284,29 +588,28 @@ def url_to_id(url):
             return match.group(1)
     return url.split('/')[-1]
 
-def save_transcript(transcript, filename, with_timestamps=True):
-    """Save transcript to file"""
-    os.makedirs(os.path.dirname(filename), exist_ok=True)
-    with open(filename, 'w', encoding='utf-8') as f:
-        if with_timestamps:
-            for entry in transcript:
-                f.write(f"[{entry['start']:.2f}] {entry['text']}\n")
-        else:
-            f.write(' '.join([entry['text'] for entry in transcript]))
-
 def process_dramas():
     print("🚀 Starting transcript processing...")
     
     for drama_name, data in dramas.items():
         print(f"\n📺 Processing drama: {drama_name}")
-        playlist = Playlist(data['link'])
-        # Adjust regex for video URL extraction (if needed)
-        playlist._video_regex = re.compile(r'"url":"(/watch\?v=[\w-]*)')
-        
-        print(f"🔍 Found {len(playlist.video_urls)} videos")
         episodes_list, max_episode = data['episodes']
+        try:
+            wanted, unresolved = resolve_playlist_episodes(data['link'], episodes_list, max_episode, drama_name)
+            video_urls = [entry.url for entry in wanted + unresolved]
+        except Exception as e:
+            print(f"⚠ Playlist dump unavailable ({str(e)}), listing with pytube")
+            playlist = Playlist(data['link'])
+            # Adjust regex for video URL extraction (if needed)
+            playlist._video_regex = re.compile(r'"url":"(/watch\?v=[\w-]*)')
+            video_urls = list(playlist.video_urls)
+        
+        print(f"🔍 Found {len(video_urls)} videos")
+        # Warm the metadata cache for the whole list at once; the loop below then reads from it
+        resolve_playlist(video_urls)
         
-        for url in playlist.video_urls:
+        jobs = []          # (episode number, video id) of every wanted episode
+        for url in video_urls:
             print(f"\n📼 Processing URL: {url}")
             
             # Get video info
@@ -317,7 +620,7 @@ def process_dramas():
             print(f"📝 Title: {title}")
             
             # Extract episode number (including checks for last or 2nd last)
-            ep_num = extract_episode_number(title, max_episode)
+            ep_num = resolve_episode_number(url, title, max_episode, drama_name)
             if ep_num is None:
                 print("❌ Could not extract episode number, skipping")
                 continue
@@ -334,29 +637,80 @@ def process_dramas():
                 print("⏭️  Skipping short video")
                 continue
                 
-            # Get transcripts
             video_id = url_to_id(url)
             print(f"🔧 Video ID: {video_id}")
-            
-            en_transcript, ur_transcript = None, None
-            for attempt in range(RETRY_ATTEMPTS):
-                try:
-                    en_transcript, ur_transcript = get_transcripts(video_id)
-                    break
-                except Exception as e:
-                    print(f"Attempt {attempt+1} failed: {str(e)}")
-                    sleep(REQUEST_DELAY)
-
-            # Save files if transcripts are available
-            base_path = f"transcripts/{drama_name}_Ep_{ep_num}"
-            if en_transcript:
-                save_transcript(en_transcript, f"{base_path}_English_T.txt")
-                save_transcript(en_transcript, f"{base_path}_English.txt", with_timestamps=False)
-            if ur_transcript:
-                save_transcript(ur_transcript, f"{base_path}_Urdu_T.txt")
-                save_transcript(ur_transcript, f"{base_path}_Urdu.txt", with_timestamps=False)
-                
-            print("✅ Success!" if en_transcript or ur_transcript else "⏭️  No transcripts")
+            jobs.append((ep_num, video_id))
+        
+        # Fetch transcripts for every wanted episode at once; cached videos need no network
+        print(f"\n📥 Fetching transcripts for {len(jobs)} episodes ({TRANSCRIPT_CONCURRENCY} at a time)")
+        cache = get_transcript_cache()
+        with concurrent.futures.ThreadPoolExecutor(max_workers=TRANSCRIPT_CONCURRENCY,
+                                                   thread_name_prefix="transcripts") as executor:
+            results = executor.map(fetch_transcripts, [video_id for _, video_id in jobs])
+            tracks = {}
+            for (ep_num, video_id), (en_transcript, ur_transcript) in zip(jobs, results):
+                if en_transcript:
+                    tracks[(ep_num, "en")] = en_transcript
+                if ur_transcript:
+                    tracks[(ep_num, "ur")] = ur_transcript
+                if en_transcript or ur_transcript:
+                    cache.record_episode(drama_name, ep_num, video_id)
+                    print(f"✅ Episode {ep_num}: fetched")
+                else:
+                    print(f"⏭️  Episode {ep_num}: no transcripts")
+        
+        if tracks:
+            path = store_path(TRANSCRIPT_DIR, drama_name)
+            update_store(path, tracks)
+            print(f"💾 Saved {len(tracks)} transcripts to {path}")
+            # Only tracks whose content changed are re-indexed
+            with metrics.timed("transcript_index"):
+                indexed = get_transcript_index().index_store(path, drama_name)
+            print(f"🔎 Indexed {indexed} new or changed transcripts")
+
+def rebuild_stores_from_cache(drama_name=None):
+    """Rewrite (and re-index) the transcript store of every cached drama, or one, without any network access"""
+    cache = get_transcript_cache()
+    by_drama = {}
+    for drama, ep_num, video_id in cache.episodes(drama_name):
+        tracks = by_drama.setdefault(drama, {})
+        for lang in ("en", "ur"):
+            _, segments = cache.get(video_id, lang)
+            if segments:
+                tracks[(ep_num, lang)] = segments
+    for drama, tracks in by_drama.items():
+        update_store(store_path(TRANSCRIPT_DIR, drama), tracks)
+        get_transcript_index().index_store(store_path(TRANSCRIPT_DIR, drama), drama)
+    print(f"✅ Rebuilt {len(by_drama)} transcript stores from the cache")
+    return len(by_drama)
+
+def export_text_files(drama_name=None):
+    """Write the _English(_T) and _Urdu(_T) text files of every episode in the transcript stores"""
+    names = [drama_name] if drama_name else list(dramas)
+    exported = 0
+    for name in names:
+        path = store_path(TRANSCRIPT_DIR, name)
+        if not os.path.exists(path):
+            continue
+        with TranscriptStore(path) as store:
+            for ep_num in store.episodes():
+                exported += len(export_episode(store, ep_num, os.path.join(TRANSCRIPT_DIR, f"{name}_Ep_{ep_num}")))
+    print(f"✅ Exported {exported} transcript files")
+    return exported
 
 if __name__ == "__main__":
-    process_dramas()
+    arg_parser = argparse.ArgumentParser(description="Fetch drama transcripts from YouTube")
+    arg_parser.add_argument("--from-cache", action="store_true",
+                            help="only rebuild transcript stores from the transcript cache (no network)")
+    arg_parser.add_argument("--export-text", action="store_true",
+                            help="write the _English(_T)/_Urdu(_T) text files from the transcript stores")
+    arg_parser.add_argument("--drama", help="limit --from-cache / --export-text to this drama")
+    args = arg_parser.parse_args()
+    
+    if args.from_cache:
+        rebuild_stores_from_cache(args.drama)
+    elif not args.export_text:
+        metrics.start_from_env()
+        process_dramas()
+    if args.export_text:
+        export_text_files(args.drama)
@@ -0,0 +1,241 @@
+"""
+Full-text index over the English and Urdu transcript corpus.
+
+    python transcript_index.py build [--dir transcripts]
+    python transcript_index.py search "kahan ho" [--lang ur] [--drama Daraar] [--limit 10]
+
+Indexes every drama's .tstore, or its _English_T / _Urdu_T files when it has no store.
+Postings live in an SQLite FTS5 table (positional, so "quoted phrases" work) and hits are
+ranked with BM25. Each (drama, episode, language) track carries a signature, so a rebuild
+only re-indexes the tracks that changed.
+"""
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+
+from transcript_store import (TranscriptStore, LANG_NAMES, STORE_SUFFIX, TEXT_TRACK, store_path,
+                              parse_timestamped)
+
+TRANSCRIPT_INDEX_PATH = os.environ.get("TRANSCRIPT_INDEX_PATH", os.path.join(".cache", "transcript_index.sqlite3"))
+# Porter stems English tokens and leaves Urdu ones alone; unicode61 splits on Urdu punctuation too
+INDEX_TOKENIZER = "porter unicode61 remove_diacritics 2"
+
+# Spellings that vary between transcript sources but mean the same letter
+URDU_FOLD = str.maketrans({
+    "\u064a": "\u06cc", "\u0649": "\u06cc",                    # Arabic yeh / alef maksura -> Farsi yeh
+    "\u0643": "\u06a9",                                       # Arabic kaf -> keheh
+    "\u0647": "\u06c1", "\u0629": "\u06c1", "\u06c0": "\u06c1",    # heh, teh marbuta, heh with yeh -> heh goal
+    "\u0623": "\u0627", "\u0625": "\u0627", "\u0622": "\u0627", "\u0671": "\u0627",   # alef variants
+    "\u0640": None, "\u200c": None, "\u200d": None,            # tatweel, zero-width (non-)joiners
+})
+ARABIC_DIACRITICS = re.compile("[\u064b-\u065f\u0670\u06d6-\u06ed]")
+QUERY_PART = re.compile(r'"([^"]*)"|(\S+)')
+
+
+def normalize(text):
+    """Text as it is indexed and queried: Urdu letter variants folded, Arabic diacritics dropped"""
+    return ARABIC_DIACRITICS.sub("", text.translate(URDU_FOLD))
+
+
+def to_match_query(query, any_terms=False):
+    """FTS5 MATCH expression: every word and "quoted phrase" becomes a quoted phrase, ANDed (or ORed)"""
+    parts = []
+    for phrase, word in QUERY_PART.findall(normalize(query)):
+        text = (phrase or word).replace('"', "")
+        if re.search(r"\w", text):
+            parts.append(f'"{text}"')
+    return (" OR " if any_terms else " ").join(parts)
+
+
+@dataclass
+class Hit:
+    drama: str
+    episode: int
+    lang: str
+    start: float
+    text: str
+    score: float                 # BM25; higher is better
+
+
+class TranscriptIndex:
+    """On-disk inverted index of transcript segments. Safe to share between threads."""
+
+    def __init__(self, path=TRANSCRIPT_INDEX_PATH):
+        self.path = path
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS segments (
+                id INTEGER PRIMARY KEY,
+                drama TEXT NOT NULL,
+                episode INTEGER NOT NULL,
+                lang TEXT NOT NULL,
+                start REAL NOT NULL,
+                text TEXT NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_segments_track ON segments (drama, episode, lang)")
+        self._conn.execute(
+            f"CREATE VIRTUAL TABLE IF NOT EXISTS segment_terms USING fts5(terms, tokenize='{INDEX_TOKENIZER}')"
+        )
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS indexed_tracks (
+                drama TEXT NOT NULL,
+                episode INTEGER NOT NULL,
+                lang TEXT NOT NULL,
+                signature TEXT NOT NULL,
+                indexed_at REAL NOT NULL,
+                PRIMARY KEY (drama, episode, lang)
+            )
+        """)
+
+    def _signature(self, drama, episode, lang):
+        row = self._conn.execute(
+            "SELECT signature FROM indexed_tracks WHERE drama = ? AND episode = ? AND lang = ?",
+            (drama, episode, lang)
+        ).fetchone()
+        return row[0] if row else None
+
+    def index_track(self, drama, episode, lang, segments, signature):
+        """
+        (Re)index one track's segments (objects or dicts with start and text) unless it is
+        already indexed with this signature. Returns True if anything was written.
+        """
+        with self._lock:
+            if self._signature(drama, episode, lang) == signature:
+                return False
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.execute(
+                    "DELETE FROM segment_terms WHERE rowid IN "
+                    "(SELECT id FROM segments WHERE drama = ? AND episode = ? AND lang = ?)",
+                    (drama, episode, lang)
+                )
+                self._conn.execute(
+                    "DELETE FROM segments WHERE drama = ? AND episode = ? AND lang = ?", (drama, episode, lang)
+                )
+                for segment in segments:
+                    start, text = (segment["start"], segment["text"]) if isinstance(segment, dict) \
+                        else (segment.start, segment.text)
+                    cursor = self._conn.execute(
+                        "INSERT INTO segments (drama, episode, lang, start, text) VALUES (?, ?, ?, ?, ?)",
+                        (drama, episode, lang, start, text)
+                    )
+                    self._conn.execute(
+                        "INSERT INTO segment_terms (rowid, terms) VALUES (?, ?)", (cursor.lastrowid, normalize(text))
+                    )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO indexed_tracks VALUES (?, ?, ?, ?, ?)",
+                    (drama, episode, lang, signature, time.time())
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return True
+
+    def index_store(self, path, drama):
+        """Index every changed track of a drama's transcript store; returns how many were (re)indexed"""
+        changed = 0
+        with TranscriptStore(path) as store:
+            for episode, lang in store.tracks():
+                track = store.track(episode, lang)
+                changed += self.index_track(drama, episode, lang, track, track.checksum())
+        return changed
+
+    def index_text_file(self, path, drama, episode, lang):
+        stat = os.stat(path)
+        signature = f"{stat.st_size}:{stat.st_mtime_ns}"
+        with self._lock:
+            if self._signature(drama, episode, lang) == signature:
+                return False
+        with open(path, encoding="utf-8") as f:
+            return self.index_track(drama, episode, lang, parse_timestamped(f.read()), signature)
+
+    def index_directory(self, directory):
+        """Index every store in directory, plus the _T files of dramas that have no store"""
+        codes = {name: lang for lang, name in LANG_NAMES.items()}
+        filenames = sorted(os.listdir(directory))
+        stored = {name[:-len(STORE_SUFFIX)] for name in filenames if name.endswith(STORE_SUFFIX)}
+        changed = 0
+        for drama in sorted(stored):
+            changed += self.index_store(store_path(directory, drama), drama)
+        for filename in filenames:
+            match = TEXT_TRACK.match(filename)
+            if match and match.group(1) not in stored:
+                changed += self.index_text_file(os.path.join(directory, filename), match.group(1),
+                                                int(match.group(2)), codes[match.group(3)])
+        return changed
+
+    def search(self, query, limit=20, lang=None, drama=None, any_terms=False):
+        """Best-matching segments for query, as Hits ordered by BM25"""
+        match = to_match_query(query, any_terms)
+        if not match:
+            return []
+        sql = ("SELECT s.drama, s.episode, s.lang, s.start, s.text, -bm25(segment_terms) AS score "
+               "FROM segment_terms JOIN segments s ON s.id = segment_terms.rowid "
+               "WHERE segment_terms MATCH ?")
+        params = [match]
+        if lang:
+            sql += " AND s.lang = ?"
+            params.append(lang)
+        if drama:
+            sql += " AND s.drama = ?"
+            params.append(drama)
+        sql += " ORDER BY bm25(segment_terms) LIMIT ?"
+        params.append(limit)
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [Hit(*row) for row in rows]
+
+    def stats(self):
+        """(tracks, segments) currently indexed"""
+        with self._lock:
+            (tracks,) = self._conn.execute("SELECT COUNT(*) FROM indexed_tracks").fetchone()
+            (segments,) = self._conn.execute("SELECT COUNT(*) FROM segments").fetchone()
+        return tracks, segments
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--index", default=TRANSCRIPT_INDEX_PATH)
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="index new and changed transcripts")
+    build.add_argument("--dir", default="transcripts")
+    search = commands.add_parser("search", help="query the index")
+    search.add_argument("query")
+    search.add_argument("--lang", choices=sorted(LANG_NAMES))
+    search.add_argument("--drama")
+    search.add_argument("--limit", type=int, default=10)
+    search.add_argument("--any", action="store_true", help="match any word instead of all of them")
+    args = arg_parser.parse_args()
+
+    index = TranscriptIndex(args.index)
+    started = time.perf_counter()
+    if args.command == "build":
+        changed = index.index_directory(args.dir)
+        tracks, segments = index.stats()
+        print(f"✓ Indexed {changed} new or changed tracks in {time.perf_counter() - started:.2f}s "
+              f"({tracks} tracks, {segments} segments in {args.index})")
+    else:
+        hits = index.search(args.query, args.limit, args.lang, args.drama, args.any)
+        elapsed = (time.perf_counter() - started) * 1000
+        for hit in hits:
+            print(f"{hit.drama} Ep {hit.episode} [{hit.lang}] [{hit.start:.2f}] {hit.text}  ({hit.score:.2f})")
+        print(f"{len(hits)} hits in {elapsed:.1f} ms")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
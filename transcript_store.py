@@ -0,0 +1,308 @@
+"""
+Compact columnar transcript store: one file per drama holding every episode's segments.
+
+    python transcript_store.py import transcripts Daraar     # build transcripts/Daraar.tstore from _T files
+    python transcript_store.py export transcripts/Daraar.tstore out/ Daraar
+    python transcript_store.py at transcripts/Daraar.tstore 1 en 125.0
+
+Layout (little-endian, each section aligned to its item size):
+    header    magic, version, track count T, segment count N, text blob size
+    tracks    T x (episode int32, language, first segment, segment count)
+    starts    N x float64 seconds
+    durations N x float32 seconds
+    offsets   (N + 1) x uint32 byte offsets of each segment's text in the blob
+    blob      UTF-8 text of every segment, back to back
+
+Opened with mmap, segment i of a track is three array reads and one slice (O(1)),
+and the segment playing at a given time is a binary search over starts (O(log n)).
+The _English_T / _English / _Urdu_T / _Urdu text files are exported on demand.
+"""
+import argparse
+import bisect
+import mmap
+import os
+import re
+import struct
+import sys
+import zlib
+from array import array
+from dataclasses import dataclass
+
+STORE_MAGIC = b"TSTO"
+STORE_VERSION = 1
+STORE_SUFFIX = ".tstore"
+HEADER = struct.Struct("<4sIIQQ4x")           # magic, version, tracks, segments, blob size
+TRACK = struct.Struct("<i4x8sQQ")             # episode, language, first segment, segment count
+LANG_NAMES = {"en": "English", "ur": "Urdu"}  # Language code -> text file suffix
+TEXT_TRACK = re.compile(rf"^(.+)_Ep_(\d+)_({'|'.join(LANG_NAMES.values())})_T\.txt$")   # drama, episode, language
+TIMESTAMP_LINE = re.compile(r"^\[(\d+(?:\.\d+)?)\] ", re.M)
+
+
+@dataclass
+class Segment:
+    start: float
+    duration: float
+    text: str
+
+
+def store_path(directory, drama_name):
+    return os.path.join(directory, f"{drama_name}{STORE_SUFFIX}")
+
+
+class TranscriptTrack:
+    """One episode's transcript in one language, read straight from the store's mmap"""
+
+    def __init__(self, store, episode, lang, first, count):
+        self.store = store
+        self.episode = episode
+        self.lang = lang
+        self.first = first
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+    def _index(self, i):
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError(f"segment {i} out of range for {self.count} segments")
+        return self.first + i
+
+    def __getitem__(self, i):
+        return self.store.segment(self._index(i))
+
+    def __iter__(self):
+        for i in range(self.first, self.first + self.count):
+            yield self.store.segment(i)
+
+    def start(self, i):
+        return self.store._starts[self._index(i)]
+
+    def text(self, i):
+        return self.store.text(self._index(i))
+
+    def starts(self):
+        """
+        Start times of every segment, as a float64 array copied out of the store, so it
+        stays valid after the store is closed
+        """
+        starts = array("d")
+        with self.store._starts[self.first:self.first + self.count] as view:
+            starts.frombytes(view.tobytes())
+        return starts
+
+    def index_at(self, seconds):
+        """Index of the segment playing at seconds (the last one starting at or before it), or None"""
+        position = bisect.bisect_right(self.store._starts, seconds, self.first, self.first + self.count)
+        return None if position == self.first else position - self.first - 1
+
+    def segment_at(self, seconds):
+        i = self.index_at(seconds)
+        return None if i is None else self[i]
+
+    def checksum(self):
+        """CRC of the track's start times and text, to tell whether it changed"""
+        store, end = self.store, self.first + self.count
+        crc = zlib.crc32(store._starts[self.first:end])
+        crc = zlib.crc32(store._blob[store._offsets[self.first]:store._offsets[end]], crc)
+        return f"{self.count}:{crc:08x}"
+
+    def to_segments(self):
+        """Segments as plain dicts, the shape the transcript APIs return"""
+        return [{"text": s.text, "start": s.start, "duration": s.duration} for s in self]
+
+
+class TranscriptStore:
+    """Read-only, memory-mapped view of a .tstore file. Safe to share between threads."""
+
+    def __init__(self, path):
+        if sys.byteorder != "little":
+            raise ValueError("transcript stores are read through native little-endian arrays")
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        magic, version, track_count, count, blob_size = HEADER.unpack_from(view, 0)
+        if magic != STORE_MAGIC or version != STORE_VERSION:
+            raise ValueError(f"{path} is not a version {STORE_VERSION} transcript store")
+        self._count = count
+        self._tracks = {}
+        offset = HEADER.size
+        for _ in range(track_count):
+            episode, lang, first, length = TRACK.unpack_from(view, offset)
+            lang = lang.rstrip(b"\0").decode("ascii")
+            self._tracks[(episode, lang)] = TranscriptTrack(self, episode, lang, first, length)
+            offset += TRACK.size
+        self._starts = view[offset:offset + 8 * count].cast("d")
+        offset += 8 * count
+        self._durations = view[offset:offset + 4 * count].cast("f")
+        offset += 4 * count
+        self._offsets = view[offset:offset + 4 * (count + 1)].cast("I")
+        offset += 4 * (count + 1)
+        self._blob = view[offset:offset + blob_size]
+
+    def __len__(self):
+        return self._count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def tracks(self):
+        """(episode, language) of every track, in episode order"""
+        return list(self._tracks)
+
+    def episodes(self):
+        return sorted({episode for episode, _ in self._tracks})
+
+    def track(self, episode, lang):
+        return self._tracks.get((episode, lang))
+
+    def text(self, i):
+        return bytes(self._blob[self._offsets[i]:self._offsets[i + 1]]).decode("utf-8")
+
+    def segment(self, i):
+        # Durations are stored as float32; round away the representation noise
+        return Segment(self._starts[i], round(self._durations[i], 3), self.text(i))
+
+    def close(self):
+        for view in (self._starts, self._durations, self._offsets, self._blob):
+            view.release()
+        self._mmap.close()
+
+
+def write_store(path, tracks):
+    """
+    Write tracks, {(episode, language): [{'text', 'start', 'duration'}, ...]}, as a new store.
+    The file is replaced atomically, so open readers keep their old mapping.
+    """
+    table = []
+    starts, durations, offsets = array("d"), array("f"), array("I", [0])
+    blob = bytearray()
+    for (episode, lang), segments in sorted(tracks.items()):
+        table.append(TRACK.pack(episode, lang.encode("ascii"), len(starts), len(segments)))
+        for segment in segments:
+            starts.append(float(segment["start"]))
+            durations.append(float(segment.get("duration") or 0.0))
+            blob += segment["text"].encode("utf-8")
+            if len(blob) > 0xFFFFFFFF:
+                raise ValueError("transcript store text is limited to 4 GB")
+            offsets.append(len(blob))
+
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(STORE_MAGIC, STORE_VERSION, len(table), len(starts), len(blob)))
+        f.write(b"".join(table))
+        f.write(starts.tobytes())
+        f.write(durations.tobytes())
+        f.write(offsets.tobytes())
+        f.write(blob)
+    os.replace(tmp_path, path)
+
+
+def update_store(path, tracks):
+    """Add or replace tracks in the store at path, keeping every other track"""
+    merged = {}
+    if os.path.exists(path):
+        with TranscriptStore(path) as store:
+            merged = {key: store.track(*key).to_segments() for key in store.tracks()}
+    merged.update(tracks)
+    write_store(path, merged)
+
+
+def format_timestamped(segments):
+    """The _T text file: one '[start] text' entry per segment"""
+    return "".join(f"[{segment.start:.2f}] {segment.text}\n" for segment in segments)
+
+
+def format_plain(segments):
+    return " ".join(segment.text for segment in segments)
+
+
+def parse_timestamped(text):
+    """Segments of a _T file. Durations run to the next segment; the last one gets 0."""
+    matches = list(TIMESTAMP_LINE.finditer(text))
+    segments = []
+    for i, match in enumerate(matches):
+        end = matches[i + 1].start() if i + 1 < len(matches) else len(text)
+        segments.append({"text": text[match.end():end].removesuffix("\n"), "start": float(match.group(1))})
+    for current, following in zip(segments, segments[1:] + [None]):
+        current["duration"] = round(following["start"] - current["start"], 2) if following else 0.0
+    return segments
+
+
+def export_episode(store, episode, base_path):
+    """Write {base_path}_{Language}_T.txt and {base_path}_{Language}.txt for every track of episode"""
+    written = []
+    if os.path.dirname(base_path):
+        os.makedirs(os.path.dirname(base_path), exist_ok=True)
+    for lang, name in LANG_NAMES.items():
+        track = store.track(episode, lang)
+        if track is None:
+            continue
+        for path, content in ((f"{base_path}_{name}_T.txt", format_timestamped(track)),
+                              (f"{base_path}_{name}.txt", format_plain(track))):
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(content)
+            written.append(path)
+    return written
+
+
+def import_text_files(directory, drama_name):
+    """Tracks for update_store from the {drama}_Ep_{n}_{Language}_T.txt files in directory"""
+    pattern = re.compile(rf"^{re.escape(drama_name)}_Ep_(\d+)_({'|'.join(LANG_NAMES.values())})_T\.txt$")
+    codes = {name: lang for lang, name in LANG_NAMES.items()}
+    tracks = {}
+    for filename in sorted(os.listdir(directory)):
+        match = pattern.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename), encoding="utf-8") as f:
+            tracks[(int(match.group(1)), codes[match.group(2)])] = parse_timestamped(f.read())
+    return tracks
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = arg_parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("import", help="build a drama's store from its _T text files")
+    build.add_argument("directory")
+    build.add_argument("drama")
+    export = commands.add_parser("export", help="write the text files of every episode in a store")
+    export.add_argument("store")
+    export.add_argument("directory")
+    export.add_argument("drama")
+    lookup = commands.add_parser("at", help="print the segment playing at a time")
+    lookup.add_argument("store")
+    lookup.add_argument("episode", type=int)
+    lookup.add_argument("lang", choices=sorted(LANG_NAMES))
+    lookup.add_argument("seconds", type=float)
+    args = arg_parser.parse_args()
+
+    if args.command == "import":
+        tracks = import_text_files(args.directory, args.drama)
+        path = store_path(args.directory, args.drama)
+        update_store(path, tracks)
+        text_bytes = sum(os.path.getsize(os.path.join(args.directory, f)) for f in os.listdir(args.directory)
+                         if f.startswith(f"{args.drama}_Ep_") and f.endswith(".txt"))
+        print(f"✓ {len(tracks)} tracks -> {path}: {os.path.getsize(path) / 1024:.0f} KB "
+              f"(text files: {text_bytes / 1024:.0f} KB)")
+    elif args.command == "export":
+        with TranscriptStore(args.store) as store:
+            for episode in store.episodes():
+                export_episode(store, episode, os.path.join(args.directory, f"{args.drama}_Ep_{episode}"))
+            print(f"✓ Exported {len(store.episodes())} episodes to {args.directory}")
+    else:
+        with TranscriptStore(args.store) as store:
+            track = store.track(args.episode, args.lang)
+            segment = track.segment_at(args.seconds) if track else None
+            print(f"[{segment.start:.2f}] {segment.text}" if segment else "No segment at that time")
+
+
+if __name__ == "__main__":
+    main()
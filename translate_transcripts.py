@@ -1,6 +1,13 @@
-from translate import Translator
+import concurrent.futures
+import hashlib
+import json
+import os
 import re
-import time
+import threading
+import metrics
+from translation_engine import get_engine, QueryLengthError, TranslationError
+
+SOURCE_LANG = 'hi'  # Language the transcripts are fetched in
 
 def clean_text(text):
     """Remove brackets and their contents"""
@@ -29,76 +36,144 @@ def split_text(text, max_length=450):  # Reduced to 450 for safety margin
     
     return chunks
 
-def translate_file(input_file, output_file, target_lang):
+def chunk_key(chunk, source_lang, target_lang):
+    """Journal key of a chunk: the same text in the same language pair is the same work"""
+    return hashlib.sha256(f"{source_lang}\0{target_lang}\0{chunk}".encode('utf-8')).hexdigest()
+
+def _journal_path(output_file):
+    return f"{output_file}.journal"
+
+def load_journal(output_file):
+    """Chunk key -> journal entry for every chunk finished by an earlier run"""
+    entries = {}
+    try:
+        with open(_journal_path(output_file), encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Last line cut short by a crash; that chunk is redone
+                entries[entry["key"]] = entry
+    except OSError:
+        pass
+    return entries
+
+def _append_journal(journal, entry):
+    journal.write(json.dumps(entry, ensure_ascii=False) + "\n")
+    journal.flush()
+    os.fsync(journal.fileno())  # One fsync per paid API call is cheap next to the call itself
+
+def _translate_chunk(engine, chunk, source_lang, target_lang, done, record, failed, label):
+    """Translation of one chunk: from the journal if an earlier run finished it, else from the provider"""
+    key = chunk_key(chunk, source_lang, target_lang)
+    entry = done.get(key)
+    if entry is not None:
+        metrics.inc("translation_journal_hits_total", target_lang=target_lang)
+        if "split" not in entry:
+            return entry["text"]
+        parts = entry["split"]
+    else:
+        try:
+            translated_chunk = engine.translate(chunk, source_lang, target_lang)
+            record({"key": key, "text": translated_chunk})
+            print(f"  ✓ {label} ({len(chunk)} chars)")
+            return translated_chunk
+        except QueryLengthError as e:
+            parts = split_text(chunk, max_length=int(len(chunk)*0.8))
+            if len(parts) < 2:
+                error = e
+            else:
+                print(f"Implementing dynamic chunk reduction for {label}...")
+                # Remember the split too, so a resume goes straight to the smaller chunks
+                record({"key": key, "split": parts})
+                error = None
+        except TranslationError as e:
+            error = e
+        if error is not None:
+            print(f"✗ Final failure - skipping {label}")
+            metrics.inc("translation_failed_chunks_total", target_lang=target_lang)
+            failed.append(key)
+            return f"[TRANSLATION FAILED: {str(error)}]"
+    failures = len(failed)
+    translated_chunk = ' '.join(_translate_chunk(engine, part, source_lang, target_lang, done, record, failed,
+                                                 f"{label}.{j+1}") for j, part in enumerate(parts))
+    if len(failed) == failures:
+        engine.remember(chunk, translated_chunk, source_lang, target_lang)
+    return translated_chunk
+
+def translate_file(input_file, output_file, target_lang, source_lang=SOURCE_LANG, engine=None):
+    """
+    Translate input_file chunk by chunk on the shared translation engine's workers, then
+    reassemble the chunks in order. Every finished chunk is appended to
+    {output_file}.journal, so a rerun after a crash only pays for the chunks it has not
+    done yet; the output file is assembled once at the end. The journal is removed when
+    every chunk succeeded and kept otherwise, so the next run retries just the failures.
+    """
     try:
         with open(input_file, 'r', encoding='utf-8') as f:
             text = f.read()
         
         chunks = split_text(text)
-        translator = Translator(from_lang='hi', to_lang=target_lang, provider='mymemory')
+        engine = engine or get_engine()
+        done = load_journal(output_file)
+        if done:
+            print(f"↻ Resuming {output_file}: {len(done)} chunks already in the journal")
+            metrics.inc("translation_resumes_total", target_lang=target_lang)
+        print(f"🌐 Translating {len(chunks)} chunks of {input_file} to {target_lang} "
+              f"({engine.provider.name}, {engine.workers} workers)")
         
-        translated = []
-        for i, chunk in enumerate(chunks):
-            # Skip already processed chunks if resuming
-            if i < len(translated):
-                continue
-                
-            success = False
-            retries = 3
-            for attempt in range(retries):
-                try:
-                    print(f"\nTranslating chunk {i+1}/{len(chunks)} ({len(chunk)} chars) - Attempt {attempt+1}")
-                    
-                    # Remove timeout parameter and use general exception handling
-                    translated_chunk = translator.translate(chunk)
-                    
-                    # Verify translation quality
-                    if translated_chunk.strip() == chunk.strip():
-                        raise ValueError("No translation occurred")
-                        
-                    translated.append(translated_chunk)
-                    success = True
-                    break
-                
-                except Exception as e:
-                    print(f"Translation error: {str(e)}")
-                    if "QUERY LENGTH LIMIT" in str(e):
-                        print("Implementing dynamic chunk reduction...")
-                        new_chunks = split_text(chunk, max_length=int(len(chunk)*0.8))
-                        chunks[i+1:i+1] = new_chunks
-                        break
-                    if attempt < retries - 1:
-                        wait_time = 2 ** attempt
-                        print(f"Retrying in {wait_time} seconds...")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        print("Final failure - skipping chunk")
-                        translated.append(f"[TRANSLATION FAILED: {str(e)}]")
-                        break
-            
-            # Save progress after each chunk
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write(' '.join(translated))
-            print(f"Progress saved: {i+1}/{len(chunks)} chunks completed")
+        failed = []
+        journal_lock = threading.Lock()
+        with open(_journal_path(output_file), 'a', encoding='utf-8') as journal:
+            def record(entry):
+                with journal_lock:
+                    _append_journal(journal, entry)
             
+            futures = [
+                engine.submit(_translate_chunk, engine, chunk, source_lang, target_lang, done, record, failed,
+                              f"{os.path.basename(output_file)} chunk {i+1}/{len(chunks)}")
+                for i, chunk in enumerate(chunks)
+            ]
+            # Workers finish in any order; the output keeps the input's
+            translated = [future.result() for future in futures]
+        
+        tmp_file = f"{output_file}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            f.write(' '.join(translated))
+        os.replace(tmp_file, output_file)
+        if failed:
+            print(f"⚠ {len(failed)} chunks failed; rerun to retry them (journal kept)")
+        else:
+            os.remove(_journal_path(output_file))
         print(f"Successfully translated to {output_file}")
     
     except Exception as e:
         print(f"Critical translation failure: {str(e)}")
 
+def translate_files(jobs, engine=None):
+    """
+    Translate (input_file, output_file, target_lang) jobs at the same time. Their chunks
+    share the engine's workers and rate limit, so a short file never waits behind a long one.
+    """
+    engine = engine or get_engine()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(jobs)),
+                                               thread_name_prefix="translate-file") as executor:
+        list(executor.map(lambda job: translate_file(*job, engine=engine), jobs))
+
 def main():
     # File paths
     file_with_timestamps = "Jaan Se Pyara Juni - Mega Last Ep 34 - Part 02 - [CC]  25 Dec 2024, PWRD By Happilac Paints - HUM TV_with_timestamps.txt"
     file_without_timestamps = "Jaan Se Pyara Juni - Mega Last Ep 34 - Part 02 - [CC]  25 Dec 2024, PWRD By Happilac Paints - HUM TV_without_timestamps.txt"
 
-    # Translate to English
-    translate_file(file_with_timestamps, "video_title_with_timestamps_en.txt", 'en')
-    translate_file(file_without_timestamps, "video_title_without_timestamps_en.txt", 'en')
-
-    # Translate to Urdu
-    translate_file(file_with_timestamps, "video_title_with_timestamps_ur.txt", 'ur')
-    translate_file(file_without_timestamps, "video_title_without_timestamps_ur.txt", 'ur')
+    translate_files([
+        # Translate to English
+        (file_with_timestamps, "video_title_with_timestamps_en.txt", 'en'),
+        (file_without_timestamps, "video_title_without_timestamps_en.txt", 'en'),
+        # Translate to Urdu
+        (file_with_timestamps, "video_title_with_timestamps_ur.txt", 'ur'),
+        (file_without_timestamps, "video_title_without_timestamps_ur.txt", 'ur'),
+    ])
 
 if __name__ == "__main__":
+    metrics.start_from_env()
     main() 
\ No newline at end of file
@@ -0,0 +1,256 @@
+import concurrent.futures
+import os
+import random
+import threading
+import time
+
+import metrics
+from translation_memory import get_translation_memory, split_sentences
+
+try:
+    from translate import Translator
+except ImportError:                  # Only the fake provider works without it
+    Translator = None
+
+TRANSLATION_PROVIDER = os.environ.get("TRANSLATION_PROVIDER", "mymemory")
+TRANSLATION_WORKERS = int(os.environ.get("TRANSLATION_WORKERS", "4"))     # Chunks in flight across all files
+TRANSLATION_RATE = os.environ.get("TRANSLATION_RATE")                     # Requests/s; unset uses the provider's quota
+TRANSLATION_BURST = os.environ.get("TRANSLATION_BURST")                   # Requests allowed back to back
+TRANSLATION_RETRIES = 3
+
+
+class TranslationError(Exception):
+    pass
+
+
+class QueryLengthError(TranslationError):
+    """The provider rejected a chunk as too long; retrying the same text is pointless"""
+
+
+class TokenBucket:
+    """
+    Allows rate requests per second on average and up to capacity back to back. Tokens
+    are reserved under a thread lock, so one bucket throttles every worker sharing it.
+    """
+
+    def __init__(self, rate, capacity=1):
+        self.rate = rate
+        self.capacity = max(1, capacity)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """Take tokens (going into debt if needed) and return how long to wait before using them"""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= tokens
+            return 0.0 if self._tokens >= 0 else -self._tokens / self.rate
+
+    def acquire(self, tokens=1):
+        delay = self.reserve(tokens)
+        if delay > 0:
+            metrics.observe("translation_throttle_seconds", delay)
+            time.sleep(delay)
+
+
+class TranslationProvider:
+    """Translates one chunk. rate and burst describe the provider's request quota."""
+    name = None
+    rate = None                      # Requests per second; None means unlimited
+    burst = 1
+
+    def translate(self, text, source_lang, target_lang):
+        raise NotImplementedError
+
+
+class TranslateLibProvider(TranslationProvider):
+    """A provider of the translate package (mymemory, microsoft, deepl, libre)"""
+
+    def __init__(self, provider="mymemory", rate=None, burst=1, **options):
+        if Translator is None:
+            raise TranslationError("the translate package is not installed")
+        self.name = provider
+        self.rate = rate
+        self.burst = burst
+        self.options = options
+        self._local = threading.local()
+
+    def _translator(self, source_lang, target_lang):
+        translators = getattr(self._local, "translators", None)
+        if translators is None:
+            translators = self._local.translators = {}
+        if (source_lang, target_lang) not in translators:
+            translators[(source_lang, target_lang)] = Translator(
+                from_lang=source_lang, to_lang=target_lang, provider=self.name, **self.options
+            )
+        return translators[(source_lang, target_lang)]
+
+    def translate(self, text, source_lang, target_lang):
+        try:
+            return self._translator(source_lang, target_lang).translate(text)
+        except Exception as e:
+            if "QUERY LENGTH LIMIT" in str(e):
+                raise QueryLengthError(str(e)) from e
+            raise
+
+
+class FakeProvider(TranslationProvider):
+    """
+    Local stand-in for tests and benchmarks: tags the text with the target language after
+    latency seconds. Chunks over max_length are rejected like MyMemory does, and
+    fail_rate of calls raise. merge_lines answers on one line, as providers sometimes do.
+    """
+    name = "fake"
+
+    def __init__(self, latency=0.0, max_length=None, fail_rate=0.0, rate=None, burst=1, merge_lines=False):
+        self.latency = latency
+        self.max_length = max_length
+        self.fail_rate = fail_rate
+        self.rate = rate
+        self.burst = burst
+        self.merge_lines = merge_lines
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def translate(self, text, source_lang, target_lang):
+        with self._lock:
+            self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.max_length and len(text) > self.max_length:
+            raise QueryLengthError(f"QUERY LENGTH LIMIT EXCEEDED. MAX ALLOWED QUERY : {self.max_length} CHARS")
+        if self.fail_rate and random.random() < self.fail_rate:
+            raise TranslationError("fake provider failure")
+        if self.merge_lines:
+            return f"<{target_lang}> " + " ".join(text.split("\n"))
+        # Line by line, as real providers keep line breaks
+        return "\n".join(f"<{target_lang}> {line}" for line in text.split("\n"))
+
+
+# MyMemory's free tier answers a few requests per second before it starts refusing
+PROVIDERS = {
+    "mymemory": lambda: TranslateLibProvider("mymemory", rate=2.0, burst=4),
+    "fake": lambda: FakeProvider(latency=0.05),
+}
+
+
+def get_provider(name=TRANSLATION_PROVIDER):
+    if name not in PROVIDERS:
+        raise ValueError(f"Unknown translation provider: {name} (choose from {', '.join(PROVIDERS)})")
+    return PROVIDERS[name]()
+
+
+class TranslationEngine:
+    """
+    A bounded worker pool in front of one provider. Text is looked up in the translation
+    memory first, whole and then sentence by sentence, and only what is missing is sent.
+    Every provider call takes a token from the provider's bucket, so the pool can be
+    shared by any number of files without exceeding the quota; a worker backing off after
+    an error leaves the others running. memory=False disables the translation memory.
+    """
+
+    def __init__(self, provider=None, workers=TRANSLATION_WORKERS, rate=None, burst=None, memory=None):
+        self.provider = provider or get_provider()
+        self.memory = get_translation_memory() if memory is None else None if memory is False else memory
+        rate = rate if rate is not None else float(TRANSLATION_RATE) if TRANSLATION_RATE else self.provider.rate
+        burst = burst if burst is not None else int(TRANSLATION_BURST) if TRANSLATION_BURST else self.provider.burst
+        self.bucket = TokenBucket(rate, burst)
+        self.workers = workers
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="translate")
+
+    def submit(self, fn, *args, **kwargs):
+        return self._executor.submit(fn, *args, **kwargs)
+
+    def translate(self, text, source_lang, target_lang, retries=TRANSLATION_RETRIES):
+        """
+        Translated text, from the translation memory where possible. Raises QueryLengthError
+        at once and TranslationError once every attempt has failed.
+        """
+        if self.memory is None:
+            return self._call(text, source_lang, target_lang, retries)
+        remembered = self.memory.get(text, source_lang, target_lang)
+        if remembered is not None:
+            metrics.inc("translation_memory_hits_total", kind="exact", target_lang=target_lang)
+            return remembered
+
+        sentences = split_sentences(text)
+        known = self.memory.get_many(sentences, source_lang, target_lang) if len(sentences) > 1 else {}
+        missing = list(dict.fromkeys(sentence for sentence in sentences if sentence not in known))
+        if known:
+            metrics.inc("translation_memory_hits_total", sum(sentence in known for sentence in sentences),
+                        kind="sentence", target_lang=target_lang)
+        if missing:
+            metrics.inc("translation_memory_misses_total", target_lang=target_lang)
+            # One sentence per line, so the reply can be remembered sentence by sentence
+            translated = self._call("\n".join(missing), source_lang, target_lang, retries)
+            lines = [line.strip() for line in translated.strip().split("\n")]
+            if len(lines) == len(missing):
+                known.update(zip(missing, lines))
+                self.memory.put_many(zip(missing, lines), source_lang, target_lang)
+            else:
+                # The provider merged lines. The reply can only take the place of the missing
+                # sentences if they form one run in the chunk; otherwise the chunk goes whole.
+                gap = [i for i, sentence in enumerate(sentences) if sentence not in known]
+                if gap[-1] - gap[0] + 1 == len(gap) and [sentences[i] for i in gap] == missing:
+                    merged = " ".join(line for line in lines if line)
+                    self.memory.put(" ".join(missing), merged, source_lang, target_lang)
+                    translated = " ".join([known[sentence] for sentence in sentences[:gap[0]]] + [merged] +
+                                          [known[sentence] for sentence in sentences[gap[-1] + 1:]])
+                else:
+                    translated = self._call(text, source_lang, target_lang, retries)
+                self.memory.put(text, translated, source_lang, target_lang)
+                return translated
+        translated = " ".join(known[sentence] for sentence in sentences)
+        if len(sentences) > 1:
+            self.memory.put(text, translated, source_lang, target_lang)
+        return translated
+
+    def remember(self, text, translation, source_lang, target_lang):
+        """Store a translation the caller assembled itself, e.g. from the parts of a split chunk"""
+        if self.memory is not None:
+            self.memory.put(text, translation, source_lang, target_lang)
+
+    def _call(self, text, source_lang, target_lang, retries):
+        """One provider translation, retried with exponential backoff"""
+        for attempt in range(retries):
+            if attempt:
+                metrics.retry("translation")
+            self.bucket.acquire()
+            try:
+                with metrics.timed("translation", target_lang=target_lang):
+                    translated = self.provider.translate(text, source_lang, target_lang)
+                    # Verify translation quality
+                    if translated.strip() == text.strip():
+                        raise TranslationError("No translation occurred")
+                metrics.add_bytes("translation", len(text.encode("utf-8")), target_lang=target_lang)
+                return translated
+            except QueryLengthError:
+                raise
+            except Exception as e:
+                print(f"Translation error: {str(e)}")
+                if attempt == retries - 1:
+                    raise TranslationError(str(e)) from e
+                wait_time = 2 ** attempt
+                print(f"Retrying in {wait_time} seconds...")
+                time.sleep(wait_time)
+
+    def close(self):
+        self._executor.shutdown(wait=True)
+
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Process-wide engine for TRANSLATION_PROVIDER, shared by every file being translated"""
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = TranslationEngine()
+        return _default_engine
@@ -0,0 +1,136 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+
+TRANSLATION_MEMORY_PATH = os.environ.get("TRANSLATION_MEMORY_PATH", os.path.join(".cache", "translation_memory.sqlite3"))
+TRANSLATION_MEMORY_MAX_ENTRIES = int(os.environ.get("TRANSLATION_MEMORY_MAX_ENTRIES", "500000"))
+SENTENCE_END = re.compile(r"(?<=[.!?۔؟…])\s+")     # Latin, Urdu full stop / question mark, ellipsis
+
+
+def normalize_segment(text):
+    """Text as it is keyed: NFKC, runs of whitespace collapsed, ends trimmed"""
+    return " ".join(unicodedata.normalize("NFKC", text).split())
+
+
+def segment_key(text):
+    return hashlib.sha256(normalize_segment(text).encode("utf-8")).hexdigest()
+
+
+def split_sentences(text):
+    """Sentences of a chunk, the unit recurring dialogue repeats in. Only whitespace is normalized."""
+    return [sentence for sentence in SENTENCE_END.split(" ".join(text.split())) if sentence]
+
+
+class TranslationMemory:
+    """
+    Persistent translations per (source language, target language, normalized text hash),
+    for whole chunks and single sentences alike. Translations never expire; when the
+    memory grows past max_entries the least recently used entries are evicted. Safe to
+    share between threads.
+    """
+
+    def __init__(self, path=TRANSLATION_MEMORY_PATH, max_entries=TRANSLATION_MEMORY_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS translation_memory (
+                source_lang TEXT NOT NULL,
+                target_lang TEXT NOT NULL,
+                key TEXT NOT NULL,
+                source TEXT NOT NULL,
+                translation TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (source_lang, target_lang, key)
+            )
+        """)
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_translation_memory_accessed ON translation_memory (accessed_at)"
+        )
+
+    def get(self, text, source_lang, target_lang):
+        """Remembered translation of text, or None"""
+        return self.get_many([text], source_lang, target_lang).get(text)
+
+    def get_many(self, texts, source_lang, target_lang):
+        """{text: translation} for every one of texts that is remembered"""
+        keys = {}
+        for text in texts:
+            keys.setdefault(segment_key(text), []).append(text)   # Variants that normalize alike share a key
+        if not keys:
+            return {}
+        found = {}
+        placeholders = ",".join("?" * len(keys))
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT key, translation FROM translation_memory "
+                f"WHERE source_lang = ? AND target_lang = ? AND key IN ({placeholders})",
+                (source_lang, target_lang, *keys)
+            ).fetchall()
+            if rows:
+                self._conn.execute(
+                    f"UPDATE translation_memory SET accessed_at = ? "
+                    f"WHERE source_lang = ? AND target_lang = ? AND key IN ({','.join('?' * len(rows))})",
+                    (time.time(), source_lang, target_lang, *(key for key, _ in rows))
+                )
+        for key, translation in rows:
+            for text in keys[key]:
+                found[text] = translation
+        return {text: found[text] for text in texts if text in found}
+
+    def put(self, text, translation, source_lang, target_lang):
+        self.put_many([(text, translation)], source_lang, target_lang)
+
+    def put_many(self, pairs, source_lang, target_lang):
+        """Remember (text, translation) pairs"""
+        now = time.time()
+        rows = [(source_lang, target_lang, segment_key(text), normalize_segment(text), translation, now, now)
+                for text, translation in pairs]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                self._conn.executemany("INSERT OR REPLACE INTO translation_memory VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+                self._evict()
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _evict(self):
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM translation_memory").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM translation_memory WHERE rowid IN "
+                "(SELECT rowid FROM translation_memory ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM translation_memory").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+_translation_memory = None
+_translation_memory_lock = threading.Lock()
+
+
+def get_translation_memory():
+    """Process-wide memory at TRANSLATION_MEMORY_PATH, shared by every episode and drama"""
+    global _translation_memory
+    with _translation_memory_lock:
+        if _translation_memory is None:
+            _translation_memory = TranslationMemory(TRANSLATION_MEMORY_PATH)
+        return _translation_memory
@@ -1,17 +1,31 @@
 import os
 import re
+import argparse
 import time
 import json
 import threading
 import logging
-import requests
-import subprocess
 import tempfile
+import shutil
+import socket
 import concurrent.futures
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from dotenv import load_dotenv
 import random
-from http.cookiejar import MozillaCookieJar
+import http_client
+import metrics
+import tracing
+from s3_stream import S3MultipartWriter, stream_response
+from range_download import download_url
+from episode_ledger import (EpisodeLedger, LEDGER_PATH, STAGE_RESOLVED, STAGE_DOWNLOADED,
+                            STAGE_UPLOADED, STAGE_TRANSCRIPTS_UPLOADED)
+from work_coordinator import S3LeaseCoordinator
+from strategy_scoreboard import StrategyScoreboard, SCOREBOARD_PATH
+from transcript_store import TranscriptStore, store_path, export_episode
+from proxy_pool import ProxyPool, DIRECT
+from ytdlp_engine import YtDlpEngine, progress_printer
 
 # Load environment variables from .env file
 load_dotenv()
@@ -22,8 +36,13 @@ REQUEST_DELAY = 2
 TEMP_DIR = tempfile.gettempdir()  
 TRANSCRIPT_DIR = "transcripts"      # Only for finding transcripts, not storing
 MAX_THREADS = 4
-INSTANCE_ID = os.environ.get("AWS_INSTANCE_ID", f"worker-{threading.get_native_id()}")
+CONCURRENT_MODE = True          # Process episodes on a pool of MAX_THREADS workers
+# Must be unique per running process: it names the owner of work leases in S3_COORD_BUCKET1
+INSTANCE_ID = os.environ.get("AWS_INSTANCE_ID", f"worker-{socket.gethostname()}-{os.getpid()}")
 STRICT_MODE = False
+STREAM_TO_S3 = False            # Pipe downloads straight into S3 multipart uploads instead of TEMP_DIR
+# Comma-separated proxy URLs for the pytube/direct strategies; "direct" means no proxy
+PROXY_URLS = os.environ.get("PROXY_URLS", f"{DIRECT},http://185.199.229.156:9292,http://185.199.228.220:9292")
 
 # Set a minimal file size (in bytes) to consider the download valid (e.g., 1 MB)
 MIN_VIDEO_SIZE = 1024 * 1024  # 1 MB
@@ -34,6 +53,13 @@ AWS_SECRET_ACCESS_KEY1 = os.environ.get("AWS_SECRET_ACCESS_KEY1")
 AWS_REGION1 = os.environ.get("AWS_REGION1", "us-east-1")  # Default to us-east-1 if not specified
 S3_BUCKET1 = os.environ.get("S3_BUCKET1")
 S3_COORD_BUCKET1 = os.environ.get("S3_COORD_BUCKET1")
+S3_ENDPOINT_URL1 = os.environ.get("S3_ENDPOINT_URL1")  # Optional, e.g. a local S3 stand-in
+
+# S3 transfer tuning
+S3_PART_SIZE = int(os.environ.get("S3_PART_SIZE_MB", "16")) * 1024 * 1024
+S3_MAX_CONCURRENCY = int(os.environ.get("S3_MAX_CONCURRENCY", "8"))   # Parallel parts per large upload
+S3_SMALL_OBJECT_SIZE = 8 * 1024 * 1024   # Below this a single put_object beats a multipart transfer
+S3_MAX_POOL_CONNECTIONS = MAX_THREADS * S3_MAX_CONCURRENCY
 
 print(f"AWS_ACCESS_KEY_ID1: {AWS_ACCESS_KEY_ID1}")
 print(f"AWS_SECRET_ACCESS_KEY1: {AWS_SECRET_ACCESS_KEY1}")
@@ -42,7 +68,8 @@ print(f"S3_COORD_BUCKET1: {S3_COORD_BUCKET1}")
 print(f"STRICT_MODE: {STRICT_MODE}")
 
 try:
-    from transcript_fetcher import dramas, url_to_id, get_video_info, extract_episode_number
+    from transcript_fetcher import (dramas, url_to_id, get_video_info, resolve_episode_number,
+                                    resolve_playlist_episodes, resolve_playlist, YOUTUBE_BASE_URL)
 except ImportError:
     print("ERROR: Failed to import data from transcript_fetcher.py")
     raise
@@ -59,52 +86,122 @@ logging.basicConfig(
 logger = logging.getLogger("video_downloader")
 
 class S3Uploader:
+    # One client (and so one urllib3 connection pool) is shared by every uploader and worker thread
+    _shared_client = None
+    _client_lock = threading.Lock()
+    _verified_buckets = set()
+
     def __init__(self):
-        """Initialize S3 client using AWS credentials"""
+        """Initialize S3 uploader; the client is shared and the bucket is verified lazily"""
         print("Initializing S3 uploader...")
         
         if not AWS_ACCESS_KEY_ID1 or not AWS_SECRET_ACCESS_KEY1 or not S3_BUCKET1:
             raise Exception("AWS credentials or bucket name missing from .env file")
             
         try:
-            self.s3_client = boto3.client(
-                's3',
-                aws_access_key_id=AWS_ACCESS_KEY_ID1,
-                aws_secret_access_key=AWS_SECRET_ACCESS_KEY1,
-                region_name=AWS_REGION1
+            self.s3_client = self._get_shared_client()
+            self.transfer_config = TransferConfig(
+                multipart_threshold=S3_SMALL_OBJECT_SIZE,
+                multipart_chunksize=S3_PART_SIZE,
+                max_concurrency=S3_MAX_CONCURRENCY,
+                use_threads=True
             )
-            # Test connection by listing buckets
-            self.s3_client.list_buckets()
-            print(f"✓ Successfully connected to AWS S3")
-            print(f"✓ Using bucket: {S3_BUCKET1}")
-            # Verify bucket exists
-            self.s3_client.head_bucket(Bucket=S3_BUCKET1)
-            print(f"✓ Bucket {S3_BUCKET1} verified")
-            
+            print(f"✓ Using bucket: {S3_BUCKET1} (part size {S3_PART_SIZE // (1024 * 1024)} MB, "
+                  f"{S3_MAX_CONCURRENCY} parallel parts)")
         except Exception as e:
             logger.error(f"S3 initialization error: {str(e)}")
             raise Exception(f"Failed to initialize S3: {str(e)}")
     
+    @classmethod
+    def _get_shared_client(cls):
+        """Create the process-wide S3 client on first use"""
+        with cls._client_lock:
+            if cls._shared_client is None:
+                cls._shared_client = boto3.client(
+                    's3',
+                    aws_access_key_id=AWS_ACCESS_KEY_ID1,
+                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY1,
+                    region_name=AWS_REGION1,
+                    endpoint_url=S3_ENDPOINT_URL1,
+                    config=Config(
+                        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                        retries={'max_attempts': 5, 'mode': 'adaptive'},
+                        tcp_keepalive=True
+                    )
+                )
+            return cls._shared_client
+    
+    def ensure_bucket(self):
+        """Verify the bucket once per process instead of on every start"""
+        if S3_BUCKET1 in self._verified_buckets:
+            return
+        with self._client_lock:
+            if S3_BUCKET1 in self._verified_buckets:
+                return
+            try:
+                self.s3_client.head_bucket(Bucket=S3_BUCKET1)
+            except Exception as e:
+                logger.error(f"S3 bucket verification error: {str(e)}")
+                raise Exception(f"Failed to verify bucket {S3_BUCKET1}: {str(e)}")
+            self._verified_buckets.add(S3_BUCKET1)
+            print(f"✓ Bucket {S3_BUCKET1} verified")
+    
+    @tracing.traced("upload_file")
     def upload_file(self, local_path, remote_path):
         """Upload a file to S3 and return the URL"""
         try:
+            self.ensure_bucket()
             s3_key = remote_path.lstrip('/')
             print(f"Uploading file to S3: {local_path} → s3://{S3_BUCKET1}/{s3_key}")
-            file_size = os.path.getsize(local_path) / (1024 * 1024)
+            size_bytes = os.path.getsize(local_path)
+            file_size = size_bytes / (1024 * 1024)
             print(f"File size: {file_size:.2f} MB")
             
-            self.s3_client.upload_file(
-                local_path, 
-                S3_BUCKET1, 
-                s3_key,
-                ExtraArgs={'ACL': 'public-read'}
-            )
-            s3_url = f"https://{S3_BUCKET1}.s3.{AWS_REGION1}.amazonaws.com/{s3_key}"
+            if size_bytes < S3_SMALL_OBJECT_SIZE:
+                # Transcripts and other small files: one PUT, no transfer-manager threads
+                with metrics.timed("s3_upload", mode="put"), open(local_path, 'rb') as f:
+                    self.s3_client.put_object(
+                        Bucket=S3_BUCKET1,
+                        Key=s3_key,
+                        Body=f.read(),
+                        ACL='public-read'
+                    )
+            else:
+                with metrics.timed("s3_upload", mode="multipart"):
+                    self.s3_client.upload_file(
+                        local_path, 
+                        S3_BUCKET1, 
+                        s3_key,
+                        ExtraArgs={'ACL': 'public-read'},
+                        Config=self.transfer_config
+                    )
+            metrics.add_bytes("upload", size_bytes, target="s3", mode="file")
+            s3_url = self.object_url(s3_key)
             print(f"✓ Successfully uploaded file to S3: {s3_url}")
             return s3_url
         except Exception as e:
             logger.error(f"S3 upload error: {str(e)}")
             raise Exception(f"Failed to upload to S3: {str(e)}")
+    
+    def open_stream(self, remote_path):
+        """Open a writer that streams bytes into s3://S3_BUCKET1/remote_path as a multipart upload"""
+        self.ensure_bucket()
+        s3_key = remote_path.lstrip('/')
+        print(f"Streaming to S3: s3://{S3_BUCKET1}/{s3_key}")
+        return S3MultipartWriter(
+            self.s3_client,
+            S3_BUCKET1,
+            s3_key,
+            part_size=S3_PART_SIZE,
+            extra_args={'ACL': 'public-read'}
+        )
+    
+    def object_url(self, remote_path):
+        """Public URL of an uploaded object"""
+        s3_key = remote_path.lstrip('/')
+        if S3_ENDPOINT_URL1:
+            return f"{S3_ENDPOINT_URL1.rstrip('/')}/{S3_BUCKET1}/{s3_key}"
+        return f"https://{S3_BUCKET1}.s3.{AWS_REGION1}.amazonaws.com/{s3_key}"
 
 class VideoDownloader:
     def __init__(self):
@@ -115,33 +212,44 @@ class VideoDownloader:
         print(f"Temp directory: {TEMP_DIR}")
         print("*"*60 + "\n")
         
-        # Check for yt-dlp availability
-        self.yt_dlp_available = False
-        try:
-            result = subprocess.run(["yt-dlp", "--version"], capture_output=True, text=True)
-            if result.returncode == 0:
-                self.yt_dlp_available = True
-                print(f"Found yt-dlp version: {result.stdout.strip()}")
-            else:
-                print("yt-dlp not found. Will use fallback methods.")
-        except Exception:
+        # yt-dlp runs in-process: one reusable YoutubeDL per worker thread
+        self.ytdlp = YtDlpEngine(cookie_path=http_client.COOKIE_PATH)
+        self.yt_dlp_available = self.ytdlp.available
+        if self.yt_dlp_available:
+            print(f"Found yt-dlp version: {self.ytdlp.version}")
+        else:
             print("yt-dlp not found. Will use fallback methods.")
         
         # Initialize S3 uploader
         self.s3 = S3Uploader()
         self.processed_episodes = set()
+        self.in_progress_episodes = set()
+        self._episodes_lock = threading.Lock()
+        self.ledger = EpisodeLedger(LEDGER_PATH)
+        print(f"Episode ledger: {LEDGER_PATH}")
+        # Strategy success history, so known-bad strategies and videos are skipped quickly
+        self.scoreboard = StrategyScoreboard(SCOREBOARD_PATH)
+        
+        # Split episodes with other instances through leases in the coordination bucket
+        self.coordinator = None
+        if S3_COORD_BUCKET1:
+            self.coordinator = S3LeaseCoordinator(self.s3.s3_client, S3_COORD_BUCKET1, INSTANCE_ID)
+            self.coordinator.start_heartbeat()
+            print(f"Coordinating work through s3://{S3_COORD_BUCKET1} as {INSTANCE_ID}")
         self._setup_rotating_headers()
-        self.proxy_pool = [
-            None,  # Direct connection
-            'http://185.199.229.156:9292',
-            'http://185.199.228.220:9292'
-        ]
-        self.current_proxy = 0
+        # Latency-weighted proxy choice; failing proxies are ejected until a health probe passes
+        self.proxy_pool = ProxyPool([proxy.strip() for proxy in PROXY_URLS.split(",") if proxy.strip()])
+        if any(proxy != DIRECT for proxy in self.proxy_pool.proxies):
+            self.proxy_pool.start_health_checks()
         
         # Get the directory of the current script
         # self.base_dir = os.path.dirname(os.path.abspath(__file__))
-        self.cookie_path = '/home/ec2-user/youtube_cookies.txt'
+        self.cookie_path = http_client.COOKIE_PATH
         self._verify_cookie_file()
+        
+        # One keep-alive pool (with cookies loaded once) shared by every worker and strategy
+        http_client.configure(pool_size=MAX_THREADS * 2, cookie_path=self.cookie_path)
+        self.http = http_client.get_session()
     
     def _verify_cookie_file(self):
         """Ensure cookies exist and are valid"""
@@ -152,36 +260,7 @@ class VideoDownloader:
         if file_size < 100:
             print(f"⚠ Warning: cookies.txt seems small ({file_size} bytes). YouTube access may fail.")
 
-    def _get_ytdlp_command(self, url, output_path):
-        """Build yt-dlp command with cookies"""
-        return [
-            'yt-dlp',
-            '--cookies', self.cookie_path,
-            '--user-agent', self._random_user_agent(),
-            '-f', 'best[height<=720]',
-            '-o', output_path,
-            '--no-playlist',
-            url
-        ]
-
-    def _create_authenticated_session(self):
-        """Create requests session with cookies"""
-        session = requests.Session()
-        cookies = MozillaCookieJar()
-        cookies.load(self.cookie_path, ignore_discard=True)
-        session.cookies = cookies
-        session.headers.update({
-            'User-Agent': self._random_user_agent(),
-            'Referer': 'https://www.youtube.com/',
-        })
-        return session
-
     def _setup_rotating_headers(self):
-        self.user_agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/119.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/118.0.0.0 Safari/537.36'
-        ]
         self.headers = {
             'Accept-Language': 'en-US,en;q=0.9',
             'Referer': 'https://www.youtube.com/',
@@ -191,202 +270,361 @@ class VideoDownloader:
             'Sec-Fetch-Site': 'same-origin'
         }
 
-    def _rotate_user_agent(self):
-        self.headers['User-Agent'] = random.choice(self.user_agents)
-
-    def _get_proxy(self):
-        proxy = self.proxy_pool[self.current_proxy % len(self.proxy_pool)]
-        self.current_proxy += 1
-        return {'http': proxy, 'https': proxy} if proxy else None
+    def _request_headers(self):
+        """Browser headers with a freshly rotated User-Agent, built per request so threads never share them"""
+        return http_client.request_headers(self.headers)
 
     def check_subtitles(self, url):
         if not self.yt_dlp_available or not STRICT_MODE:
             return True
         
         try:
-            cmd = ["yt-dlp", "--list-subs", "--skip-download", url]
-            result = subprocess.run(cmd, capture_output=True, text=True)
-            
-            if result.returncode != 0:
-                print(f"Failed to check subtitles: {result.stderr}")
-                return not STRICT_MODE
+            listing = self.ytdlp.subtitles(url)
             
-            output = result.stdout.lower()
-            
-            if "has no subtitles" in output:
-                print("❌ Video has no subtitles")
-                return False
+            if listing.manual:
+                print(f"✓ Video has manual subtitles ({', '.join(listing.manual)})")
+                return True
                 
-            if "available automatic captions" in output and "available subtitles" not in output:
+            if listing.automatic:
                 print("❌ Video only has auto-generated subtitles")
                 return False
                 
-            if "available subtitles" in output:
-                print("✓ Video has manual subtitles")
-                return True
-                
-            return not STRICT_MODE
+            print("❌ Video has no subtitles")
+            return False
             
         except Exception as e:
             print(f"Error checking subtitles: {str(e)}")
             return not STRICT_MODE
     
+    def _download_strategies(self):
+        """(name, file download method, stream method) in the order they are tried"""
+        strategies = []
+        if self.yt_dlp_available:
+            strategies.append(("yt-dlp", self._download_ytdlp, self._stream_ytdlp))
+        strategies.append(("pytube", self._download_pytube, self._stream_pytube))
+        strategies.append(("direct", self._download_direct, self._stream_direct))
+        return strategies
+
+    def _ordered_strategies(self, url):
+        """Strategies in scoreboard order, or None when every strategy recently failed this video"""
+        strategies = self.scoreboard.order(self._download_strategies(), url_to_id(url))
+        if not strategies:
+            print(f"⏭️ Every download strategy failed {url} recently. Skipping until the failures expire.")
+            metrics.inc("download_short_circuits_total")
+            return None
+        print(f"Strategy order: {', '.join(name for name, _, _ in strategies)}")
+        return strategies
+
     def download_video(self, url, output_path):
         """Multi-strategy download with automatic bot bypass"""
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        # Strategy 1: yt-dlp with rotating configurations
-        if self.yt_dlp_available:
-            for attempt in range(3):
-                try:
-                    self._rotate_user_agent()
-                    cmd = self._get_ytdlp_command(url, output_path)
-                    print(f"Attempt {attempt+1} with yt-dlp: {' '.join(cmd)}")
-                    
-                    result = subprocess.run(
-                        cmd,
-                        check=True,
-                        stdout=subprocess.PIPE,
-                        stderr=subprocess.STDOUT,
-                        text=True
-                    )
-                    if os.path.exists(output_path) and os.path.getsize(output_path) >= MIN_VIDEO_SIZE:
-                        print("✓ yt-dlp download successful")
-                        return output_path
-                except subprocess.CalledProcessError as e:
-                    print(f"yt-dlp attempt {attempt+1} failed: {e.output[:200]}...")
-                time.sleep(random.uniform(1, 3))
+        strategies = self._ordered_strategies(url)
+        if strategies is None:
+            return None
+        for name, download, _ in strategies:
+            started = time.time()
+            with metrics.timed("download", strategy=name, mode="file") as timer:
+                timer.ok = download(url, output_path)
+            self.scoreboard.record(name, url_to_id(url), timer.ok, time.time() - started)
+            if timer.ok:
+                metrics.add_bytes("download", os.path.getsize(output_path), strategy=name)
+                return output_path
 
-        # Strategy 2: Pytube with header rotation
+        print("⚠ All download methods failed")
+        return None
+
+    def _download_ytdlp(self, url, output_path):
+        """Strategy 1: yt-dlp with a fresh User-Agent per attempt"""
+        for attempt in range(3):
+            if attempt:
+                metrics.retry("download", strategy="yt-dlp")
+            user_agent = self._random_user_agent()
+            print(f"Attempt {attempt+1} with yt-dlp, UA: {user_agent}")
+            result = self.ytdlp.download(url, output_path, progress=progress_printer("yt-dlp"),
+                                         user_agent=user_agent)
+            if result.ok and result.size >= MIN_VIDEO_SIZE:
+                print(f"✓ yt-dlp download successful (format {result.media.format_id}, {result.media.ext})")
+                return True
+            print(f"yt-dlp attempt {attempt+1} failed: {(result.error or f'only {result.size} bytes')[:200]}...")
+            tracing.sleep(random.uniform(1, 3), "retry_backoff")
+        return False
+
+    def _download_pytube(self, url, output_path):
+        """Strategy 2: Pytube with header rotation"""
         for attempt in range(2):
+            if attempt:
+                metrics.retry("download", strategy="pytube")
             try:
-                from pytube import YouTube
-                self._rotate_user_agent()
-                print(f"Trying pytube with UA: {self.headers['User-Agent']}")
-                
-                yt = YouTube(
-                    url,
-                    use_oauth=True,
-                    allow_oauth_cache=True,
-                    proxies=self._get_proxy(),
-                    headers=self.headers
-                )
-                yt.bypass_age_gate()
-                stream = yt.streams.filter(
-                    progressive=True,
-                    file_extension='mp4'
-                ).order_by('resolution').desc().first()
-                
-                # Download with session
-                with requests.Session() as s:
-                    s.headers.update(self.headers)
-                    response = s.get(stream.url, proxies=self._get_proxy(), stream=True)
-                    with open(output_path, 'wb') as f:
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                            
-                    if os.path.exists(output_path) and os.path.getsize(output_path) >= MIN_VIDEO_SIZE:
-                        print("✓ Pytube download successful")
-                        return output_path
+                headers = self._request_headers()
+                print(f"Trying pytube with UA: {headers['User-Agent']}")
+                with self.proxy_pool.lease() as proxies:
+                    stream_url = self._get_pytube_stream_url(url, headers, proxies)
+                    
+                    # Resumable, range-segmented download through the shared session
+                    download_url(stream_url, output_path, session=self.http, headers=headers,
+                                 proxies=proxies)
+                        
+                if os.path.exists(output_path) and os.path.getsize(output_path) >= MIN_VIDEO_SIZE:
+                    print("✓ Pytube download successful")
+                    return True
             except Exception as e:
                 print(f"Pytube attempt {attempt+1} failed: {str(e)}")
-                time.sleep(1)
+                tracing.sleep(1, "retry_backoff")
+        return False
 
-        # Strategy 3: Direct download with session management
-        with requests.Session() as s:
-            s.headers.update(self.headers)
-            for attempt in range(2):
-                try:
-                    video_id = url.split("v=")[1].split("&")[0]
-                    embed_url = f"https://www.youtube.com/embed/{video_id}"
-                    
-                    # Simulate browser navigation
-                    s.get(embed_url, proxies=self._get_proxy())
-                    time.sleep(random.uniform(0.5, 2))
-                    response = s.get(url, proxies=self._get_proxy())
-                    
-                    # Find video URL in page
-                    match = re.search(r'"url":"(https://[^"]+googlevideo[^"]+)"', response.text)
-                    if not match:
-                        continue
-                        
-                    video_url = match.group(1)
+    def _download_direct(self, url, output_path):
+        """Strategy 3: Direct download through the shared session"""
+        for attempt in range(2):
+            if attempt:
+                metrics.retry("download", strategy="direct")
+            try:
+                headers = self._request_headers()
+                with self.proxy_pool.lease() as proxies:
+                    video_url = self._find_direct_video_url(url, headers, proxies)
+                    if not video_url:
+                        # Not the proxy's fault: leaves its record alone, unlike a success
+                        raise RuntimeError("no direct video URL in the watch page")
                     print(f"Found direct video URL: {video_url[:60]}...")
                     
-                    # Download chunk
-                    with open(output_path, 'wb') as f:
-                        response = s.get(video_url, stream=True, proxies=self._get_proxy())
-                        for chunk in response.iter_content(chunk_size=8192):
-                            f.write(chunk)
-                            
-                    if os.path.exists(output_path) and os.path.getsize(output_path) >= MIN_VIDEO_SIZE:
-                        print("✓ Direct download successful")
-                        return output_path
+                    download_url(video_url, output_path, session=self.http, headers=headers,
+                                 proxies=proxies)
                         
-                except Exception as e:
-                    print(f"Direct download attempt {attempt+1} failed: {str(e)}")
-                    time.sleep(1)
+                if os.path.exists(output_path) and os.path.getsize(output_path) >= MIN_VIDEO_SIZE:
+                    print("✓ Direct download successful")
+                    return True
+                    
+            except Exception as e:
+                print(f"Direct download attempt {attempt+1} failed: {str(e)}")
+                tracing.sleep(1, "retry_backoff")
+        return False
 
-        print("⚠ All download methods failed")
+    def _get_pytube_stream_url(self, url, headers, proxies=None):
+        """Resolve the best progressive MP4 stream URL through pytube"""
+        from pytube import YouTube
+        yt = YouTube(
+            url,
+            use_oauth=True,
+            allow_oauth_cache=True,
+            proxies=proxies,
+            headers=headers
+        )
+        yt.bypass_age_gate()
+        stream = yt.streams.filter(
+            progressive=True,
+            file_extension='mp4'
+        ).order_by('resolution').desc().first()
+        return stream.url
+
+    def _find_direct_video_url(self, url, headers, proxies=None):
+        """Scrape a googlevideo media URL from the watch page, or None if there is none"""
+        video_id = url.split("v=")[1].split("&")[0]
+        embed_url = f"{YOUTUBE_BASE_URL}/embed/{video_id}"
+        
+        # Simulate browser navigation
+        self.http.get(embed_url, headers=headers, proxies=proxies, timeout=http_client.DEFAULT_TIMEOUT)
+        tracing.sleep(random.uniform(0.5, 2), "browse_delay")
+        response = self.http.get(url, headers=headers, proxies=proxies, timeout=http_client.DEFAULT_TIMEOUT)
+        
+        # Find video URL in page
+        match = re.search(r'"url":"(https://[^"]+googlevideo[^"]+)"', response.text)
+        return match.group(1) if match else None
+
+    def stream_video(self, url, open_writer):
+        """
+        Multi-strategy download that pipes the video bytes into a writer from open_writer()
+        (normally an S3 multipart upload) instead of a local file. Each attempt gets a fresh
+        writer; failed attempts are aborted. Returns the number of bytes streamed, or None.
+        """
+        strategies = self._ordered_strategies(url)
+        if strategies is None:
+            return None
+        for name, _, stream in strategies:
+            started = time.time()
+            with metrics.timed("download", strategy=name, mode="stream") as timer:
+                copied = stream(url, open_writer)
+                timer.ok = bool(copied)
+            self.scoreboard.record(name, url_to_id(url), timer.ok, time.time() - started)
+            if copied:
+                metrics.add_bytes("download", copied, strategy=name)
+                metrics.add_bytes("upload", copied, target="s3", mode="stream")
+                return copied
+
+        print("⚠ All streaming methods failed")
         return None
 
+    def _stream_ytdlp(self, url, open_writer):
+        """Strategy 1: yt-dlp resolves the format, the shared session streams it"""
+        for attempt in range(3):
+            if attempt:
+                metrics.retry("download", strategy="yt-dlp")
+            writer = open_writer()
+            try:
+                print(f"Streaming attempt {attempt+1} with yt-dlp")
+                media = self.ytdlp.resolve(url)
+                if media.protocol not in ("http", "https"):
+                    raise RuntimeError(f"format {media.format_id} uses {media.protocol}, not a single HTTP stream")
+                response = self.http.get(media.url, headers=media.http_headers, stream=True,
+                                         timeout=http_client.DEFAULT_TIMEOUT)
+                copied = stream_response(response, writer)
+                if copied >= MIN_VIDEO_SIZE:
+                    writer.close()
+                    print(f"✓ yt-dlp stream successful (format {media.format_id}, {media.ext})")
+                    return copied
+                print(f"yt-dlp stream attempt {attempt+1} too small: {copied} bytes")
+            except Exception as e:
+                print(f"yt-dlp stream attempt {attempt+1} failed: {str(e)}")
+            writer.abort()
+            tracing.sleep(random.uniform(1, 3), "retry_backoff")
+        return None
+
+    def _stream_pytube(self, url, open_writer):
+        """Strategy 2: Pytube stream URL"""
+        for attempt in range(2):
+            if attempt:
+                metrics.retry("download", strategy="pytube")
+            writer = open_writer()
+            try:
+                headers = self._request_headers()
+                with self.proxy_pool.lease() as proxies:
+                    stream_url = self._get_pytube_stream_url(url, headers, proxies)
+                    response = self.http.get(stream_url, headers=headers, proxies=proxies, stream=True)
+                    copied = stream_response(response, writer)
+                if copied >= MIN_VIDEO_SIZE:
+                    writer.close()
+                    print("✓ Pytube stream successful")
+                    return copied
+                print(f"Pytube stream attempt {attempt+1} too small: {copied} bytes")
+            except Exception as e:
+                print(f"Pytube stream attempt {attempt+1} failed: {str(e)}")
+            writer.abort()
+            tracing.sleep(1, "retry_backoff")
+        return None
+
+    def _stream_direct(self, url, open_writer):
+        """Strategy 3: Direct googlevideo URL"""
+        for attempt in range(2):
+            if attempt:
+                metrics.retry("download", strategy="direct")
+            writer = open_writer()
+            try:
+                headers = self._request_headers()
+                with self.proxy_pool.lease() as proxies:
+                    video_url = self._find_direct_video_url(url, headers, proxies)
+                    if not video_url:
+                        raise RuntimeError("no direct video URL in the watch page")
+                    response = self.http.get(video_url, headers=headers, stream=True, proxies=proxies)
+                    copied = stream_response(response, writer)
+                    if copied >= MIN_VIDEO_SIZE:
+                        writer.close()
+                        print("✓ Direct stream successful")
+                        return copied
+            except Exception as e:
+                print(f"Direct stream attempt {attempt+1} failed: {str(e)}")
+            writer.abort()
+            tracing.sleep(1, "retry_backoff")
+        return None
+
+    @tracing.traced("episode")
     def process_episode(self, drama_name, url, episodes_list, max_episode, order_index=None):
         """
         Process a single episode: verify the extracted episode number from the title is in episodes_list.
         If so, download and upload the video.
         """
-        duration, title = get_video_info(url)
-        if not title:
-            print("❌ Could not retrieve video title, skipping episode")
-            return False
-        
-        ep_num = extract_episode_number(title, max_episode)
-        print(f"Episode number: {ep_num}")
-        if ep_num is None:
-            print("❌ Could not extract episode number, skipping episode")
-            return False
+        video_id = url_to_id(url)
+        ep_num = self.ledger.lookup_episode(drama_name, video_id)
+        if ep_num is not None:
+            print(f"Episode number (from ledger): {ep_num}")
+        else:
+            duration, title = get_video_info(url)
+            if not title:
+                print("❌ Could not retrieve video title, skipping episode")
+                return False
+            
+            ep_num = resolve_episode_number(url, title, max_episode, drama_name)
+            print(f"Episode number: {ep_num}")
+            if ep_num is None:
+                print("❌ Could not extract episode number, skipping episode")
+                return False
+            self.ledger.record(drama_name, ep_num, video_id, STAGE_RESOLVED, title)
         
         if ep_num not in episodes_list:
             print(f"⏭️ Episode {ep_num} is not in the download list {episodes_list}. Skipping.")
             return False
         
         episode_key = f"{drama_name}_ep{ep_num}"
-        if episode_key in self.processed_episodes:
-            print(f"⚠ Episode {ep_num} already processed. Skipping.")
+        completed_stages = self.ledger.stages(drama_name, ep_num)
+        if STAGE_TRANSCRIPTS_UPLOADED in completed_stages:
+            print(f"⚠ Episode {ep_num} already completed on a previous run. Skipping.")
+            with self._episodes_lock:
+                self.processed_episodes.add(episode_key)
             return True
         
+        with self._episodes_lock:
+            if episode_key in self.processed_episodes:
+                print(f"⚠ Episode {ep_num} already processed. Skipping.")
+                return True
+            if episode_key in self.in_progress_episodes:
+                print(f"⚠ Episode {ep_num} is being processed by another worker. Skipping.")
+                return False
+            self.in_progress_episodes.add(episode_key)
+        
+        if self.coordinator:
+            try:
+                claimed = self.coordinator.try_claim(drama_name, ep_num)
+            except Exception as e:
+                logger.error(f"Failed to claim {episode_key}: {str(e)}")
+                claimed = False
+            if not claimed:
+                with self._episodes_lock:
+                    self.in_progress_episodes.discard(episode_key)
+                return False
+        
         print(f"Processing {drama_name} - Episode {ep_num}")
         print(f"Video URL: {url}")
         
-        episode_dir = os.path.join(TEMP_DIR, f"drama_{int(time.time())}_{threading.get_native_id()}")
-        os.makedirs(episode_dir, exist_ok=True)
+        # mkdtemp gives every worker its own directory, even when they start in the same second
+        episode_dir = tempfile.mkdtemp(prefix=f"drama_ep{ep_num}_", dir=TEMP_DIR)
         
         try:
-            video_id = url_to_id(url)
             output_filename = f"{drama_name}_Ep{ep_num}.mp4"
             output_path = os.path.join(episode_dir, output_filename)
             
-            downloaded_path = self.download_video(url, output_path)
-            if not downloaded_path:
-                logger.error(f"Failed to download episode {ep_num}")
-                return False
-            
-            file_size = os.path.getsize(downloaded_path) / (1024 * 1024)
-            print(f"Downloaded video size: {file_size:.2f} MB")
-            
             remote_path = f"/videos/{drama_name}/{output_filename}"
-            s3_url = self.s3.upload_file(downloaded_path, remote_path)
-            if s3_url:
-                print(f"✓ Video uploaded to S3: {s3_url}")
+            if STAGE_UPLOADED in completed_stages:
+                print(f"✓ Video already uploaded on a previous run: {self.s3.object_url(remote_path)}")
+            elif STREAM_TO_S3:
+                streamed_bytes = self.stream_video(url, lambda: self.s3.open_stream(remote_path))
+                if not streamed_bytes:
+                    logger.error(f"Failed to stream episode {ep_num}")
+                    return False
+                s3_url = self.s3.object_url(remote_path)
+                print(f"✓ Video streamed to S3 ({streamed_bytes / (1024 * 1024):.2f} MB): {s3_url}")
+                self.ledger.record(drama_name, ep_num, video_id, STAGE_DOWNLOADED, str(streamed_bytes))
+                self.ledger.record(drama_name, ep_num, video_id, STAGE_UPLOADED, s3_url)
             else:
-                print(f"✗ Failed to upload video to S3")
-                return False
-            
-            try:
-                os.remove(downloaded_path)
-                print(f"✓ Removed temporary file: {downloaded_path}")
-            except Exception as e:
-                print(f"⚠ Error removing temporary file: {str(e)}")
+                downloaded_path = self.download_video(url, output_path)
+                if not downloaded_path:
+                    logger.error(f"Failed to download episode {ep_num}")
+                    return False
+                
+                file_size = os.path.getsize(downloaded_path) / (1024 * 1024)
+                print(f"Downloaded video size: {file_size:.2f} MB")
+                self.ledger.record(drama_name, ep_num, video_id, STAGE_DOWNLOADED, downloaded_path)
+                
+                s3_url = self.s3.upload_file(downloaded_path, remote_path)
+                if s3_url:
+                    print(f"✓ Video uploaded to S3: {s3_url}")
+                    self.ledger.record(drama_name, ep_num, video_id, STAGE_UPLOADED, s3_url)
+                else:
+                    print(f"✗ Failed to upload video to S3")
+                    return False
+                
+                try:
+                    os.remove(downloaded_path)
+                    print(f"✓ Removed temporary file: {downloaded_path}")
+                except Exception as e:
+                    print(f"⚠ Error removing temporary file: {str(e)}")
             
             print("Looking for transcript files...")
             transcript_base = os.path.join(
@@ -394,6 +632,11 @@ class VideoDownloader:
                 drama_name,
                 f"{drama_name}_ep{ep_num}"
             )
+            # Transcripts live in a per-drama store; export this episode's text files on demand
+            store_file = store_path(TRANSCRIPT_DIR, drama_name)
+            if os.path.exists(store_file):
+                with TranscriptStore(store_file) as store:
+                    export_episode(store, ep_num, transcript_base)
             transcript_files = [
                 f"{transcript_base}_English.txt",
                 f"{transcript_base}_Urdu_T.txt",
@@ -406,22 +649,24 @@ class VideoDownloader:
                     print(f"Found transcript: {transcript_file}")
                     transcript_filename = os.path.basename(transcript_file)
                     s3_transcript_path = f"/transcripts/{drama_name}/{transcript_filename}"
-                    tr_url = self.s3.upload_file(transcript_file, s3_transcript_path)
+                    with tracing.span("transcript_upload", file=transcript_filename):
+                        tr_url = self.s3.upload_file(transcript_file, s3_transcript_path)
                     if tr_url:
                         print(f"✓ Uploaded transcript to S3: {tr_url}")
                         transcript_count += 1
             
-            if transcript_count == 0:
-                print("No transcript files found")
-            else:
-                print(f"✓ Processed {transcript_count} transcript files")
-            
-            try:
-                os.rmdir(episode_dir)
-            except:
-                pass
+            if transcript_count < len(transcript_files):
+                # Leave the episode open (the lease is released, not completed) so a rerun retries it
+                print(f"⚠ Uploaded {transcript_count}/{len(transcript_files)} transcript files; "
+                      f"episode left unfinished")
+                return False
+            print(f"✓ Processed {transcript_count} transcript files")
+            self.ledger.record(drama_name, ep_num, video_id, STAGE_TRANSCRIPTS_UPLOADED, str(transcript_count))
             
-            self.processed_episodes.add(episode_key)
+            with self._episodes_lock:
+                self.processed_episodes.add(episode_key)
+            if self.coordinator:
+                self.coordinator.release(drama_name, ep_num, completed=True)
             print(f"✓ Marked episode as processed: {episode_key}")
             print(f"--------- FINISHED {drama_name} Episode {ep_num} ---------\n")
             return True
@@ -429,12 +674,16 @@ class VideoDownloader:
         except Exception as e:
             logger.error(f"Episode processing error: {str(e)}")
             print(f"✗ Error processing episode: {str(e)}")
-            try:
-                os.rmdir(episode_dir)
-            except:
-                pass
             return False
+        finally:
+            shutil.rmtree(episode_dir, ignore_errors=True)
+            if self.coordinator:
+                # No-op after a successful release; otherwise frees the episode for other instances
+                self.coordinator.release(drama_name, ep_num)
+            with self._episodes_lock:
+                self.in_progress_episodes.discard(episode_key)
     
+    @tracing.traced("drama")
     def process_drama_sequentially(self, drama_name):
         """Process a single drama by iterating over its playlist and downloading only specified episodes"""
         print(f"\n\n========== STARTING DRAMA: {drama_name} ==========")
@@ -449,21 +698,57 @@ class VideoDownloader:
             print(f"Error reading episodes data: {str(e)}")
             return
         
+        pending = self._pending_episodes(drama_name, episodes_list)
+        if not pending:
+            print(f"✓ All {len(episodes_list)} episodes already completed according to the ledger. Skipping drama.")
+            return
+        
+        video_urls = self._get_playlist_urls(data['link'], episodes_list, max_episode, drama_name)
+        total_episodes = len(video_urls)
+        if not video_urls:
+            print("No videos found in playlist. Aborting drama processing.")
+            return
+        
+        successful_episodes = 0
+        for url in video_urls:
+            print(f"\n{'='*50}")
+            print(f"PROCESSING VIDEO: {url}")
+            print(f"{'='*50}")
+            if self.process_episode(drama_name, url, episodes_list, max_episode):
+                successful_episodes += 1
+            
+            print(f"Waiting {REQUEST_DELAY} seconds before next video...")
+            tracing.sleep(REQUEST_DELAY, "request_delay")
+        
+        print(f"\n========== COMPLETED DRAMA: {drama_name} ==========")
+        print(f"Successfully processed {successful_episodes} out of {total_episodes} videos\n\n")
+        logger.info(f"Completed drama {drama_name}: {successful_episodes}/{total_episodes} videos processed")
+    
+    def _pending_episodes(self, drama_name, episodes_list):
+        """Episodes of a drama that the ledger has not seen complete yet"""
+        completed = self.ledger.completed_episodes(drama_name)
+        pending = [ep for ep in episodes_list if ep not in completed]
+        if completed:
+            print(f"Ledger: {len(episodes_list) - len(pending)}/{len(episodes_list)} episodes already completed")
+        return pending
+    
+    def _get_playlist_urls(self, playlist_url, episodes_list, max_episode, drama_name=None):
+        """
+        List the video URLs of a playlist worth processing. With yt-dlp, one flat-playlist
+        dump resolves every title to an episode up front, so only wanted episodes are returned;
+        the pytube fallback lists every video.
+        """
         video_urls = []
-        total_episodes = 0
         
         if self.yt_dlp_available:
-            print("Getting playlist info with yt-dlp...")
+            print("Resolving playlist with one yt-dlp flat-playlist dump...")
             try:
-                cmd = ["yt-dlp", "--flat-playlist", "--get-id", data['link']]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    video_ids = result.stdout.strip().split("\n")
-                    video_urls = [f"https://www.youtube.com/watch?v={vid}" for vid in video_ids if vid]
-                    total_episodes = len(video_urls)
-                    print(f"Found {total_episodes} episodes using yt-dlp")
-                else:
-                    print(f"yt-dlp playlist extraction failed: {result.stderr}")
+                wanted, unresolved = resolve_playlist_episodes(playlist_url, episodes_list, max_episode, drama_name)
+                video_urls = [entry.url for entry in wanted + unresolved]
+                print(f"Found {len(wanted)} wanted episodes using yt-dlp")
+                if unresolved:
+                    resolve_playlist([entry.url for entry in unresolved])
+                return video_urls
             except Exception as e:
                 print(f"yt-dlp playlist extraction error: {str(e)}")
         
@@ -471,35 +756,89 @@ class VideoDownloader:
             try:
                 print("Falling back to pytube for playlist extraction...")
                 from pytube import Playlist
-                playlist = Playlist(data['link'])
+                playlist = Playlist(playlist_url)
                 playlist._video_regex = re.compile(r"\"url\":\"(/watch\?v=[\w-]*)")
                 video_urls = list(playlist.video_urls)
-                total_episodes = len(video_urls)
-                print(f"Found {total_episodes} episodes using pytube")
+                print(f"Found {len(video_urls)} episodes using pytube")
+                # Fetch every title concurrently now so process_episode reads them from the cache
+                resolve_playlist(video_urls)
             except Exception as e:
                 print(f"Pytube playlist extraction error: {str(e)}")
         
+        return video_urls
+    
+    @tracing.traced("drama")
+    def process_drama_concurrently(self, drama_name):
+        """Process a single drama by running process_episode for its playlist on a bounded worker pool"""
+        print(f"\n\n========== STARTING DRAMA: {drama_name} ({MAX_THREADS} workers) ==========")
+        logger.info(f"Processing drama concurrently: {drama_name}")
+        
+        data = dramas[drama_name]
+        print(f"Playlist URL: {data['link']}")
+        
+        try:
+            episodes_list, max_episode = data['episodes']
+        except Exception as e:
+            print(f"Error reading episodes data: {str(e)}")
+            return
+        
+        pending = self._pending_episodes(drama_name, episodes_list)
+        if not pending:
+            print(f"✓ All {len(episodes_list)} episodes already completed according to the ledger. Skipping drama.")
+            return
+        
+        video_urls = self._get_playlist_urls(data['link'], episodes_list, max_episode, drama_name)
+        total_episodes = len(video_urls)
         if not video_urls:
             print("No videos found in playlist. Aborting drama processing.")
             return
         
-        successful_episodes = 0
-        for url in video_urls:
-            print(f"\n{'='*50}")
-            print(f"PROCESSING VIDEO: {url}")
-            print(f"{'='*50}")
-            if self.process_episode(drama_name, url, episodes_list, max_episode):
-                successful_episodes += 1
-            
-            print(f"Waiting {REQUEST_DELAY} seconds before next video...")
-            time.sleep(REQUEST_DELAY)
+        results = []
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_THREADS,
+            thread_name_prefix=f"worker-{drama_name.replace(' ', '_')}"
+        ) as executor:
+            futures = {
+                executor.submit(self._process_episode_worker, drama_name, url, episodes_list, max_episode): url
+                for url in video_urls
+            }
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"✗ Worker crashed on {futures[future]}: {str(e)}")
+                    results.append({"worker": "unknown", "url": futures[future], "success": False, "elapsed": 0.0})
+        
+        successful_episodes = sum(1 for result in results if result["success"])
         
         print(f"\n========== COMPLETED DRAMA: {drama_name} ==========")
+        per_worker = {}
+        for result in results:
+            stats = per_worker.setdefault(result["worker"], {"videos": 0, "successful": 0, "elapsed": 0.0})
+            stats["videos"] += 1
+            stats["successful"] += 1 if result["success"] else 0
+            stats["elapsed"] += result["elapsed"]
+        for worker, stats in sorted(per_worker.items()):
+            print(f"  {worker}: {stats['successful']}/{stats['videos']} videos in {stats['elapsed']:.1f}s")
         print(f"Successfully processed {successful_episodes} out of {total_episodes} videos\n\n")
         logger.info(f"Completed drama {drama_name}: {successful_episodes}/{total_episodes} videos processed")
     
+    def _process_episode_worker(self, drama_name, url, episodes_list, max_episode):
+        """Run process_episode on a pool thread and report which worker handled it"""
+        worker = threading.current_thread().name
+        started = time.time()
+        print(f"\n[{worker}] PROCESSING VIDEO: {url}")
+        try:
+            success = self.process_episode(drama_name, url, episodes_list, max_episode)
+        except Exception as e:
+            logger.error(f"[{worker}] Unhandled error for {url}: {str(e)}")
+            success = False
+        elapsed = time.time() - started
+        print(f"[{worker}] {'✓' if success else '✗'} {url} ({elapsed:.1f}s)")
+        return {"worker": worker, "url": url, "success": bool(success), "elapsed": elapsed}
+    
     def process_all_dramas(self):
-        """Process all dramas sequentially, downloading only videos matching the episodes array"""
+        """Process all dramas one after another, downloading only videos matching the episodes array"""
         logger.info("Starting video download process for all dramas")
         print("\n" + "="*50)
         print("===== DRAMA DOWNLOAD PROCESS STARTED =====")
@@ -517,12 +856,29 @@ class VideoDownloader:
             print(f"{'#'*60}")
             
             try:
-                self.process_drama_sequentially(drama_name)
+                if CONCURRENT_MODE:
+                    self.process_drama_concurrently(drama_name)
+                else:
+                    self.process_drama_sequentially(drama_name)
                 completed_dramas += 1
             except Exception as e:
                 print(f"Error processing drama {drama_name}: {str(e)}")
                 logger.error(f"Fatal error in drama {drama_name}: {str(e)}")
         
+        if self.coordinator:
+            self.coordinator.stop_heartbeat()
+        if metrics.METRICS_SNAPSHOT_PATH:
+            metrics.write_snapshot()
+        print("Download strategy scoreboard:")
+        for strategy, attempts, successes, rate, latency, streak in self.scoreboard.summary():
+            print(f"  {strategy:<12} {successes}/{attempts} ok, recent success {rate:.0%}, "
+                  f"~{latency:.1f}s per attempt, {streak} failures in a row")
+        self.proxy_pool.stop_health_checks()
+        print("Proxy pool:")
+        for proxy, healthy, latency, rate, requests, failures in self.proxy_pool.summary():
+            print(f"  {proxy:<32} {'✓' if healthy else '✗ ejected'} ~{latency * 1000:.0f} ms, "
+                  f"recent success {rate:.0%}, {failures}/{requests} failed")
+        
         print("\n" + "="*50)
         print("===== DRAMA DOWNLOAD PROCESS COMPLETED =====")
         print(f"Successfully processed {completed_dramas}/{total_dramas} dramas")
@@ -531,20 +887,29 @@ class VideoDownloader:
 
     def _random_user_agent(self):
         """Rotate user agents to avoid detection"""
-        agents = [
-            'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/121.0.0.0 Safari/537.36',
-            'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/16.6 Safari/605.1.15',
-            'Mozilla/5.0 (X11; Linux x86_64; rv:120.0) Gecko/20100101 Firefox/120.0'
-        ]
-        return random.choice(agents)
+        return http_client.random_user_agent()
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Download drama episodes and upload them to S3")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="record a Chrome trace / Perfetto JSON of every drama, episode, download and upload")
+    arg_parser.add_argument("--profile-output", default=tracing.TRACE_PATH, help="where to write the trace")
+    args = arg_parser.parse_args()
+    
     os.makedirs(TRANSCRIPT_DIR, exist_ok=True)
+    metrics.start_from_env()
+    if args.profile:
+        tracing.enable()
     
     print("\nInitializing downloader...")
     downloader = VideoDownloader()
     
     print("\nStarting drama processing...")
-    downloader.process_all_dramas()
+    try:
+        downloader.process_all_dramas()
+    finally:
+        if args.profile:
+            tracing.write(args.profile_output)
+            tracing.summarize()
     
     print(f"\nScript completed at: {time.strftime('%Y-%m-%d %H:%M:%S')}")
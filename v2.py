@@ -1,15 +1,29 @@
 import os
 import re
+import argparse
 import time
 import json
 import threading
 import logging
-import requests
-import subprocess
+import http_client
+import metrics
+import tracing
 import tempfile
+import shutil
+import socket
 import concurrent.futures
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from dotenv import load_dotenv
+from s3_stream import S3MultipartWriter, stream_response
+from range_download import download_url
+from episode_ledger import (EpisodeLedger, LEDGER_PATH, STAGE_RESOLVED, STAGE_DOWNLOADED,
+                            STAGE_UPLOADED, STAGE_TRANSCRIPTS_UPLOADED)
+from work_coordinator import S3LeaseCoordinator
+from strategy_scoreboard import StrategyScoreboard, SCOREBOARD_PATH
+from transcript_store import TranscriptStore, store_path, export_episode
+from ytdlp_engine import YtDlpEngine, progress_printer, YTDLP_FORMAT
 
 # Load environment variables from .env file
 load_dotenv()
@@ -20,17 +34,31 @@ REQUEST_DELAY = 2
 TEMP_DIR = tempfile.gettempdir()  
 TRANSCRIPT_DIR = "transcripts"      # Only for finding transcripts, not storing
 MAX_THREADS = 4
-INSTANCE_ID = os.environ.get("AWS_INSTANCE_ID", f"worker-{threading.get_native_id()}")
+CONCURRENT_MODE = True          # Process episodes on a pool of MAX_THREADS workers
+# Must be unique per running process: it names the owner of work leases in S3_COORD_BUCKET1
+INSTANCE_ID = os.environ.get("AWS_INSTANCE_ID", f"worker-{socket.gethostname()}-{os.getpid()}")
+STREAM_TO_S3 = False            # Pipe downloads straight into S3 multipart uploads instead of TEMP_DIR
 
 # Set a minimal file size (in bytes) to consider the download valid (e.g., 1 MB)
 MIN_VIDEO_SIZE = 1024 * 1024  # 1 MB
 
+# Fallback yt-dlp selection: prefer 720p H.264, best single file under 500 MB
+YTDLP_ALT_FORMAT_SORT = ["res:720", "codec:h264"]
+YTDLP_ALT_FORMAT = "b[filesize<500M]"
+
 # AWS S3 credentials from .env file
 AWS_ACCESS_KEY_ID1 = os.environ.get("AWS_ACCESS_KEY_ID1")
 AWS_SECRET_ACCESS_KEY1 = os.environ.get("AWS_SECRET_ACCESS_KEY1")
 AWS_REGION1 = os.environ.get("AWS_REGION1", "us-east-1")  # Default to us-east-1 if not specified
 S3_BUCKET1 = os.environ.get("S3_BUCKET1")
 S3_COORD_BUCKET1 = os.environ.get("S3_COORD_BUCKET1")
+S3_ENDPOINT_URL1 = os.environ.get("S3_ENDPOINT_URL1")  # Optional, e.g. a local S3 stand-in
+
+# S3 transfer tuning
+S3_PART_SIZE = int(os.environ.get("S3_PART_SIZE_MB", "16")) * 1024 * 1024
+S3_MAX_CONCURRENCY = int(os.environ.get("S3_MAX_CONCURRENCY", "8"))   # Parallel parts per large upload
+S3_SMALL_OBJECT_SIZE = 8 * 1024 * 1024   # Below this a single put_object beats a multipart transfer
+S3_MAX_POOL_CONNECTIONS = MAX_THREADS * S3_MAX_CONCURRENCY
 
 print(f"AWS_ACCESS_KEY_ID1: {AWS_ACCESS_KEY_ID1}")
 print(f"AWS_SECRET_ACCESS_KEY1: {AWS_SECRET_ACCESS_KEY1}")
@@ -38,7 +66,8 @@ print(f"S3_BUCKET1: {S3_BUCKET1}")
 print(f"S3_COORD_BUCKET1: {S3_COORD_BUCKET1}")
 
 try:
-    from transcript_fetcher import dramas, url_to_id, get_video_info, extract_episode_number
+    from transcript_fetcher import (dramas, url_to_id, get_video_info, resolve_episode_number,
+                                    resolve_playlist_episodes, resolve_playlist)
 except ImportError:
     print("ERROR: Failed to import data from transcript_fetcher.py")
     raise
@@ -55,52 +84,122 @@ logging.basicConfig(
 logger = logging.getLogger("video_downloader")
 
 class S3Uploader:
+    # One client (and so one urllib3 connection pool) is shared by every uploader and worker thread
+    _shared_client = None
+    _client_lock = threading.Lock()
+    _verified_buckets = set()
+
     def __init__(self):
-        """Initialize S3 client using AWS credentials"""
+        """Initialize S3 uploader; the client is shared and the bucket is verified lazily"""
         print("Initializing S3 uploader...")
         
         if not AWS_ACCESS_KEY_ID1 or not AWS_SECRET_ACCESS_KEY1 or not S3_BUCKET1:
             raise Exception("AWS credentials or bucket name missing from .env file")
             
         try:
-            self.s3_client = boto3.client(
-                's3',
-                AWS_ACCESS_KEY_ID1=AWS_ACCESS_KEY_ID1,
-                AWS_SECRET_ACCESS_KEY1=AWS_SECRET_ACCESS_KEY1,
-                region_name=AWS_REGION1
+            self.s3_client = self._get_shared_client()
+            self.transfer_config = TransferConfig(
+                multipart_threshold=S3_SMALL_OBJECT_SIZE,
+                multipart_chunksize=S3_PART_SIZE,
+                max_concurrency=S3_MAX_CONCURRENCY,
+                use_threads=True
             )
-            # Test connection by listing buckets
-            self.s3_client.list_buckets()
-            print(f"✓ Successfully connected to AWS S3")
-            print(f"✓ Using bucket: {S3_BUCKET1}")
-            # Verify bucket exists
-            self.s3_client.head_bucket(Bucket=S3_BUCKET1)
-            print(f"✓ Bucket {S3_BUCKET1} verified")
-            
+            print(f"✓ Using bucket: {S3_BUCKET1} (part size {S3_PART_SIZE // (1024 * 1024)} MB, "
+                  f"{S3_MAX_CONCURRENCY} parallel parts)")
         except Exception as e:
             logger.error(f"S3 initialization error: {str(e)}")
             raise Exception(f"Failed to initialize S3: {str(e)}")
     
+    @classmethod
+    def _get_shared_client(cls):
+        """Create the process-wide S3 client on first use"""
+        with cls._client_lock:
+            if cls._shared_client is None:
+                cls._shared_client = boto3.client(
+                    's3',
+                    aws_access_key_id=AWS_ACCESS_KEY_ID1,
+                    aws_secret_access_key=AWS_SECRET_ACCESS_KEY1,
+                    region_name=AWS_REGION1,
+                    endpoint_url=S3_ENDPOINT_URL1,
+                    config=Config(
+                        max_pool_connections=S3_MAX_POOL_CONNECTIONS,
+                        retries={'max_attempts': 5, 'mode': 'adaptive'},
+                        tcp_keepalive=True
+                    )
+                )
+            return cls._shared_client
+    
+    def ensure_bucket(self):
+        """Verify the bucket once per process instead of on every start"""
+        if S3_BUCKET1 in self._verified_buckets:
+            return
+        with self._client_lock:
+            if S3_BUCKET1 in self._verified_buckets:
+                return
+            try:
+                self.s3_client.head_bucket(Bucket=S3_BUCKET1)
+            except Exception as e:
+                logger.error(f"S3 bucket verification error: {str(e)}")
+                raise Exception(f"Failed to verify bucket {S3_BUCKET1}: {str(e)}")
+            self._verified_buckets.add(S3_BUCKET1)
+            print(f"✓ Bucket {S3_BUCKET1} verified")
+    
+    @tracing.traced("upload_file")
     def upload_file(self, local_path, remote_path):
         """Upload a file to S3 and return the URL"""
         try:
+            self.ensure_bucket()
             s3_key = remote_path.lstrip('/')
             print(f"Uploading file to S3: {local_path} → s3://{S3_BUCKET1}/{s3_key}")
-            file_size = os.path.getsize(local_path) / (1024 * 1024)
+            size_bytes = os.path.getsize(local_path)
+            file_size = size_bytes / (1024 * 1024)
             print(f"File size: {file_size:.2f} MB")
             
-            self.s3_client.upload_file(
-                local_path, 
-                S3_BUCKET1, 
-                s3_key,
-                ExtraArgs={'ACL': 'public-read'}
-            )
-            s3_url = f"https://{S3_BUCKET1}.s3.{AWS_REGION1}.amazonaws.com/{s3_key}"
+            if size_bytes < S3_SMALL_OBJECT_SIZE:
+                # Transcripts and other small files: one PUT, no transfer-manager threads
+                with metrics.timed("s3_upload", mode="put"), open(local_path, 'rb') as f:
+                    self.s3_client.put_object(
+                        Bucket=S3_BUCKET1,
+                        Key=s3_key,
+                        Body=f.read(),
+                        ACL='public-read'
+                    )
+            else:
+                with metrics.timed("s3_upload", mode="multipart"):
+                    self.s3_client.upload_file(
+                        local_path, 
+                        S3_BUCKET1, 
+                        s3_key,
+                        ExtraArgs={'ACL': 'public-read'},
+                        Config=self.transfer_config
+                    )
+            metrics.add_bytes("upload", size_bytes, target="s3", mode="file")
+            s3_url = self.object_url(s3_key)
             print(f"✓ Successfully uploaded file to S3: {s3_url}")
             return s3_url
         except Exception as e:
             logger.error(f"S3 upload error: {str(e)}")
             raise Exception(f"Failed to upload to S3: {str(e)}")
+    
+    def open_stream(self, remote_path):
+        """Open a writer that streams bytes into s3://S3_BUCKET1/remote_path as a multipart upload"""
+        self.ensure_bucket()
+        s3_key = remote_path.lstrip('/')
+        print(f"Streaming to S3: s3://{S3_BUCKET1}/{s3_key}")
+        return S3MultipartWriter(
+            self.s3_client,
+            S3_BUCKET1,
+            s3_key,
+            part_size=S3_PART_SIZE,
+            extra_args={'ACL': 'public-read'}
+        )
+    
+    def object_url(self, remote_path):
+        """Public URL of an uploaded object"""
+        s3_key = remote_path.lstrip('/')
+        if S3_ENDPOINT_URL1:
+            return f"{S3_ENDPOINT_URL1.rstrip('/')}/{S3_BUCKET1}/{s3_key}"
+        return f"https://{S3_BUCKET1}.s3.{AWS_REGION1}.amazonaws.com/{s3_key}"
 
 class VideoDownloader:
     def __init__(self):
@@ -111,110 +210,96 @@ class VideoDownloader:
         print(f"Temp directory: {TEMP_DIR}")
         print("*"*60 + "\n")
         
-        # Check for yt-dlp availability
-        self.yt_dlp_available = False
-        try:
-            result = subprocess.run(["yt-dlp", "--version"], capture_output=True, text=True)
-            if result.returncode == 0:
-                self.yt_dlp_available = True
-                print(f"Found yt-dlp version: {result.stdout.strip()}")
-            else:
-                print("yt-dlp not found. Will use fallback methods.")
-        except Exception:
+        # yt-dlp runs in-process: one reusable YoutubeDL per worker thread
+        self.ytdlp = YtDlpEngine()
+        self.yt_dlp_available = self.ytdlp.available
+        if self.yt_dlp_available:
+            print(f"Found yt-dlp version: {self.ytdlp.version}")
+        else:
             print("yt-dlp not found. Will use fallback methods.")
         
         # Initialize S3 uploader
         self.s3 = S3Uploader()
         self.processed_episodes = set()
+        self.in_progress_episodes = set()
+        self._episodes_lock = threading.Lock()
+        http_client.configure(pool_size=MAX_THREADS * 2)
+        self.ledger = EpisodeLedger(LEDGER_PATH)
+        print(f"Episode ledger: {LEDGER_PATH}")
+        # Strategy success history, so known-bad strategies and videos are skipped quickly
+        self.scoreboard = StrategyScoreboard(SCOREBOARD_PATH)
+        
+        # Split episodes with other instances through leases in the coordination bucket
+        self.coordinator = None
+        if S3_COORD_BUCKET1:
+            self.coordinator = S3LeaseCoordinator(self.s3.s3_client, S3_COORD_BUCKET1, INSTANCE_ID)
+            self.coordinator.start_heartbeat()
+            print(f"Coordinating work through s3://{S3_COORD_BUCKET1} as {INSTANCE_ID}")
     
+    def _download_strategies(self):
+        """(name, file download method, stream method) in the order they are tried"""
+        strategies = []
+        if self.yt_dlp_available:
+            strategies.append(("yt-dlp", self._download_ytdlp, self._stream_ytdlp))
+            strategies.append(("yt-dlp-alt", self._download_ytdlp_alt, self._stream_ytdlp_alt))
+        strategies.append(("pytube", self._download_pytube, self._stream_pytube))
+        strategies.append(("requests", self._download_requests, self._stream_requests))
+        return strategies
+
+    def _ordered_strategies(self, url):
+        """Strategies in scoreboard order, or None when every strategy recently failed this video"""
+        strategies = self.scoreboard.order(self._download_strategies(), url_to_id(url))
+        if not strategies:
+            print(f"⏭️ Every download strategy failed {url} recently. Skipping until the failures expire.")
+            metrics.inc("download_short_circuits_total")
+            return None
+        print(f"Strategy order: {', '.join(name for name, _, _ in strategies)}")
+        return strategies
+
     def download_video(self, url, output_path):
         """Download a video, preferring 720p MP4; if not available, download available format."""
         os.makedirs(os.path.dirname(output_path), exist_ok=True)
         
-        # First attempt with format that doesn't require merging
-        if self.yt_dlp_available:
-            try:
-                print(f"Downloading video using yt-dlp (best format): {url}")
-                # Modified command to request formats that don't need merging
-                cmd = [
-                    "yt-dlp",
-                    "-f", "best[height<=720]", # Request single best format (no merging required)
-                    "-o", output_path,
-                    "--no-playlist",
-                    url
-                ]
-                print(f"Running command: {' '.join(cmd)}")
-                
-                # Use shell=True on Windows if needed
-                use_shell = os.name == 'nt'  # True for Windows
-                
-                # Run with full output
-                process = subprocess.Popen(
-                    cmd, 
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    shell=use_shell
-                )
-                stdout, stderr = process.communicate()
-                
-                # Print full output for debugging
-                print(f"Command stdout: {stdout}")
-                if stderr:
-                    print(f"Command stderr: {stderr}")
-                    
-                if process.returncode == 0:
-                    if os.path.exists(output_path) and os.path.getsize(output_path) >= MIN_VIDEO_SIZE:
-                        print(f"✓ Successfully downloaded video")
-                        return output_path
-                    else:
-                        actual_size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
-                        print(f"⚠ yt-dlp claimed success but file is too small: {actual_size} bytes")
-                else:
-                    print(f"✗ yt-dlp download failed with return code: {process.returncode}")
-            except Exception as e:
-                print(f"✗ yt-dlp error: {str(e)}")
-            
-            # Try alternative formats
-            try:
-                print(f"Attempting alternate format download using yt-dlp for: {url}")
-                cmd_alt = [
-                    "yt-dlp",
-                    "--format-sort", "res:720,codec:h264", # Sort by resolution and codec
-                    "--format-sort-force",                  # Force format sorting
-                    "-f", "b[filesize<500M]",              # Choose best format under 500MB
-                    "-o", output_path,
-                    "--no-playlist",
-                    url
-                ]
-                print(f"Running command: {' '.join(cmd_alt)}")
-                
-                process = subprocess.Popen(
-                    cmd_alt, 
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    shell=use_shell
-                )
-                stdout, stderr = process.communicate()
-                
-                print(f"Command stdout: {stdout}")
-                if stderr:
-                    print(f"Command stderr: {stderr}")
-                    
-                if process.returncode == 0:
-                    if os.path.exists(output_path) and os.path.getsize(output_path) >= MIN_VIDEO_SIZE:
-                        print(f"✓ Successfully downloaded video in alternate format using yt-dlp")
-                        return output_path
-                    else:
-                        actual_size = os.path.getsize(output_path) if os.path.exists(output_path) else 0
-                        print(f"⚠ Alternate format download succeeded but file is too small: {actual_size} bytes")
-                else:
-                    print(f"✗ Alternate format download failed with return code: {process.returncode}")
-            except Exception as e:
-                print(f"✗ Alternate format yt-dlp error: {str(e)}")
+        strategies = self._ordered_strategies(url)
+        if strategies is None:
+            return None
+        for name, download, _ in strategies:
+            started = time.time()
+            with metrics.timed("download", strategy=name, mode="file") as timer:
+                timer.ok = download(url, output_path)
+            self.scoreboard.record(name, url_to_id(url), timer.ok, time.time() - started)
+            if timer.ok:
+                metrics.add_bytes("download", os.path.getsize(output_path), strategy=name)
+                return output_path
         
-        # Fallback to pytube
+        print(f"All download methods failed for URL: {url}")
+        return None
+
+    def _download_ytdlp_format(self, url, output_path, label, format_sort=None, format=YTDLP_FORMAT):
+        result = self.ytdlp.download(url, output_path, format=format, format_sort=format_sort,
+                                     progress=progress_printer(label))
+        if not result.ok:
+            print(f"✗ {label} download failed: {result.error}")
+        elif result.size >= MIN_VIDEO_SIZE:
+            print(f"✓ Successfully downloaded video using {label} (format {result.media.format_id})")
+            return True
+        else:
+            print(f"⚠ {label} claimed success but file is too small: {result.size} bytes")
+        return False
+
+    def _download_ytdlp(self, url, output_path):
+        """First attempt with format that doesn't require merging"""
+        print(f"Downloading video using yt-dlp (best format): {url}")
+        return self._download_ytdlp_format(url, output_path, "yt-dlp")
+
+    def _download_ytdlp_alt(self, url, output_path):
+        """Try alternative formats"""
+        print(f"Attempting alternate format download using yt-dlp for: {url}")
+        return self._download_ytdlp_format(url, output_path, "yt-dlp (alternate format)",
+                                           format_sort=YTDLP_ALT_FORMAT_SORT, format=YTDLP_ALT_FORMAT)
+
+    def _download_pytube(self, url, output_path):
+        """Fallback to pytube"""
         try:
             from pytube import YouTube
             print(f"Falling back to pytube for download: {url}")
@@ -225,94 +310,214 @@ class VideoDownloader:
                 video = streams.first()
             else:
                 video = yt.streams.get_highest_resolution()
-            downloaded_path = video.download(output_path=os.path.dirname(output_path))
-            if downloaded_path != output_path and os.path.exists(downloaded_path):
-                os.rename(downloaded_path, output_path)
+            download_url(video.url, output_path)
             if os.path.exists(output_path) and os.path.getsize(output_path) >= MIN_VIDEO_SIZE:
                 print(f"✓ Successfully downloaded video using pytube")
-                return output_path
+                return True
             else:
                 print("⚠ pytube claimed success but file is missing or too small")
         except Exception as e:
             print(f"✗ pytube download error: {str(e)}")
-        
-        # Fallback to direct download via requests (last resort)
+        return False
+
+    def _download_requests(self, url, output_path):
+        """Fallback to direct download via requests (last resort)"""
         try:
             print(f"Last resort: Trying direct download via requests: {url}")
-            response = requests.get(url, stream=True)
-            if response.status_code == 200:
-                with open(output_path, 'wb') as f:
-                    for chunk in response.iter_content(chunk_size=8192):
-                        f.write(chunk)
-                if os.path.exists(output_path) and os.path.getsize(output_path) >= MIN_VIDEO_SIZE:
-                    print(f"✓ Successfully downloaded video using requests")
-                    return output_path
-                else:
-                    print("⚠ requests download succeeded but file is missing or too small")
+            download_url(url, output_path, headers=http_client.request_headers())
+            if os.path.exists(output_path) and os.path.getsize(output_path) >= MIN_VIDEO_SIZE:
+                print("✓ Successfully downloaded video using requests")
+                return True
             else:
-                print(f"✗ requests download failed with status code: {response.status_code}")
+                print("⚠ requests download succeeded but file is missing or too small")
         except Exception as e:
             print(f"✗ requests download error: {str(e)}")
+        return False
+
+    def stream_video(self, url, open_writer):
+        """
+        Download a video straight into a writer from open_writer() (normally an S3 multipart
+        upload) instead of a local file. Each attempt gets a fresh writer; failed attempts are
+        aborted. Returns the number of bytes streamed, or None.
+        """
+        strategies = self._ordered_strategies(url)
+        if strategies is None:
+            return None
+        for name, _, stream in strategies:
+            started = time.time()
+            with metrics.timed("download", strategy=name, mode="stream") as timer:
+                copied = stream(url, open_writer)
+                timer.ok = bool(copied)
+            self.scoreboard.record(name, url_to_id(url), timer.ok, time.time() - started)
+            if copied:
+                metrics.add_bytes("download", copied, strategy=name)
+                metrics.add_bytes("upload", copied, target="s3", mode="stream")
+                return copied
         
-        print(f"All download methods failed for URL: {url}")
+        print(f"All streaming methods failed for URL: {url}")
+        return None
+
+    def _stream_ytdlp_format(self, url, open_writer, format_sort=None, format=YTDLP_FORMAT):
+        writer = open_writer()
+        try:
+            media = self.ytdlp.resolve(url, format=format, format_sort=format_sort)
+            if media.protocol not in ("http", "https"):
+                raise RuntimeError(f"format {media.format_id} uses {media.protocol}, not a single HTTP stream")
+            print(f"Streaming yt-dlp format {media.format_id} ({media.ext})")
+            response = http_client.get_session().get(media.url, headers=media.http_headers, stream=True,
+                                                     timeout=http_client.DEFAULT_TIMEOUT)
+            copied = stream_response(response, writer)
+            if copied >= MIN_VIDEO_SIZE:
+                writer.close()
+                print("✓ Successfully streamed video using yt-dlp")
+                return copied
+            print(f"✗ yt-dlp stream too small ({copied} bytes)")
+        except Exception as e:
+            print(f"✗ yt-dlp stream error: {str(e)}")
+        writer.abort()
+        return None
+
+    def _stream_ytdlp(self, url, open_writer):
+        return self._stream_ytdlp_format(url, open_writer)
+
+    def _stream_ytdlp_alt(self, url, open_writer):
+        return self._stream_ytdlp_format(url, open_writer, format_sort=YTDLP_ALT_FORMAT_SORT, format=YTDLP_ALT_FORMAT)
+
+    def _stream_pytube(self, url, open_writer):
+        """Fallback to pytube stream URL"""
+        writer = open_writer()
+        try:
+            from pytube import YouTube
+            print(f"Falling back to pytube for streaming: {url}")
+            yt = YouTube(url)
+            streams = yt.streams.filter(res="720p", file_extension="mp4")
+            video = streams.first() if streams else yt.streams.get_highest_resolution()
+            copied = stream_response(http_client.get(video.url, stream=True), writer)
+            if copied >= MIN_VIDEO_SIZE:
+                writer.close()
+                print("✓ Successfully streamed video using pytube")
+                return copied
+            print(f"⚠ pytube stream too small: {copied} bytes")
+        except Exception as e:
+            print(f"✗ pytube stream error: {str(e)}")
+        writer.abort()
         return None
 
+    def _stream_requests(self, url, open_writer):
+        """Last resort: stream the URL itself"""
+        writer = open_writer()
+        try:
+            print(f"Last resort: Trying direct stream via requests: {url}")
+            copied = stream_response(http_client.get(url, stream=True), writer)
+            if copied >= MIN_VIDEO_SIZE:
+                writer.close()
+                print("✓ Successfully streamed video using requests")
+                return copied
+            print(f"⚠ requests stream too small: {copied} bytes")
+        except Exception as e:
+            print(f"✗ requests stream error: {str(e)}")
+        writer.abort()
+        return None
+    
+    @tracing.traced("episode")
     def process_episode(self, drama_name, url, episodes_list, max_episode, order_index=None):
         """
         Process a single episode: verify the extracted episode number from the title is in episodes_list.
         If so, download and upload the video.
         """
-        duration, title = get_video_info(url)
-        if not title:
-            print("❌ Could not retrieve video title, skipping episode")
-            return False
-        
-        ep_num = extract_episode_number(title, max_episode)
-        if ep_num is None:
-            print("❌ Could not extract episode number, skipping episode")
-            return False
+        video_id = url_to_id(url)
+        ep_num = self.ledger.lookup_episode(drama_name, video_id)
+        if ep_num is not None:
+            print(f"Episode number (from ledger): {ep_num}")
+        else:
+            duration, title = get_video_info(url)
+            if not title:
+                print("❌ Could not retrieve video title, skipping episode")
+                return False
+            
+            ep_num = resolve_episode_number(url, title, max_episode, drama_name)
+            if ep_num is None:
+                print("❌ Could not extract episode number, skipping episode")
+                return False
+            self.ledger.record(drama_name, ep_num, video_id, STAGE_RESOLVED, title)
         
         if ep_num not in episodes_list:
             print(f"⏭️ Episode {ep_num} is not in the download list {episodes_list}. Skipping.")
             return False
         
         episode_key = f"{drama_name}_ep{ep_num}"
-        if episode_key in self.processed_episodes:
-            print(f"⚠ Episode {ep_num} already processed. Skipping.")
+        completed_stages = self.ledger.stages(drama_name, ep_num)
+        if STAGE_TRANSCRIPTS_UPLOADED in completed_stages:
+            print(f"⚠ Episode {ep_num} already completed on a previous run. Skipping.")
+            with self._episodes_lock:
+                self.processed_episodes.add(episode_key)
             return True
         
+        with self._episodes_lock:
+            if episode_key in self.processed_episodes:
+                print(f"⚠ Episode {ep_num} already processed. Skipping.")
+                return True
+            if episode_key in self.in_progress_episodes:
+                print(f"⚠ Episode {ep_num} is being processed by another worker. Skipping.")
+                return False
+            self.in_progress_episodes.add(episode_key)
+        
+        if self.coordinator:
+            try:
+                claimed = self.coordinator.try_claim(drama_name, ep_num)
+            except Exception as e:
+                logger.error(f"Failed to claim {episode_key}: {str(e)}")
+                claimed = False
+            if not claimed:
+                with self._episodes_lock:
+                    self.in_progress_episodes.discard(episode_key)
+                return False
+        
         print(f"Processing {drama_name} - Episode {ep_num}")
         print(f"Video URL: {url}")
         
-        episode_dir = os.path.join(TEMP_DIR, f"drama_{int(time.time())}_{threading.get_native_id()}")
-        os.makedirs(episode_dir, exist_ok=True)
+        # mkdtemp gives every worker its own directory, even when they start in the same second
+        episode_dir = tempfile.mkdtemp(prefix=f"drama_ep{ep_num}_", dir=TEMP_DIR)
         
         try:
-            video_id = url_to_id(url)
             output_filename = f"{drama_name}_Ep{ep_num}_{video_id}.mp4"
             output_path = os.path.join(episode_dir, output_filename)
             
-            downloaded_path = self.download_video(url, output_path)
-            if not downloaded_path:
-                logger.error(f"Failed to download episode {ep_num}")
-                return False
-            
-            file_size = os.path.getsize(downloaded_path) / (1024 * 1024)
-            print(f"Downloaded video size: {file_size:.2f} MB")
-            
             remote_path = f"/videos/{drama_name}/{output_filename}"
-            s3_url = self.s3.upload_file(downloaded_path, remote_path)
-            if s3_url:
-                print(f"✓ Video uploaded to S3: {s3_url}")
+            if STAGE_UPLOADED in completed_stages:
+                print(f"✓ Video already uploaded on a previous run: {self.s3.object_url(remote_path)}")
+            elif STREAM_TO_S3:
+                streamed_bytes = self.stream_video(url, lambda: self.s3.open_stream(remote_path))
+                if not streamed_bytes:
+                    logger.error(f"Failed to stream episode {ep_num}")
+                    return False
+                s3_url = self.s3.object_url(remote_path)
+                print(f"✓ Video streamed to S3 ({streamed_bytes / (1024 * 1024):.2f} MB): {s3_url}")
+                self.ledger.record(drama_name, ep_num, video_id, STAGE_DOWNLOADED, str(streamed_bytes))
+                self.ledger.record(drama_name, ep_num, video_id, STAGE_UPLOADED, s3_url)
             else:
-                print(f"✗ Failed to upload video to S3")
-                return False
-            
-            try:
-                os.remove(downloaded_path)
-                print(f"✓ Removed temporary file: {downloaded_path}")
-            except Exception as e:
-                print(f"⚠ Error removing temporary file: {str(e)}")
+                downloaded_path = self.download_video(url, output_path)
+                if not downloaded_path:
+                    logger.error(f"Failed to download episode {ep_num}")
+                    return False
+                
+                file_size = os.path.getsize(downloaded_path) / (1024 * 1024)
+                print(f"Downloaded video size: {file_size:.2f} MB")
+                self.ledger.record(drama_name, ep_num, video_id, STAGE_DOWNLOADED, downloaded_path)
+                
+                s3_url = self.s3.upload_file(downloaded_path, remote_path)
+                if s3_url:
+                    print(f"✓ Video uploaded to S3: {s3_url}")
+                    self.ledger.record(drama_name, ep_num, video_id, STAGE_UPLOADED, s3_url)
+                else:
+                    print("✗ Failed to upload video to S3")
+                    return False
+                
+                try:
+                    os.remove(downloaded_path)
+                    print(f"✓ Removed temporary file: {downloaded_path}")
+                except Exception as e:
+                    print(f"⚠ Error removing temporary file: {str(e)}")
             
             print("Looking for transcript files...")
             transcript_base = os.path.join(
@@ -320,6 +525,11 @@ class VideoDownloader:
                 drama_name,
                 f"{drama_name}_ep{ep_num}"
             )
+            # Transcripts live in a per-drama store; export this episode's text files on demand
+            store_file = store_path(TRANSCRIPT_DIR, drama_name)
+            if os.path.exists(store_file):
+                with TranscriptStore(store_file) as store:
+                    export_episode(store, ep_num, transcript_base)
             transcript_files = [
                 f"{transcript_base}_English.txt",
                 f"{transcript_base}_Urdu_T.txt",
@@ -332,22 +542,24 @@ class VideoDownloader:
                     print(f"Found transcript: {transcript_file}")
                     transcript_filename = os.path.basename(transcript_file)
                     s3_transcript_path = f"/transcripts/{drama_name}/{transcript_filename}"
-                    tr_url = self.s3.upload_file(transcript_file, s3_transcript_path)
+                    with tracing.span("transcript_upload", file=transcript_filename):
+                        tr_url = self.s3.upload_file(transcript_file, s3_transcript_path)
                     if tr_url:
                         print(f"✓ Uploaded transcript to S3: {tr_url}")
                         transcript_count += 1
             
-            if transcript_count == 0:
-                print("No transcript files found")
-            else:
-                print(f"✓ Processed {transcript_count} transcript files")
-            
-            try:
-                os.rmdir(episode_dir)
-            except:
-                pass
+            if transcript_count < len(transcript_files):
+                # Leave the episode open (the lease is released, not completed) so a rerun retries it
+                print(f"⚠ Uploaded {transcript_count}/{len(transcript_files)} transcript files; "
+                      f"episode left unfinished")
+                return False
+            print(f"✓ Processed {transcript_count} transcript files")
+            self.ledger.record(drama_name, ep_num, video_id, STAGE_TRANSCRIPTS_UPLOADED, str(transcript_count))
             
-            self.processed_episodes.add(episode_key)
+            with self._episodes_lock:
+                self.processed_episodes.add(episode_key)
+            if self.coordinator:
+                self.coordinator.release(drama_name, ep_num, completed=True)
             print(f"✓ Marked episode as processed: {episode_key}")
             print(f"--------- FINISHED {drama_name} Episode {ep_num} ---------\n")
             return True
@@ -355,12 +567,16 @@ class VideoDownloader:
         except Exception as e:
             logger.error(f"Episode processing error: {str(e)}")
             print(f"✗ Error processing episode: {str(e)}")
-            try:
-                os.rmdir(episode_dir)
-            except:
-                pass
             return False
+        finally:
+            shutil.rmtree(episode_dir, ignore_errors=True)
+            if self.coordinator:
+                # No-op after a successful release; otherwise frees the episode for other instances
+                self.coordinator.release(drama_name, ep_num)
+            with self._episodes_lock:
+                self.in_progress_episodes.discard(episode_key)
     
+    @tracing.traced("drama")
     def process_drama_sequentially(self, drama_name):
         """Process a single drama by iterating over its playlist and downloading only specified episodes"""
         print(f"\n\n========== STARTING DRAMA: {drama_name} ==========")
@@ -375,21 +591,57 @@ class VideoDownloader:
             print(f"Error reading episodes data: {str(e)}")
             return
         
+        pending = self._pending_episodes(drama_name, episodes_list)
+        if not pending:
+            print(f"✓ All {len(episodes_list)} episodes already completed according to the ledger. Skipping drama.")
+            return
+        
+        video_urls = self._get_playlist_urls(data['link'], episodes_list, max_episode, drama_name)
+        total_episodes = len(video_urls)
+        if not video_urls:
+            print("No videos found in playlist. Aborting drama processing.")
+            return
+        
+        successful_episodes = 0
+        for url in video_urls:
+            print(f"\n{'='*50}")
+            print(f"PROCESSING VIDEO: {url}")
+            print(f"{'='*50}")
+            if self.process_episode(drama_name, url, episodes_list, max_episode):
+                successful_episodes += 1
+            
+            print(f"Waiting {REQUEST_DELAY} seconds before next video...")
+            tracing.sleep(REQUEST_DELAY, "request_delay")
+        
+        print(f"\n========== COMPLETED DRAMA: {drama_name} ==========")
+        print(f"Successfully processed {successful_episodes} out of {total_episodes} videos\n\n")
+        logger.info(f"Completed drama {drama_name}: {successful_episodes}/{total_episodes} videos processed")
+    
+    def _pending_episodes(self, drama_name, episodes_list):
+        """Episodes of a drama that the ledger has not seen complete yet"""
+        completed = self.ledger.completed_episodes(drama_name)
+        pending = [ep for ep in episodes_list if ep not in completed]
+        if completed:
+            print(f"Ledger: {len(episodes_list) - len(pending)}/{len(episodes_list)} episodes already completed")
+        return pending
+    
+    def _get_playlist_urls(self, playlist_url, episodes_list, max_episode, drama_name=None):
+        """
+        List the video URLs of a playlist worth processing. With yt-dlp, one flat-playlist
+        dump resolves every title to an episode up front, so only wanted episodes are returned;
+        the pytube fallback lists every video.
+        """
         video_urls = []
-        total_episodes = 0
         
         if self.yt_dlp_available:
-            print("Getting playlist info with yt-dlp...")
+            print("Resolving playlist with one yt-dlp flat-playlist dump...")
             try:
-                cmd = ["yt-dlp", "--flat-playlist", "--get-id", data['link']]
-                result = subprocess.run(cmd, capture_output=True, text=True)
-                if result.returncode == 0:
-                    video_ids = result.stdout.strip().split("\n")
-                    video_urls = [f"https://www.youtube.com/watch?v={vid}" for vid in video_ids if vid]
-                    total_episodes = len(video_urls)
-                    print(f"Found {total_episodes} episodes using yt-dlp")
-                else:
-                    print(f"yt-dlp playlist extraction failed: {result.stderr}")
+                wanted, unresolved = resolve_playlist_episodes(playlist_url, episodes_list, max_episode, drama_name)
+                video_urls = [entry.url for entry in wanted + unresolved]
+                print(f"Found {len(wanted)} wanted episodes using yt-dlp")
+                if unresolved:
+                    resolve_playlist([entry.url for entry in unresolved])
+                return video_urls
             except Exception as e:
                 print(f"yt-dlp playlist extraction error: {str(e)}")
         
@@ -397,35 +649,89 @@ class VideoDownloader:
             try:
                 print("Falling back to pytube for playlist extraction...")
                 from pytube import Playlist
-                playlist = Playlist(data['link'])
+                playlist = Playlist(playlist_url)
                 playlist._video_regex = re.compile(r"\"url\":\"(/watch\?v=[\w-]*)")
                 video_urls = list(playlist.video_urls)
-                total_episodes = len(video_urls)
-                print(f"Found {total_episodes} episodes using pytube")
+                print(f"Found {len(video_urls)} episodes using pytube")
+                # Fetch every title concurrently now so process_episode reads them from the cache
+                resolve_playlist(video_urls)
             except Exception as e:
                 print(f"Pytube playlist extraction error: {str(e)}")
         
+        return video_urls
+    
+    @tracing.traced("drama")
+    def process_drama_concurrently(self, drama_name):
+        """Process a single drama by running process_episode for its playlist on a bounded worker pool"""
+        print(f"\n\n========== STARTING DRAMA: {drama_name} ({MAX_THREADS} workers) ==========")
+        logger.info(f"Processing drama concurrently: {drama_name}")
+        
+        data = dramas[drama_name]
+        print(f"Playlist URL: {data['link']}")
+        
+        try:
+            episodes_list, max_episode = data['episodes']
+        except Exception as e:
+            print(f"Error reading episodes data: {str(e)}")
+            return
+        
+        pending = self._pending_episodes(drama_name, episodes_list)
+        if not pending:
+            print(f"✓ All {len(episodes_list)} episodes already completed according to the ledger. Skipping drama.")
+            return
+        
+        video_urls = self._get_playlist_urls(data['link'], episodes_list, max_episode, drama_name)
+        total_episodes = len(video_urls)
         if not video_urls:
             print("No videos found in playlist. Aborting drama processing.")
             return
         
-        successful_episodes = 0
-        for url in video_urls:
-            print(f"\n{'='*50}")
-            print(f"PROCESSING VIDEO: {url}")
-            print(f"{'='*50}")
-            if self.process_episode(drama_name, url, episodes_list, max_episode):
-                successful_episodes += 1
-            
-            print(f"Waiting {REQUEST_DELAY} seconds before next video...")
-            time.sleep(REQUEST_DELAY)
+        results = []
+        with concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_THREADS,
+            thread_name_prefix=f"worker-{drama_name.replace(' ', '_')}"
+        ) as executor:
+            futures = {
+                executor.submit(self._process_episode_worker, drama_name, url, episodes_list, max_episode): url
+                for url in video_urls
+            }
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"✗ Worker crashed on {futures[future]}: {str(e)}")
+                    results.append({"worker": "unknown", "url": futures[future], "success": False, "elapsed": 0.0})
+        
+        successful_episodes = sum(1 for result in results if result["success"])
         
         print(f"\n========== COMPLETED DRAMA: {drama_name} ==========")
+        per_worker = {}
+        for result in results:
+            stats = per_worker.setdefault(result["worker"], {"videos": 0, "successful": 0, "elapsed": 0.0})
+            stats["videos"] += 1
+            stats["successful"] += 1 if result["success"] else 0
+            stats["elapsed"] += result["elapsed"]
+        for worker, stats in sorted(per_worker.items()):
+            print(f"  {worker}: {stats['successful']}/{stats['videos']} videos in {stats['elapsed']:.1f}s")
         print(f"Successfully processed {successful_episodes} out of {total_episodes} videos\n\n")
         logger.info(f"Completed drama {drama_name}: {successful_episodes}/{total_episodes} videos processed")
     
+    def _process_episode_worker(self, drama_name, url, episodes_list, max_episode):
+        """Run process_episode on a pool thread and report which worker handled it"""
+        worker = threading.current_thread().name
+        started = time.time()
+        print(f"\n[{worker}] PROCESSING VIDEO: {url}")
+        try:
+            success = self.process_episode(drama_name, url, episodes_list, max_episode)
+        except Exception as e:
+            logger.error(f"[{worker}] Unhandled error for {url}: {str(e)}")
+            success = False
+        elapsed = time.time() - started
+        print(f"[{worker}] {'✓' if success else '✗'} {url} ({elapsed:.1f}s)")
+        return {"worker": worker, "url": url, "success": bool(success), "elapsed": elapsed}
+    
     def process_all_dramas(self):
-        """Process all dramas sequentially, downloading only videos matching the episodes array"""
+        """Process all dramas one after another, downloading only videos matching the episodes array"""
         logger.info("Starting video download process for all dramas")
         print("\n" + "="*50)
         print("===== DRAMA DOWNLOAD PROCESS STARTED =====")
@@ -443,12 +749,24 @@ class VideoDownloader:
             print(f"{'#'*60}")
             
             try:
-                self.process_drama_sequentially(drama_name)
+                if CONCURRENT_MODE:
+                    self.process_drama_concurrently(drama_name)
+                else:
+                    self.process_drama_sequentially(drama_name)
                 completed_dramas += 1
             except Exception as e:
                 print(f"Error processing drama {drama_name}: {str(e)}")
                 logger.error(f"Fatal error in drama {drama_name}: {str(e)}")
         
+        if self.coordinator:
+            self.coordinator.stop_heartbeat()
+        if metrics.METRICS_SNAPSHOT_PATH:
+            metrics.write_snapshot()
+        print("Download strategy scoreboard:")
+        for strategy, attempts, successes, rate, latency, streak in self.scoreboard.summary():
+            print(f"  {strategy:<12} {successes}/{attempts} ok, recent success {rate:.0%}, "
+                  f"~{latency:.1f}s per attempt, {streak} failures in a row")
+        
         print("\n" + "="*50)
         print("===== DRAMA DOWNLOAD PROCESS COMPLETED =====")
         print(f"Successfully processed {completed_dramas}/{total_dramas} dramas")
@@ -456,12 +774,26 @@ class VideoDownloader:
         logger.info(f"Completed processing all dramas: {completed_dramas}/{total_dramas}")
 
 if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="Download drama episodes and upload them to S3")
+    arg_parser.add_argument("--profile", action="store_true",
+                            help="record a Chrome trace / Perfetto JSON of every drama, episode, download and upload")
+    arg_parser.add_argument("--profile-output", default=tracing.TRACE_PATH, help="where to write the trace")
+    args = arg_parser.parse_args()
+    
     os.makedirs(TRANSCRIPT_DIR, exist_ok=True)
+    metrics.start_from_env()
+    if args.profile:
+        tracing.enable()
     
     print("\nInitializing downloader...")
     downloader = VideoDownloader()
     
     print("\nStarting drama processing...")
-    downloader.process_all_dramas()
+    try:
+        downloader.process_all_dramas()
+    finally:
+        if args.profile:
+            tracing.write(args.profile_output)
+            tracing.summarize()
     
     print(f"\nScript completed at: {time.strftime('%Y-%m-%d %H:%M:%S')}")
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+import threading
+import time
+
+VIDEO_CACHE_PATH = os.environ.get("VIDEO_CACHE_PATH", os.path.join(".cache", "video_info.sqlite3"))
+VIDEO_CACHE_TTL = 7 * 24 * 3600     # Titles and durations of published episodes rarely change
+VIDEO_CACHE_MAX_ENTRIES = 50000
+
+
+class VideoInfoCache:
+    """
+    Persistent per-video metadata cache (title, cleaned title, duration, resolved episode).
+    Entries expire after ttl seconds; when the cache grows past max_entries the least
+    recently used entries are evicted. Safe to share between threads.
+    """
+
+    def __init__(self, path=VIDEO_CACHE_PATH, ttl=VIDEO_CACHE_TTL, max_entries=VIDEO_CACHE_MAX_ENTRIES):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS video_info (
+                video_id TEXT PRIMARY KEY,
+                title TEXT NOT NULL,
+                clean_title TEXT NOT NULL,
+                duration INTEGER NOT NULL,
+                episode INTEGER,
+                max_episode INTEGER,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_video_info_accessed ON video_info (accessed_at)")
+
+    def get(self, video_id):
+        """Cached entry as a dict, or None if missing or expired"""
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT title, clean_title, duration, episode, max_episode, fetched_at "
+                "FROM video_info WHERE video_id = ?",
+                (video_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            if now - row[5] > self.ttl:
+                self._conn.execute("DELETE FROM video_info WHERE video_id = ?", (video_id,))
+                return None
+            self._conn.execute("UPDATE video_info SET accessed_at = ? WHERE video_id = ?", (now, video_id))
+        return {
+            "title": row[0],
+            "clean_title": row[1],
+            "duration": row[2],
+            "episode": row[3],
+            "max_episode": row[4],
+        }
+
+    def put(self, video_id, title, clean_title, duration):
+        """Store freshly fetched metadata; any previously resolved episode number is dropped"""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO video_info VALUES (?, ?, ?, ?, NULL, NULL, ?, ?)",
+                (video_id, title, clean_title, duration, now, now)
+            )
+            self._evict()
+
+    def set_episode(self, video_id, episode, max_episode):
+        """Remember the episode number resolved for a video under a given max_episode"""
+        with self._lock:
+            self._conn.execute(
+                "UPDATE video_info SET episode = ?, max_episode = ? WHERE video_id = ?",
+                (episode, max_episode, video_id)
+            )
+
+    def _evict(self):
+        self._conn.execute("DELETE FROM video_info WHERE fetched_at < ?", (time.time() - self.ttl,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM video_info").fetchone()
+        if count > self.max_entries:
+            self._conn.execute(
+                "DELETE FROM video_info WHERE video_id IN "
+                "(SELECT video_id FROM video_info ORDER BY accessed_at LIMIT ?)",
+                (count - self.max_entries,)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
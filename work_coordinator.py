@@ -0,0 +1,166 @@
+import json
+import time
+import threading
+import logging
+
+from botocore.exceptions import ClientError
+
+LEASE_SECONDS = 300           # A lease not renewed for this long can be taken over by another instance
+HEARTBEAT_INTERVAL = 60       # How often held leases are renewed
+LEASE_PREFIX = "leases"
+
+logger = logging.getLogger("video_downloader")
+
+
+class LeaseLost(Exception):
+    pass
+
+
+class S3LeaseCoordinator:
+    """
+    Splits (drama, episode) work items between instances through lease objects in a
+    coordination bucket. Claims use S3 conditional writes (If-None-Match / If-Match),
+    so two instances can never both believe they own the same episode. Held leases
+    are renewed by a heartbeat thread; a crashed instance's leases expire after
+    LEASE_SECONDS and are then picked up by whoever asks next. Finished episodes are
+    marked done so no instance downloads them again.
+    """
+
+    def __init__(self, s3_client, bucket, instance_id, lease_seconds=LEASE_SECONDS,
+                 heartbeat_interval=HEARTBEAT_INTERVAL, prefix=LEASE_PREFIX):
+        self.s3_client = s3_client
+        self.bucket = bucket
+        self.instance_id = instance_id
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.prefix = prefix.strip('/')
+        self._held = {}          # lease key -> ETag of our current lease object
+        self._key_locks = {}     # lease key -> lock serializing its renewals and release
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._heartbeat_thread = None
+
+    def _key(self, drama, episode):
+        return f"{self.prefix}/{drama}/ep{episode}.json"
+
+    def _body(self, state, expires_at):
+        return json.dumps({
+            "owner": self.instance_id,
+            "state": state,
+            "expires_at": expires_at,
+            "updated_at": time.time()
+        }).encode("utf-8")
+
+    @staticmethod
+    def _is_conflict(error):
+        code = error.response.get('Error', {}).get('Code')
+        status = error.response.get('ResponseMetadata', {}).get('HTTPStatusCode')
+        return code in ('PreconditionFailed', 'ConditionalRequestConflict') or status in (409, 412)
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _put(self, key, body, if_match=None):
+        """Conditional PUT; returns the new ETag, or None if another instance won the race"""
+        condition = {'IfMatch': if_match} if if_match else {'IfNoneMatch': '*'}
+        try:
+            response = self.s3_client.put_object(Bucket=self.bucket, Key=key, Body=body, **condition)
+            return response['ETag']
+        except ClientError as e:
+            if self._is_conflict(e):
+                return None
+            raise
+
+    def _read(self, key):
+        """Current lease record and its ETag, or (None, None) if there is none"""
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket, Key=key)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+                return None, None
+            raise
+        return json.loads(response['Body'].read()), response['ETag']
+
+    def try_claim(self, drama, episode):
+        """Take the lease for an episode. False if another live instance holds it or it is done."""
+        key = self._key(drama, episode)
+        body = self._body("leased", time.time() + self.lease_seconds)
+        etag = self._put(key, body)
+        if etag is None:
+            record, current_etag = self._read(key)
+            if record is None:
+                # Deleted between our PUT and GET; retry the create once
+                etag = self._put(key, body)
+            elif record.get("state") == "done":
+                print(f"⏭️ {drama} episode {episode} was completed by {record.get('owner')}")
+                return False
+            elif record.get("owner") == self.instance_id or record.get("expires_at", 0) < time.time():
+                etag = self._put(key, body, if_match=current_etag)
+            else:
+                print(f"⏭️ {drama} episode {episode} is leased by {record.get('owner')}")
+                return False
+        if etag is None:
+            return False
+        with self._lock:
+            self._held[key] = etag
+        return True
+
+    def renew(self, drama, episode):
+        self._renew_key(self._key(drama, episode))
+
+    def _renew_key(self, key):
+        # Held across read and PUT, so a release never races a renewal onto a stale ETag
+        with self._key_lock(key):
+            with self._lock:
+                etag = self._held.get(key)
+            if etag is None:
+                return
+            new_etag = self._put(key, self._body("leased", time.time() + self.lease_seconds), if_match=etag)
+            with self._lock:
+                if self._held.get(key) != etag:
+                    return           # Released meanwhile; never resurrect it
+                if new_etag is None:
+                    self._held.pop(key, None)
+                    raise LeaseLost(f"Lease {key} was taken over by another instance")
+                self._held[key] = new_etag
+
+    def release(self, drama, episode, completed=False):
+        """Give the lease up; completed episodes are marked done so nobody claims them again"""
+        key = self._key(drama, episode)
+        with self._key_lock(key):
+            with self._lock:
+                etag = self._held.pop(key, None)
+            if etag is None:
+                return
+            state, expires_at = ("done", None) if completed else ("released", 0)
+            try:
+                if self._put(key, self._body(state, expires_at), if_match=etag) is None:
+                    logger.warning(f"Lease {key} changed hands before release")
+            except Exception as e:
+                logger.error(f"Failed to release lease {key}: {str(e)}")
+
+    def start_heartbeat(self):
+        if self._heartbeat_thread is None:
+            self._heartbeat_thread = threading.Thread(
+                target=self._heartbeat_loop, name="lease-heartbeat", daemon=True
+            )
+            self._heartbeat_thread.start()
+
+    def stop_heartbeat(self):
+        self._stop.set()
+        if self._heartbeat_thread is not None:
+            self._heartbeat_thread.join()
+            self._heartbeat_thread = None
+
+    def _heartbeat_loop(self):
+        while not self._stop.wait(self.heartbeat_interval):
+            with self._lock:
+                keys = list(self._held)
+            for key in keys:
+                try:
+                    self._renew_key(key)
+                except LeaseLost as e:
+                    logger.warning(str(e))
+                except Exception as e:
+                    logger.error(f"Lease heartbeat error for {key}: {str(e)}")
@@ -0,0 +1,196 @@
+import os
+import threading
+from dataclasses import dataclass, field
+
+import http_client
+import metrics
+
+try:
+    import yt_dlp
+except ImportError:                  # Callers fall back to their non-yt-dlp strategies
+    yt_dlp = None
+
+YTDLP_FORMAT = "best[height<=720]"   # Single progressive file, so nothing needs merging
+YTDLP_SOCKET_TIMEOUT = 60
+YTDLP_RETRIES = 3                    # yt-dlp's own HTTP retries inside one download
+
+
+@dataclass
+class DownloadProgress:
+    """One yt-dlp progress update"""
+    status: str                      # "downloading", "finished" or "error"
+    downloaded_bytes: int = 0
+    total_bytes: int = None
+    speed: float = None              # Bytes per second
+    eta: int = None                  # Seconds
+
+
+@dataclass
+class MediaInfo:
+    """A video and the format yt-dlp selected for it"""
+    video_id: str
+    title: str = None
+    duration: int = 0
+    format_id: str = None
+    ext: str = None
+    url: str = None
+    protocol: str = None
+    filesize: int = None
+    http_headers: dict = field(default_factory=dict)
+
+
+@dataclass
+class DownloadResult:
+    ok: bool
+    path: str = None
+    size: int = 0
+    media: MediaInfo = None
+    error: str = None
+
+
+@dataclass
+class SubtitleListing:
+    manual: list = field(default_factory=list)       # Languages with uploaded subtitles
+    automatic: list = field(default_factory=list)    # Languages with only auto-generated captions
+
+
+def progress_printer(label):
+    """Progress callback that prints at every quarter of a download of known size"""
+    printed = [0]
+
+    def report(progress):
+        if progress.status == "finished":
+            print(f"  {label}: {progress.downloaded_bytes / (1024 * 1024):.1f} MB done")
+        elif progress.total_bytes:
+            quarter = int(4 * progress.downloaded_bytes / progress.total_bytes)
+            if quarter > printed[0] and quarter < 4:
+                printed[0] = quarter
+                speed = f" at {progress.speed / (1024 * 1024):.1f} MB/s" if progress.speed else ""
+                print(f"  {label}: {quarter * 25}% of {progress.total_bytes / (1024 * 1024):.1f} MB{speed}")
+    return report
+
+
+class YtDlpEngine:
+    """
+    Drives yt-dlp through its Python API instead of starting a process per call. Every
+    thread keeps its own YoutubeDL instances, one per option profile, so extractors are
+    loaded once per worker and instances are never shared between threads.
+    """
+
+    def __init__(self, cookie_path=None):
+        self.cookie_path = cookie_path
+        self._local = threading.local()
+
+    @property
+    def available(self):
+        return yt_dlp is not None
+
+    @property
+    def version(self):
+        return yt_dlp.version.__version__ if yt_dlp else None
+
+    def _instance(self, profile, **options):
+        instances = getattr(self._local, "instances", None)
+        if instances is None:
+            instances = self._local.instances = {}
+        if profile not in instances:
+            params = {
+                "quiet": True,
+                "no_warnings": True,
+                "noprogress": True,
+                "noplaylist": True,
+                "retries": YTDLP_RETRIES,
+                "socket_timeout": YTDLP_SOCKET_TIMEOUT,
+                "progress_hooks": [self._on_progress],
+                # One browser identity per worker for the life of its instances
+                "http_headers": {"User-Agent": http_client.random_user_agent()},
+            }
+            if self.cookie_path:
+                params["cookiefile"] = self.cookie_path
+            params.update(options)
+            instances[profile] = yt_dlp.YoutubeDL(params)
+            metrics.inc("ytdlp_instances_total", profile=profile[0])
+        return instances[profile]
+
+    def _format_instance(self, kind, format, format_sort):
+        sort = list(format_sort or [])
+        return self._instance((kind, format, tuple(sort)), format=format,
+                              format_sort=sort, format_sort_force=bool(sort))
+
+    def _on_progress(self, status):
+        callback = getattr(self._local, "progress", None)
+        if callback is None:
+            return
+        callback(DownloadProgress(
+            status=status.get("status"),
+            downloaded_bytes=status.get("downloaded_bytes") or 0,
+            total_bytes=status.get("total_bytes") or status.get("total_bytes_estimate"),
+            speed=status.get("speed"),
+            eta=status.get("eta"),
+        ))
+
+    @staticmethod
+    def _media_info(info):
+        return MediaInfo(
+            video_id=info.get("id"),
+            title=info.get("title"),
+            duration=int(info.get("duration") or 0),
+            format_id=info.get("format_id"),
+            ext=info.get("ext"),
+            url=info.get("url"),
+            protocol=info.get("protocol"),
+            filesize=info.get("filesize") or info.get("filesize_approx"),
+            http_headers=dict(info.get("http_headers") or {}),
+        )
+
+    def download(self, url, output_path, format=YTDLP_FORMAT, format_sort=None, progress=None, user_agent=None):
+        """
+        Download url to output_path; progress gets DownloadProgress updates. user_agent replaces
+        this thread's User-Agent from this call on. Failures are returned, never raised.
+        """
+        ydl = self._format_instance("download", format, format_sort)
+        ydl.params["outtmpl"]["default"] = output_path.replace("%", "%%")
+        if user_agent:
+            ydl.params["http_headers"]["User-Agent"] = user_agent
+        self._local.progress = progress
+        try:
+            info = ydl.extract_info(url, download=True)
+        except Exception as e:       # DownloadError, but also OSError or a failing postprocessor
+            return DownloadResult(False, error=str(e))
+        finally:
+            self._local.progress = None
+        selected = (info.get("requested_downloads") or [info])[0]
+        path = selected.get("filepath") or output_path
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        return DownloadResult(True, path, size, self._media_info(selected))
+
+    def resolve(self, url, format=YTDLP_FORMAT, format_sort=None):
+        """The media URL and request headers of the format download() would fetch"""
+        ydl = self._format_instance("resolve", format, format_sort)
+        return self._media_info(ydl.extract_info(url, download=False))
+
+    def subtitles(self, url):
+        """Subtitle languages of a video, without selecting formats or downloading anything"""
+        info = self._instance(("info",)).extract_info(url, download=False, process=False)
+        manual = sorted(info.get("subtitles") or {})
+        automatic = sorted(set(info.get("automatic_captions") or {}) - set(manual))
+        return SubtitleListing(manual, automatic)
+
+    def playlist(self, url):
+        """Flat entries (id, title, duration, ...) of a playlist without visiting each video"""
+        ydl = self._instance(("flat",), extract_flat="in_playlist", noplaylist=False)
+        info = ydl.extract_info(url, download=False)
+        return [entry for entry in info.get("entries") or [] if entry]
+
+
+_default_engine = None
+_default_engine_lock = threading.Lock()
+
+
+def get_engine():
+    """Shared engine without cookies, for metadata lookups outside VideoDownloader"""
+    global _default_engine
+    with _default_engine_lock:
+        if _default_engine is None:
+            _default_engine = YtDlpEngine()
+        return _default_engine